@@ -0,0 +1,60 @@
+import hashlib
+import os
+import re
+import sys
+
+import numpy as np
+import pytest
+
+from v2_llm_graph.src.memory import embedding_service, lexical_index, vector_backends
+from v2_llm_graph.src.memory.embedding_service import EmbeddingService
+
+# The v0 scripts import their siblings by module name (from tool_router import ToolRouter).
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "v0_no_llm"))
+
+
+class WordHashModel:
+    """
+    A deterministic bag-of-words stand-in for the sentence-transformer, so tests never load a model.
+    """
+
+    def encode(self, texts, normalize_embeddings=True, **kwargs):
+        vectors = np.zeros((len(texts), 256), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                vectors[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % 256] += 1
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+@pytest.fixture(autouse=True)
+def isolated_local_stores(tmp_path, monkeypatch):
+    """
+    Keep graph runs from reading or writing the real report cache, SEC filing index, section store,
+    filing summary cache, news index and article cache, so state stored by one test (or a local run)
+    can never short-circuit another test.
+    """
+    monkeypatch.setattr("v2_llm_graph.src.agent_graph.REPORT_CACHE_PATH", str(tmp_path / "report_cache.sqlite"))
+    monkeypatch.setattr("v2_llm_graph.src.tools.sec_filings_cache.DEFAULT_SEC_INDEX_PATH",
+                        str(tmp_path / "sec_filing_index.sqlite"))
+    monkeypatch.setattr("v2_llm_graph.src.tools.sec_section_extractor.DEFAULT_SECTION_DIR",
+                        str(tmp_path / "sec_sections"))
+    monkeypatch.setattr("v2_llm_graph.src.workflows.filing_summarizer.DEFAULT_SUMMARY_CACHE_PATH",
+                        str(tmp_path / "filing_summaries.sqlite"))
+    monkeypatch.setattr("v2_llm_graph.src.tools.news_index.DEFAULT_NEWS_INDEX_PATH", str(tmp_path / "news_index.sqlite"))
+    monkeypatch.setattr("v2_llm_graph.src.memory.article_cache.DEFAULT_ARTICLE_CACHE_PATH",
+                        str(tmp_path / "article_analyses.sqlite"))
+    # Per-process stores shared across VectorMemory instances.
+    monkeypatch.setattr(vector_backends, "_memory_backends", {})
+    monkeypatch.setattr(lexical_index, "_indexes", {})
+
+
+@pytest.fixture(autouse=True)
+def shared_embedding_service(monkeypatch):
+    """
+    Serve every embedding from a WordHashModel behind a real EmbeddingService.
+    """
+    service = EmbeddingService(model=WordHashModel(), batch_window_ms=1)
+    monkeypatch.setattr(embedding_service, "_shared_service", service)
+    yield service
+    service.close()
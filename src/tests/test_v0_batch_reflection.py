@@ -0,0 +1,68 @@
+import copy
+
+import pytest
+
+from batch_reflection import score_reports
+from investment_research_agent import InvestmentResearchAgent
+
+RUN = '2025-10-17T09:00:00'
+
+
+def make_report(plan, results, timestamp=RUN):
+    return {'symbol': 'AAPL', 'timestamp': timestamp, 'plan': plan, 'results': results,
+            'reflection': {}, 'learned_insights': []}
+
+
+def step(timestamp=None, **data):
+    return {**data, 'timestamp': timestamp} if timestamp is not None else data
+
+
+REPORTS = {
+    'empty plan': make_report([], {}),
+    'empty plan with data': make_report([], {'financials': {'financials': {'insights': ['a']}}}),
+    'fresh and complete': make_report(['prices', 'financials', 'news'], {
+        'prices': step('2025-10-16T09:00:00'),
+        'financials': step('2025-10-17T08:00:00', financials={'insights': ['a', 'b']}),
+        'news': step('2025-10-15T00:00:00', news={'classified': [{'sentiment': 'negative'}, {'sentiment': 'positive'}]}),
+    }),
+    'missing timestamps': make_report(['prices', 'economic'], {'prices': step(), 'economic': step(data={})}),
+    'invalid timestamps': make_report(['prices', 'edgar'], {'prices': step('yesterday'), 'edgar': step('2025-13-40')}),
+    'steps missing from results': make_report(['prices', 'volatility_analysis'], {'prices': step(RUN)}),
+    'error steps': make_report(['prices', 'news', 'edgar'], {
+        'prices': step(RUN, error='timeout'),
+        'news': step('2025-10-16T00:00:00', error='rate limited', news={'classified': [{'sentiment': 'neutral'}]}),
+        'edgar': step(RUN),
+    }),
+    'age boundaries': make_report(['a', 'b', 'c'], {
+        'a': step('2025-10-10T09:00:01'),  # 6 days 23:59:59 old
+        'b': step('2025-10-10T09:00:00'),  # exactly 7 days old
+        'c': step('2025-10-10'),
+    }),
+    'negative ages': make_report(['prices', 'news'], {
+        'prices': step('2025-10-17T10:00:00'),  # an hour in the future
+        'news': step('2025-11-30T00:00:00'),
+    }),
+}
+
+
+@pytest.fixture
+def agent(tmp_path):
+    return InvestmentResearchAgent(memory_file=str(tmp_path / 'memory.json'), output_dir=str(tmp_path / 'reports'))
+
+
+def test_score_reports_matches_self_reflect(agent):
+    """Test the batch scorer returns exactly the reflection self_reflect gives each report"""
+    reports = list(REPORTS.values())
+    expected = [agent.self_reflect(copy.deepcopy(report)) for report in reports]
+
+    reflections = score_reports(reports)
+
+    for name, reflection, want in zip(REPORTS, reflections, expected):
+        assert reflection['scores'] == pytest.approx(want['scores']), name
+        assert reflection['avg_score'] == pytest.approx(want['avg_score']), name
+        assert reflection['feedback'] == want['feedback'], name
+    assert [report['reflection'] for report in reports] == reflections
+
+
+def test_score_reports_of_no_reports():
+    assert score_reports([]) == []
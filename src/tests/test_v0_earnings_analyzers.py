@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from earnings_analyzers import EarningsAnalyzer, EarningsCalendar
+
+
+@pytest.fixture
+def analyzer():
+    calendar = EarningsCalendar(pd.DataFrame({
+        'symbol': ['aapl', 'AAPL', 'MSFT'],
+        'date': ['2025-07-31', '2025-10-30', '2025-10-28'],
+        'eps_forecast': [1.43, 1.74, 3.67],
+        'revenue_forecast': [89.3, 101.72, 75.3],
+    }))
+    return EarningsAnalyzer(calendar)
+
+
+def test_analyze_universe_flags_every_symbol(analyzer):
+    financials = pd.DataFrame({
+        'symbol': ['AAPL', 'msft', 'TSLA'],
+        'revenue': [408.6e9, 70e9, 97.7e9],
+        'pe_ratio': [33.7, 28.0, None],
+    })
+
+    result = analyzer.analyze_universe(financials, as_of='2025-10-01')
+
+    assert list(result.index) == ['AAPL', 'MSFT', 'TSLA']
+    assert result['high_valuation_risk'].tolist() == [True, False, False]
+    assert result['risk_score'].tolist() == [1, 0, 0]
+    # Against the symbol's forecast, or REVENUE_THRESHOLD_B without one
+    assert result['strong_revenue'].tolist() == [True, False, False]
+    assert result['revenue_b'].round(1).tolist() == [408.6, 70.0, 97.7]
+
+
+def test_symbol_without_calendar_row_has_no_preview(analyzer):
+    result = analyzer.analyze_universe(pd.DataFrame({'symbol': ['TSLA'], 'revenue': [120e9]}), as_of='2025-10-01')
+
+    assert pd.isna(result.loc['TSLA', 'earnings_date'])
+    assert not result.loc['TSLA', 'stale']
+    assert result.loc['TSLA', 'strong_revenue']
+    assert analyzer.analyze({'revenue': 120e9}, 'TSLA')['insights'][-1] == 'earnings_preview: none scheduled for TSLA'
+
+
+@pytest.mark.parametrize('as_of, date, eps, stale', [
+    ('2025-07-01', '2025-07-31', 1.43, False),
+    ('2025-07-31', '2025-07-31', 1.43, False),
+    ('2025-08-01', '2025-10-30', 1.74, False),
+    ('2025-11-01', '2025-10-30', 1.74, True),
+])
+def test_preview_selection_by_as_of(analyzer, as_of, date, eps, stale):
+    """Test the next preview on or after as_of is chosen, and a past one is only returned as stale"""
+    preview = analyzer.calendar.preview('aapl', as_of)
+
+    assert (preview['date'], preview['eps_forecast'], preview['stale']) == (date, eps, stale)
+
+
+def test_analyze_labels_a_past_preview_as_stale(analyzer):
+    upcoming = analyzer.analyze({'revenue': 408.6e9}, 'AAPL', as_of='2025-10-01')['insights']
+    insights = analyzer.analyze({'revenue': 408.6e9}, 'AAPL', as_of='2025-11-15')['insights']
+
+    assert upcoming[-1] == 'earnings_preview: 2025-10-30, EPS $1.74, Rev $101.72B'
+
+    assert insights[-1].startswith('earnings_preview: stale, last 2025-10-30')
+    assert 'none scheduled for AAPL' in insights[-1]
@@ -0,0 +1,100 @@
+import threading
+import time
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from investment_research_agent import InvestmentResearchAgent
+from memoized_router import MemoizedToolRouter
+
+
+def counting_tool(calls, result=None, delay=0.0):
+    """A tool that records every fetch and returns a fresh payload per call"""
+    def tool(symbol, **kwargs):
+        time.sleep(delay)
+        calls.append(symbol)
+        return result(len(calls)) if result else {'data': len(calls), 'timestamp': datetime.now().isoformat()}
+    return tool
+
+
+@pytest.fixture
+def router():
+    """A MemoizedToolRouter whose tools never touch the network"""
+    router = MemoizedToolRouter()
+    router.calls = {task: [] for task in router.tools}
+    router.tools = {task: counting_tool(router.calls[task]) for task in router.tools}
+    return router
+
+
+def test_concurrent_callers_share_one_fetch(router):
+    """Test that threads asking for the same step wait for the first fetch instead of repeating it"""
+    router.tools['prices'] = counting_tool(router.calls['prices'], delay=0.05)
+    start = threading.Barrier(8)
+    results = []
+
+    def worker():
+        start.wait()
+        results.append(router.route('prices', 'AAPL'))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert router.calls['prices'] == ['AAPL']
+    assert all(result is results[0] for result in results)
+    assert router.stats == {'hits': 7, 'misses': 1}
+
+
+def test_shared_steps_are_fetched_once_per_batch(router):
+    """Test that symbol-independent steps are shared across symbols and the rest are not"""
+    for symbol in ('AAPL', 'TSLA', 'AAPL'):
+        router.route('economic', symbol)
+        router.route('prices', symbol)
+    router.route('prices', 'AAPL', period='5d')
+
+    assert router.calls['economic'] == ['AAPL']
+    assert router.calls['prices'] == ['AAPL', 'TSLA', 'AAPL']
+    assert router.stats == {'hits': 3, 'misses': 4}
+
+
+def test_refresh_replaces_the_cached_entry(router):
+    first = router.route('news', 'AAPL')
+    refreshed = router.route('news', 'AAPL', refresh=True)
+
+    assert refreshed['data'] == 2 and first['data'] == 1
+    assert router.route('news', 'AAPL') is refreshed
+    assert len(router.calls['news']) == 2
+
+
+def test_errors_are_not_cached(router):
+    router.tools['edgar'] = MagicMock(side_effect=[RuntimeError("down"), {'filing': {}}])
+
+    with pytest.raises(RuntimeError):
+        router.route('edgar', 'AAPL')
+
+    assert router.route('edgar', 'AAPL') == {'filing': {}}
+
+
+def test_refinement_refetches_through_the_cache(router, tmp_path):
+    """Test that the step research() refines is fetched again rather than served from the batch cache"""
+    router.tools['financials'] = counting_tool(router.calls['financials'], result=lambda n: {
+        'financials': {'insights': [f'fetch {n}'], 'risk_score': 0}, 'timestamp': datetime.now().isoformat()})
+    agent = InvestmentResearchAgent(memory_file=str(tmp_path / 'memory.json'), tool_router=router,
+                                    output_dir=str(tmp_path / 'reports'))
+    verdicts = iter([({'completeness': 1.0, 'accuracy': 1.0, 'depth': 0.0}, 0.6),
+                     ({'completeness': 1.0, 'accuracy': 1.0, 'depth': 1.0}, 1.0)])
+
+    def reflect(report):
+        scores, avg_score = next(verdicts)
+        report['reflection'] = {'scores': scores, 'feedback': 'stub', 'avg_score': avg_score}
+        return report['reflection']
+    agent.self_reflect = reflect
+
+    report = agent.research('AAPL')
+
+    assert len(router.calls['financials']) == 2
+    assert report['results']['financials']['financials']['insights'] == ['fetch 2']
+    assert len(router.calls['prices']) == 1
@@ -0,0 +1,68 @@
+import json
+import os
+
+import pytest
+
+from report_writer import SIDECAR_MIN_LENGTH, SIDECAR_REF, ReportWriter, load_report, preview
+
+
+def make_report(closes=None):
+    results = {
+        'financials': {'financials': {'insights': ['high_valuation_risk: PE above historical avg'], 'risk_score': 1},
+                       'timestamp': '2025-10-17T09:00:00'},
+        'economic': {'data': {'gdp_growth': '3.3%', 'value': 30485.729}, 'timestamp': '2025-10-17T09:00:00'},
+    }
+    if closes is not None:
+        results['prices'] = {'data': {'Close': closes, 'Note': ['short', 'list']}, 'timestamp': '2025-10-17T09:00:00'}
+    return {
+        'symbol': 'AAPL', 'timestamp': '2025-10-17T09:00:01', 'plan': list(results), 'results': results,
+        'reflection': {'scores': {'completeness': 1.0}, 'feedback': 'Avg 0.90: Excellent', 'avg_score': 0.9},
+        'learned_insights': ['high_risk'],
+    }
+
+
+@pytest.fixture
+def writer(tmp_path):
+    return ReportWriter(str(tmp_path))
+
+
+def test_round_trip_restores_sidecar_arrays(writer):
+    report = make_report([245.27 + i for i in range(SIDECAR_MIN_LENGTH)] + [250])
+
+    paths = writer.write(report)
+
+    assert os.path.exists(paths['sidecar'])
+    with open(paths['json']) as f:
+        assert SIDECAR_REF in json.load(f)['results']['prices']['data']['Close']
+    assert load_report(paths['json']) == report
+
+
+def test_report_without_arrays_removes_an_old_sidecar(writer):
+    old = writer.write(make_report([1.0] * SIDECAR_MIN_LENGTH))
+    report = make_report()
+
+    paths = writer.write(report)
+
+    assert 'sidecar' not in paths and not os.path.exists(old['sidecar'])
+    assert load_report(paths['json']) == report
+
+
+def test_custom_json_path_gets_its_own_sidecar(writer, tmp_path):
+    report = make_report([0.5] * SIDECAR_MIN_LENGTH)
+
+    paths = writer.write(report, str(tmp_path / 'out' / 'custom.json'))
+
+    assert paths['sidecar'] == str(tmp_path / 'out' / 'custom.npz')
+    assert load_report(paths['json']) == report
+
+
+@pytest.mark.parametrize('data', [
+    make_report([1.5] * 100)['results'],
+    {'short': [1, 2], 'text': 'x' * 500},
+    {'nested': {'values': list(range(10))}},
+    ['a', None, True, 2.5],
+    {},
+])
+def test_preview_matches_indented_dump(data):
+    assert preview(data) == json.dumps(data, indent=2)[:200]
+    assert preview(data, 37) == json.dumps(data, indent=2)[:37]
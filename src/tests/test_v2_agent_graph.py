@@ -12,7 +12,8 @@ from v2_llm_graph.src.agent_graph import (
     save_to_memory_node,
     should_refine_or_end,
     workflow,
-    app
+    app,
+    stream_report,
 )
 
 @pytest.fixture
@@ -140,6 +141,42 @@ def test_should_refine_or_end_needs_revision(mock_llm, mock_state):
     # Assert
     assert result == "refine"
 
+@patch('v2_llm_graph.src.agent_graph.llm')
+def test_should_refine_or_end_uses_structured_verdict(mock_llm, mock_state):
+    """
+    Test that the evaluator's verdict line decides without an extra LLM round trip.
+    """
+    # Arrange
+    mock_state['feedback'] = "- The analysis is balanced.\nVERDICT: ACCEPT"
+    mock_state['revision_count'] = 1
+    
+    # Act
+    result = should_refine_or_end(mock_state)
+    
+    # Assert
+    assert result == "end"
+    mock_llm.generate_content.assert_not_called()
+
+@patch('v2_llm_graph.src.agent_graph.fast_llm')
+@patch('v2_llm_graph.src.agent_graph.llm')
+def test_should_refine_or_end_after_evaluation_failure(mock_llm, mock_fast_llm, mock_state):
+    """
+    Test that a failed evaluation ends the run instead of refining on an error string.
+    """
+    # Arrange
+    mock_state['draft_report'] = "Draft"
+    mock_state['revision_count'] = 1
+    mock_fast_llm.generate_content.side_effect = Exception("API Error")
+    mock_state['feedback'] = evaluate_report_node(mock_state)['feedback']
+    
+    # Act
+    result = should_refine_or_end(mock_state)
+    
+    # Assert
+    assert mock_state['feedback'].startswith("Evaluation failed")
+    assert result == "end"
+    mock_llm.generate_content.assert_not_called()
+
 @patch('v2_llm_graph.src.agent_graph.VectorMemory')
 def test_save_to_memory_node(mock_vector_memory, mock_state):
     """
@@ -156,6 +193,37 @@ def test_save_to_memory_node(mock_vector_memory, mock_state):
     mock_instance.add_analysis.assert_called_once_with("TEST", "Final analysis report")
     assert result == {}
 
+@patch('v2_llm_graph.src.agent_graph.VectorMemory')
+def test_save_to_memory_node_skips_error_report(mock_vector_memory, mock_state):
+    """
+    Test that a failed synthesis is not persisted to memory.
+    """
+    # Arrange
+    mock_state['draft_report'] = "Error generating report: API timeout"
+    mock_instance = mock_vector_memory.return_value
+    
+    # Act
+    result = save_to_memory_node(mock_state)
+    
+    # Assert
+    mock_instance.add_analysis.assert_not_called()
+    assert result == {}
+
+@patch('v2_llm_graph.src.agent_graph.llm')
+def test_evaluate_report_node_skips_error_report(mock_llm, mock_state):
+    """
+    Test that evaluation does not spend an LLM call on a failed draft.
+    """
+    # Arrange
+    mock_state['draft_report'] = "Error generating report: API timeout"
+    
+    # Act
+    result = evaluate_report_node(mock_state)
+    
+    # Assert
+    assert "skipped" in result["feedback"]
+    mock_llm.generate_content.assert_not_called()
+
 def test_workflow_structure():
     """
     Test that the workflow graph is properly structured.
@@ -186,4 +254,73 @@ def test_synthesize_report_node(mock_llm, mock_state):
     assert "draft_report" in result
     assert result["draft_report"] == "Synthesized report"
     assert "revision_count" in result
-    assert result["revision_count"] == 1
\ No newline at end of file
+    assert result["revision_count"] == 1
+    assert result["prompt_tokens"]["synthesize_report"]["total"] > 0
+
+
+@patch('v2_llm_graph.src.agent_graph.llm')
+@patch('v2_llm_graph.src.agent_graph.build_prompt', side_effect=ValueError("budget too small"))
+def test_refine_report_node_keeps_draft_when_prompt_assembly_fails(mock_build_prompt, mock_llm, mock_state):
+    """
+    Test that a prompt assembly error takes the refinement error path instead of crashing.
+    """
+    mock_state["draft_report"] = "Draft report"
+    mock_state["prompt_tokens"] = {"synthesize_report": {"total": 10}}
+
+    result = refine_report_node(mock_state)
+
+    assert result["final_report"] == "Draft report"
+    assert result["prompt_tokens"] == {"synthesize_report": {"total": 10}}
+    mock_llm.generate_content.assert_not_called()
+
+
+@patch('v2_llm_graph.src.agent_graph.get_cached_sec_filings')
+@patch('v2_llm_graph.src.agent_graph.VectorMemory')
+@patch('v2_llm_graph.src.agent_graph.get_company_news')
+@patch('v2_llm_graph.src.agent_graph.get_macro_economic_data')
+@patch('v2_llm_graph.src.agent_graph.get_stock_fundamentals')
+@patch('v2_llm_graph.src.agent_graph.fast_llm')
+@patch('v2_llm_graph.src.agent_graph.llm')
+def test_stream_report_emits_tokens_and_writes_sink(mock_llm, mock_fast_llm, mock_stock, mock_macro, mock_news,
+                                                    mock_memory, mock_sec, mock_state, tmp_path):
+    """
+    Test that report tokens are streamed to the callback and the sink file while the graph runs.
+    """
+    # Arrange
+    mock_stock.return_value = {"financials": "data"}
+    mock_macro.return_value = {"macro": "data"}
+    mock_news.return_value = {"articles": []}
+    mock_sec.return_value = {}
+    mock_memory.return_value.query_memory.return_value = []
+
+    def generate(prompt, stream=False, **kwargs):
+        if stream:
+            return iter([MagicMock(text="Streamed "), MagicMock(text="report")])
+        return MagicMock(text="Looks good.\nVERDICT: ACCEPT")
+    mock_llm.generate_content.side_effect = generate
+    mock_fast_llm.generate_content.side_effect = generate
+    tokens = []
+    sink = tmp_path / "report.md"
+
+    # Act
+    final_state = stream_report(mock_state, on_token=lambda node, text: tokens.append((node, text)),
+                                sink_path=str(sink))
+
+    # Assert
+    assert tokens == [("synthesize_report", "Streamed "), ("synthesize_report", "report")]
+    assert final_state["draft_report"] == "Streamed report"
+    assert sink.read_text() == "Streamed report"
+
+
+@patch('v2_llm_graph.src.agent_graph.flush_memory_backends')
+@patch('v2_llm_graph.src.agent_graph.app')
+def test_stream_report_flushes_memory_when_the_run_fails(mock_app, mock_flush, mock_state):
+    """
+    Test that analyses already stored in the in-memory backend are flushed even if streaming fails.
+    """
+    mock_app.stream.side_effect = RuntimeError("graph failed")
+
+    with pytest.raises(RuntimeError):
+        stream_report(mock_state)
+
+    mock_flush.assert_called_once()
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from v2_llm_graph.src.memory.ann_benchmark import benchmark, recall_at_k, synthetic_embeddings
+from v2_llm_graph.src.memory.ann_index import IVFIndex, dequantize, quantize, similarities
+from v2_llm_graph.src.memory.vector_backends import InMemoryBackend
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    return synthetic_embeddings(3000, 64, n_clusters=32, noise=1.0, seed=1)
+
+
+def test_int8_quantization_keeps_similarities_close(vectors):
+    codes, scales = quantize(vectors, "int8")
+
+    assert codes.dtype == np.int8 and scales.shape == (len(vectors),)
+    assert np.abs(dequantize(codes, scales) - vectors).max() < 0.01
+    assert np.abs(similarities(codes, scales, vectors[0]) - vectors @ vectors[0]).max() < 0.02
+
+
+def test_quantize_rejects_unknown_dtype(vectors):
+    with pytest.raises(ValueError):
+        quantize(vectors, "int4")
+    with pytest.raises(ValueError):
+        InMemoryBackend(dtype="int4")
+
+
+@pytest.mark.parametrize("dtype, ratio", [("float16", 0.5), ("int8", 0.25)])
+def test_smaller_dtypes_cut_memory(vectors, dtype, ratio):
+    ids = [str(i) for i in range(len(vectors))]
+    full, small = InMemoryBackend(), InMemoryBackend(dtype=dtype)
+    for backend in (full, small):
+        backend.add(ids, vectors, ids, [None] * len(ids))
+
+    assert small.memory_bytes() <= full.memory_bytes() * (ratio + 0.05)
+    assert recall_at_k([[h["id"] for h in small.query(v, 10)] for v in vectors[:20]],
+                       [[h["id"] for h in full.query(v, 10)] for v in vectors[:20]]) > 0.9
+    assert np.allclose(small.get_all()["embeddings"], vectors, atol=0.01)
+
+
+def test_ivf_recall_grows_with_n_probe(vectors):
+    index = IVFIndex(n_lists=16, n_probe=1)
+    index.train(vectors)
+    index.add(vectors, 0)
+
+    def recall(n_probe):
+        index.n_probe = n_probe
+        found = [index.candidates(v)[np.argsort(-(vectors[index.candidates(v)] @ v))[:10]] for v in vectors[:50]]
+        return recall_at_k(found, [np.argsort(-(vectors @ v))[:10] for v in vectors[:50]])
+
+    assert len(index.candidates(vectors[0])) < len(vectors)
+    assert recall(1) <= recall(4) <= recall(16) == 1.0
+    assert recall(4) > 0.8
+
+
+def test_backend_index_covers_later_adds_and_keeps_filters_exact(vectors):
+    ids = [str(i) for i in range(len(vectors))]
+    metadatas = [{"ticker": "NVDA" if i % 2 else "AAPL"} for i in range(len(vectors))]
+    backend = InMemoryBackend(dtype="int8")
+    backend.add(ids[:2000], vectors[:2000], ids[:2000], metadatas[:2000])
+    backend.build_index(n_lists=16, n_probe=4)
+    backend.add(ids[2000:], vectors[2000:], ids[2000:], metadatas[2000:])
+
+    assert backend.query(vectors[2500], 1)[0]["id"] == "2500"
+    assert backend.query(vectors[2500], 1, where={"ticker": "AAPL"})[0]["id"] == "2500"
+    assert all(hit["metadata"]["ticker"] == "NVDA" for hit in backend.query(vectors[2500], 5, where={"ticker": "NVDA"}))
+
+
+def test_benchmark_reports_recall_latency_and_memory():
+    rows = benchmark(n=2000, dim=32, n_queries=10, k=5, dtypes=("float32", "int8"), n_lists=8, n_probes=(1, 8))
+
+    assert [(row["dtype"], row["n_probe"]) for row in rows] == [
+        ("float32", None), ("float32", 1), ("float32", 8), ("int8", None), ("int8", 1), ("int8", 8)]
+    assert rows[0]["recall"] == 1.0 and rows[2]["recall"] == 1.0
+    assert rows[1]["recall"] <= rows[2]["recall"]
+    assert rows[3]["memory_mb"] < rows[0]["memory_mb"] / 2
+    assert all(row["latency_ms"] > 0 for row in rows)
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+from unittest.mock import patch
+
+from v2_llm_graph.src.agent_graph import analyze_articles
+from v2_llm_graph.src.memory.article_cache import ArticleAnalysisCache, content_key
+
+ANALYSIS = {"reasoning": "Demand is strong.", "sentiment": "Positive",
+            "key_takeaways": ["Record revenue"], "summary": "Nvidia beat estimates."}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    article_cache = ArticleAnalysisCache(str(tmp_path / "articles.sqlite"))
+    yield article_cache
+    article_cache.close()
+
+
+def test_key_ignores_formatting_and_truncation_marker():
+    """Test that case, whitespace and NewsAPI's truncation marker do not change the key"""
+    text = "Nvidia reported record  revenue.\nShares rose."
+    copy = "NVIDIA reported record revenue. Shares rose.… [+2345 chars]"
+
+    assert content_key(text, "1") == content_key(copy, "1")
+    assert content_key(text, "1") != content_key(text, "2")
+
+
+def test_get_returns_stored_analysis_for_same_prompt_version(cache):
+    """Test an analysis is reused for identical content and not across prompt versions"""
+    cache.put("Nvidia beat estimates.", "1", ANALYSIS)
+
+    assert cache.get("Nvidia beat estimates.", "1") == ANALYSIS
+    assert cache.get("Nvidia beat estimates.", "2") is None
+
+
+def test_failed_analyses_are_not_stored(cache):
+    """Test that analyses with an error are retried next time instead of being cached"""
+    cache.put("Some article", "1", {"error": "Failed to parse JSON", "raw_response": "oops"})
+
+    assert cache.get("Some article", "1") is None
+
+
+def test_entries_older_than_max_age_are_evicted(tmp_path):
+    """Test that stale entries are ignored and deleted when the cache is opened"""
+    path = str(tmp_path / "articles.sqlite")
+    cache = ArticleAnalysisCache(path, max_age_days=1)
+    cache.put("Old article", "1", ANALYSIS)
+    cache.conn.execute("UPDATE article_analyses SET created_at = ?", (time.time() - 2 * 86400,))
+    cache.conn.commit()
+
+    assert cache.get("Old article", "1") is None
+    cache.close()
+
+    reopened = ArticleAnalysisCache(path, max_age_days=1)
+    assert reopened.conn.execute("SELECT COUNT(*) FROM article_analyses").fetchone()[0] == 0
+    reopened.close()
+
+
+@patch('v2_llm_graph.src.agent_graph.llm')
+@patch('v2_llm_graph.src.agent_graph.analyze_article_chain')
+def test_analyze_articles_only_calls_llm_for_new_content(mock_analyze, mock_llm):
+    """Test a story syndicated for two tickers is analyzed once, and once per run after that"""
+    mock_analyze.return_value = ANALYSIS
+    articles = [{"content": "Chip demand lifts Nvidia and TSMC."}, {"content": "chip demand lifts nvidia and TSMC. "}]
+
+    first = analyze_articles(articles)
+    second = analyze_articles([{"content": "Chip demand lifts Nvidia and TSMC."}])
+
+    assert first == [ANALYSIS, ANALYSIS]
+    assert second == [ANALYSIS]
+    mock_analyze.assert_called_once()
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import httpx
+import pytest
+from unittest.mock import patch, AsyncMock
+
+from v2_llm_graph.src.agent_graph import agather_data_node, analyze_companies_async
+from v2_llm_graph.src.tools.async_fetchers import (
+    aget_company_news,
+    aget_latest_sec_filings,
+    aget_macro_economic_data,
+    close_async_client,
+    get_async_client,
+)
+
+
+def mock_client(handler):
+    """Build an AsyncClient whose requests are answered by `handler` instead of the network"""
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_macro_data_fetches_series_concurrently():
+    """Test that every FRED series is requested and parsed, with '.' treated as missing"""
+    values = {"GDP": "29000.5", "UNRATE": "4.1", "CPIAUCSL": "315.2", "FEDFUNDS": "."}
+    requested = []
+
+    def handler(request):
+        series_id = request.url.params["series_id"]
+        requested.append(series_id)
+        return httpx.Response(200, json={"observations": [{"value": values[series_id]}]})
+
+    async def run():
+        async with mock_client(handler) as client:
+            return await aget_macro_economic_data("fake_key", client=client)
+
+    result = asyncio.run(run())
+
+    assert sorted(requested) == sorted(values)
+    assert result == {"GDP_Growth": 29000.5, "UnemploymentRate": 4.1, "InflationRate_CPI": 315.2,
+                      "EffectiveFedFundsRate": None}
+
+
+def test_company_news_success_and_api_error():
+    """Test article processing and the NewsAPI error status"""
+    payload = {"status": "ok", "articles": [{
+        "source": {"name": "Wire"}, "title": "Title", "url": "http://a.com",
+        "publishedAt": "2025-10-18T10:00:00Z", "content": None,
+    }]}
+
+    async def run(response_json):
+        async with mock_client(lambda request: httpx.Response(200, json=response_json)) as client:
+            return await aget_company_news("Test Company", "fake_key", num_articles=1, client=client)
+
+    result = asyncio.run(run(payload))
+    assert result["articles"][0]["url"] == "http://a.com"
+    assert result["articles"][0]["content"] == "No content available."
+
+    assert asyncio.run(run({"status": "error"})) == {"error": "Failed to fetch news from NewsAPI."}
+
+
+def test_sec_filings_success_and_transport_error():
+    """Test the latest filing is extracted and network failures return an error dict"""
+    filing = {"formType": "10-Q", "filedAt": "2025-08-01T16:00:00-04:00", "linkToFilingDetails": "http://sec/1"}
+
+    async def run(handler):
+        async with mock_client(handler) as client:
+            return await aget_latest_sec_filings("TEST", "fake_key", client=client)
+
+    queries = []
+
+    def handler(request):
+        queries.append(json.loads(request.content)["query"]["query_string"]["query"])
+        return httpx.Response(200, json={"filings": [filing]})
+
+    result = asyncio.run(run(handler))
+    assert queries == ['ticker:TEST AND formType:("10-K" OR "10-Q")']
+    assert result["filing_type"] == "10-Q"
+    assert result["filed_at"] == filing["filedAt"]
+
+    def fail(request):
+        raise httpx.ConnectError("unreachable")
+    assert "error" in asyncio.run(run(fail))
+
+
+def test_shared_client_is_reused_per_loop():
+    """Test that fetchers on one loop share a single pooled client"""
+    async def run():
+        first, second = get_async_client(), get_async_client()
+        await close_async_client()
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first is second
+    assert first.is_closed
+
+
+@patch('v2_llm_graph.src.agent_graph.aget_company_news', new_callable=AsyncMock)
+@patch('v2_llm_graph.src.agent_graph.aget_macro_economic_data', new_callable=AsyncMock)
+@patch('v2_llm_graph.src.agent_graph.aget_stock_fundamentals', new_callable=AsyncMock)
+def test_async_gather_node_handles_failures(mock_stock, mock_macro, mock_news):
+    """Test the async data node gathers all sources and maps a failure to an error dict"""
+    mock_stock.return_value = {"ticker": "TEST"}
+    mock_macro.side_effect = RuntimeError("FRED down")
+    mock_news.return_value = {"articles": []}
+
+    result = asyncio.run(agather_data_node({"company_name": "Test Corp", "company_ticker": "TEST"}))
+
+    assert result["financial_data"] == {"ticker": "TEST"}
+    assert result["macro_data"]["error"] == "FRED down"
+    assert result["news_data"]["articles"] == []
+
+
+@patch('v2_llm_graph.src.agent_graph.flush_memory_backends')
+@patch('v2_llm_graph.src.agent_graph.prefetch_sec_filings')
+@patch('v2_llm_graph.src.agent_graph.app')
+def test_async_batch_flushes_memory_once(mock_app, mock_prefetch, mock_flush):
+    """Test that analyses stored during an async batch are flushed to disk when it ends"""
+    mock_app.ainvoke = AsyncMock(side_effect=lambda state: {"company_ticker": state["company_ticker"]})
+
+    results = asyncio.run(analyze_companies_async([("A Corp", "AAA"), ("B Corp", "BBB")]))
+
+    assert results == {"AAA": {"company_ticker": "AAA"}, "BBB": {"company_ticker": "BBB"}}
+    mock_flush.assert_called_once()
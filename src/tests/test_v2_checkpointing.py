@@ -0,0 +1,120 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+from v2_llm_graph.src.agent_graph import build_app, run_analysis, run_batch
+from v2_llm_graph.src.memory.checkpoint_store import open_checkpointer, run_status
+
+
+@pytest.fixture
+def checkpointer(tmp_path):
+    """
+    A SQLite checkpointer in a temporary database.
+    """
+    return open_checkpointer(str(tmp_path / "checkpoints.sqlite"))
+
+
+@pytest.fixture
+def mock_tools():
+    """
+    Patch every external call the graph makes so runs are fast and countable.
+    """
+    with patch('v2_llm_graph.src.agent_graph.get_stock_fundamentals') as mock_stock, \
+         patch('v2_llm_graph.src.agent_graph.get_macro_economic_data') as mock_macro, \
+         patch('v2_llm_graph.src.agent_graph.get_company_news') as mock_news, \
+         patch('v2_llm_graph.src.agent_graph.get_cached_sec_filings') as mock_sec, \
+         patch('v2_llm_graph.src.agent_graph.refresh_filing_index'), \
+         patch('v2_llm_graph.src.agent_graph.VectorMemory') as mock_memory, \
+         patch('v2_llm_graph.src.agent_graph.llm') as mock_llm, \
+         patch('v2_llm_graph.src.agent_graph.fast_llm') as mock_fast_llm:
+        mock_stock.return_value = {"financials": "data"}
+        mock_macro.return_value = {"macro": "data"}
+        mock_news.return_value = {"articles": []}
+        mock_sec.return_value = {"10-K": "filing"}
+        mock_memory.return_value.query_memory.return_value = []
+        response = MagicMock(text="Report text.\nVERDICT: ACCEPT")
+        mock_llm.generate_content.return_value = response
+        mock_fast_llm.generate_content.return_value = response
+        yield {"stock": mock_stock, "sec": mock_sec, "llm": mock_llm}
+
+
+def initial_state(ticker="TEST"):
+    return {"company_name": f"{ticker} Corp", "company_ticker": ticker, "revision_count": 0}
+
+
+def test_run_resumes_after_last_completed_node(checkpointer, mock_tools):
+    """
+    Test that a run interrupted mid-graph resumes without repeating completed nodes.
+    """
+    # Arrange - the process "dies" while fetching SEC filings
+    mock_tools["sec"].side_effect = [RuntimeError("crash"), {"10-K": "filing"}]
+    with pytest.raises(RuntimeError):
+        run_analysis(initial_state(), "run-1", checkpointer)
+    assert run_status(build_app(checkpointer), "run-1") == "in_progress"
+
+    # Act
+    final_state = run_analysis(initial_state(), "run-1", checkpointer)
+
+    # Assert
+    assert mock_tools["stock"].call_count == 1
+    assert mock_tools["sec"].call_count == 2
+    assert final_state["draft_report"] == "Report text.\nVERDICT: ACCEPT"
+    assert run_status(build_app(checkpointer), "run-1") == "complete"
+
+
+def test_completed_run_is_loaded_not_rerun(checkpointer, mock_tools):
+    """
+    Test that a finished run returns its saved state without calling any tool or model.
+    """
+    first = run_analysis(initial_state(), "run-2", checkpointer)
+    calls = mock_tools["llm"].generate_content.call_count
+
+    second = run_analysis(initial_state(), "run-2", checkpointer)
+
+    assert second["draft_report"] == first["draft_report"]
+    assert mock_tools["stock"].call_count == 1
+    assert mock_tools["llm"].generate_content.call_count == calls
+
+
+def test_batch_restart_only_redoes_unfinished_tickers(checkpointer, mock_tools):
+    """
+    Test that rerunning a batch skips finished tickers and resumes the failed one.
+    """
+    # Arrange - the second ticker fails on its first attempt
+    mock_tools["sec"].side_effect = [{"10-K": "filing"}, RuntimeError("crash"), {"10-K": "filing"}]
+    companies = [("First Corp", "AAA"), ("Second Corp", "BBB")]
+
+    first_pass = run_batch(companies, "batch-1", checkpointer)
+    assert first_pass["AAA"] is not None
+    assert first_pass["BBB"] is None
+
+    # Act
+    second_pass = run_batch(companies, "batch-1", checkpointer)
+
+    # Assert - AAA was loaded from its checkpoint and BBB resumed at the SEC fetch
+    assert second_pass["AAA"]["company_ticker"] == "AAA"
+    assert second_pass["BBB"]["company_ticker"] == "BBB"
+    assert mock_tools["stock"].call_count == 2
+    assert mock_tools["sec"].call_count == 3
+
+
+def test_batch_prints_llm_latency_report(checkpointer, mock_tools, capsys):
+    """
+    Test that a batch ends with the per-call-site LLM latency report.
+    """
+    run_batch([("First Corp", "AAA")], "batch-2", checkpointer)
+
+    output = capsys.readouterr().out
+    assert "--- [LLM Latency Report] ---" in output
+    assert "synthesize_report: n=" in output
+
+
+def test_single_runs_flush_memory_and_batches_flush_once(checkpointer, mock_tools):
+    """
+    Test that in-memory vector entries reach disk after a standalone run, and once per batch.
+    """
+    with patch('v2_llm_graph.src.agent_graph.flush_memory_backends') as mock_flush:
+        run_analysis(initial_state(), "run-4", checkpointer)
+        assert mock_flush.call_count == 1
+
+        run_batch([("First Corp", "AAA"), ("Second Corp", "BBB")], "batch-3", checkpointer)
+        assert mock_flush.call_count == 2
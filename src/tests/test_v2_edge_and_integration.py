@@ -119,7 +119,8 @@ def test_full_workflow_success():
          patch('v2_llm_graph.src.agent_graph.get_macro_economic_data') as mock_macro, \
          patch('v2_llm_graph.src.agent_graph.get_company_news') as mock_news, \
          patch('v2_llm_graph.src.agent_graph.VectorMemory') as mock_memory, \
-         patch('v2_llm_graph.src.agent_graph.llm') as mock_llm:
+         patch('v2_llm_graph.src.agent_graph.llm') as mock_llm, \
+         patch('v2_llm_graph.src.agent_graph.fast_llm') as mock_fast_llm:
         
         # Arrange
         mock_stock.return_value = {"financials": "test_data"}
@@ -134,6 +135,7 @@ def test_full_workflow_success():
         mock_llm_response = MagicMock()
         mock_llm_response.text = "Test response"
         mock_llm.generate_content.return_value = mock_llm_response
+        mock_fast_llm.generate_content.return_value = mock_llm_response
         
         initial_state = AgentState(
             company_name="Integration Test Corp",
@@ -0,0 +1,93 @@
+import threading
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+
+from v2_llm_graph.src.memory.embedding_service import EmbeddingService, load_embedding_model
+
+
+class RecordingModel:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        return np.array([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+
+
+def test_embed_returns_one_vector_per_text():
+    service = EmbeddingService(model=RecordingModel(), batch_window_ms=0)
+
+    assert service.embed(["a", "abc"]) == [[1.0, 1.0], [3.0, 1.0]]
+    assert service.embed([]) == []
+    service.close()
+
+
+def test_concurrent_requests_are_micro_batched():
+    """Test that requests from several threads within the window share one encode call"""
+    model = RecordingModel()
+    service = EmbeddingService(model=model, batch_window_ms=200)
+    results = {}
+    start = threading.Barrier(8)
+
+    def worker(i):
+        start.wait()
+        results[i] = service.embed(["x" * i])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    service.close()
+
+    assert {i: vectors[0][0] for i, vectors in results.items()} == {i: float(i) for i in range(1, 9)}
+    assert len(model.calls) < 8
+    assert sum(len(call) for call in model.calls) == 8
+
+
+def test_batch_size_caps_each_encode_call():
+    model = RecordingModel()
+    service = EmbeddingService(model=model, batch_window_ms=50, max_batch_size=2)
+    threads = [threading.Thread(target=service.embed, args=(["t"],)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    service.close()
+
+    assert all(len(call) <= 2 for call in model.calls)
+
+
+def test_encode_errors_reach_the_caller():
+    model = MagicMock()
+    model.encode.side_effect = RuntimeError("model crashed")
+    service = EmbeddingService(model=model, batch_window_ms=0)
+
+    with pytest.raises(RuntimeError, match="model crashed"):
+        service.embed(["text"])
+    service.close()
+
+
+def test_embed_after_close_raises():
+    """Test that a closed service rejects requests instead of queueing them forever"""
+    service = EmbeddingService(model=RecordingModel(), batch_window_ms=0)
+    service.close()
+    service.close()
+
+    with pytest.raises(RuntimeError, match="closed"):
+        service.embed(["text"])
+
+
+def test_offline_loading_never_downloads():
+    """Test that a local path or offline mode loads with local_files_only"""
+    sentence_transformers = MagicMock()
+    mock_transformer = sentence_transformers.SentenceTransformer
+    with patch.dict('sys.modules', {'sentence_transformers': sentence_transformers}):
+        load_embedding_model(model_path="/models/minilm")
+        load_embedding_model(model_name="sentence-transformers/all-MiniLM-L6-v2", offline=True, revision="abc123")
+    mock_transformer.assert_any_call("/models/minilm", local_files_only=True)
+    mock_transformer.assert_called_with("sentence-transformers/all-MiniLM-L6-v2", revision="abc123",
+                                        local_files_only=True)
+
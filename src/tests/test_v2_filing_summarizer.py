@@ -0,0 +1,89 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+from v2_llm_graph.src.agent_graph import summarize_filings_node
+from v2_llm_graph.src.llm.resilient_client import CallPolicy
+from v2_llm_graph.src.workflows.filing_summarizer import (
+    DIGEST_TOKENS,
+    chunk_section,
+    summarize_filing_sections,
+)
+from v2_llm_graph.src.workflows.prompt_builder import estimate_tokens
+
+FAST_POLICY = CallPolicy(deadline=5.0, max_retries=0)
+
+
+def long_section(paragraphs=60, marker=""):
+    return "\n".join(f"Paragraph {i}{marker if i == 30 else ''}: " + "risk " * 150 for i in range(paragraphs))
+
+
+@pytest.fixture
+def summary_llm():
+    """A model whose chunk summaries and reduce outputs are short fixed strings"""
+    mock_llm = MagicMock()
+
+    def generate(prompt, **kwargs):
+        if "combining partial summaries" in prompt:
+            return MagicMock(text="- merged digest " + "x " * 20)
+        return MagicMock(text="- chunk summary " + "y " * 60)
+    mock_llm.generate_content.side_effect = generate
+    return mock_llm
+
+
+def chunk_calls(mock_llm):
+    return [c for c in mock_llm.generate_content.call_args_list if "Excerpt" in c[0][0]]
+
+
+def test_chunking_is_bounded_and_content_defined():
+    """Test chunk size bounds, and that an edit leaves the chunks before it unchanged"""
+    original = chunk_section(long_section())
+    edited = chunk_section(long_section(marker=" (amended)"))
+
+    assert len(original) > 1
+    assert all(estimate_tokens(chunk) <= 1500 + 10 for chunk in original)
+    assert "\n".join(original) == "\n".join(line.strip() for line in long_section().splitlines())
+    changed = [i for i, chunk in enumerate(edited) if i >= len(original) or chunk != original[i]]
+    assert 0 < len(changed) <= 2
+
+
+def test_summaries_are_reduced_to_a_bounded_digest(summary_llm, tmp_path):
+    """Test that every chunk is summarized and the reduce step keeps the digest within budget"""
+    digests = summarize_filing_sections({"risk_factors": long_section(), "mdna": ""}, summary_llm,
+                                        policy=FAST_POLICY, cache_path=str(tmp_path / "cache.sqlite"))
+
+    assert set(digests) == {"risk_factors"}
+    assert estimate_tokens(digests["risk_factors"]) <= DIGEST_TOKENS
+    assert len(chunk_calls(summary_llm)) == len(chunk_section(long_section()))
+
+
+def test_unchanged_chunks_are_not_summarized_again(summary_llm, tmp_path):
+    """Test that an amended section only pays for the chunks that changed"""
+    cache_path = str(tmp_path / "cache.sqlite")
+    summarize_filing_sections({"risk_factors": long_section()}, summary_llm, policy=FAST_POLICY, cache_path=cache_path)
+    first_calls = len(chunk_calls(summary_llm))
+
+    summarize_filing_sections({"risk_factors": long_section()}, summary_llm, policy=FAST_POLICY, cache_path=cache_path)
+    assert len(chunk_calls(summary_llm)) == first_calls
+
+    summarize_filing_sections({"risk_factors": long_section(marker=" (amended)")}, summary_llm,
+                              policy=FAST_POLICY, cache_path=cache_path)
+    assert 0 < len(chunk_calls(summary_llm)) - first_calls <= 2
+
+
+@patch('v2_llm_graph.src.agent_graph.summarize_filing_sections')
+@patch('v2_llm_graph.src.agent_graph.load_filing_sections')
+def test_summarize_filings_node_replaces_excerpts(mock_load, mock_summarize):
+    """Test the node swaps section excerpts for digests, and keeps them when summarization fails"""
+    sec_data = {"filing_type": "10-K", "summary_of_risk_factors": "excerpt", "summary_of_mdna": "excerpt",
+                "sections_extracted": ["risk_factors", "mdna"]}
+    mock_load.return_value = {"risk_factors": "long text", "mdna": "long text"}
+    mock_summarize.return_value = {"risk_factors": "risk digest", "mdna": "mdna digest"}
+
+    result = summarize_filings_node({"sec_filings_data": sec_data})
+
+    assert result["sec_filings_data"]["summary_of_risk_factors"] == "risk digest"
+    assert result["sec_filings_data"]["summary_of_mdna"] == "mdna digest"
+
+    mock_summarize.side_effect = RuntimeError("quota")
+    assert summarize_filings_node({"sec_filings_data": sec_data}) == {}
+    assert summarize_filings_node({"sec_filings_data": {"error": "none"}}) == {}
@@ -0,0 +1,84 @@
+import pytest
+from unittest.mock import patch
+
+from v2_llm_graph.src.agent_graph import retrieve_from_memory_node
+from v2_llm_graph.src.memory.lexical_index import LexicalIndex, reciprocal_rank_fusion, tokenize
+from v2_llm_graph.src.memory.vector_backends import InMemoryBackend
+from v2_llm_graph.src.memory.vector_memory import MEMORY_CONTEXT_CHARS, MEMORY_CONTEXT_SECTIONS, VectorMemory
+
+REPORTS = [
+    ("r1", "Recommendation: Sell. Margins are shrinking and guidance was cut.", {"ticker": "SBUX", "date": "2025-01-10-09:00:00"}),
+    ("r2", "Recommendation: Buy. Data center revenue keeps compounding.", {"ticker": "NVDA", "date": "2025-02-01-10:00:00"}),
+    ("r3", "Recommendation: Hold. BRK.B trades near book value.", {"ticker": "BRK.B", "date": "2025-02-03-11:00:00"}),
+    ("r4", "Recommendation: Buy. Nvidia data center demand remains strong.", {"ticker": "NVDA", "date": "2025-03-01-12:00:00"}),
+]
+
+
+@pytest.fixture
+def index():
+    lexical = LexicalIndex()
+    lexical.add(*zip(*[(i, d, m) for i, d, m in REPORTS]))
+    return lexical
+
+
+def test_tokenize_keeps_tickers_and_dates_whole():
+    assert tokenize("BRK.B filed on 2025-01-31.") == ["brk.b", "filed", "on", "2025-01-31"]
+
+
+def test_search_finds_exact_terms_and_metadata(index):
+    assert [hit["id"] for hit in index.search("sell", 5)] == ["r1"]
+    assert [hit["id"] for hit in index.search("brk.b", 5)] == ["r3"]
+    assert [hit["id"] for hit in index.search("2025-02-01", 5)] == ["r2"]
+
+
+def test_search_breaks_ties_by_newest_date_and_applies_filter(index):
+    repeated = LexicalIndex()
+    repeated.add(["old", "new"], ["Hold.", "Hold."], [{"date": "2025-01-01"}, {"date": "2025-06-01"}])
+
+    assert [hit["id"] for hit in repeated.search("hold", 2)] == ["new", "old"]
+    assert [hit["id"] for hit in index.search("buy", 5, where={"date": {"$lt": "2025-02-15"}})] == ["r2"]
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    assert reciprocal_rank_fusion([["a", "b", "c"], ["b", "c", "a"]])[0] == "b"
+
+
+@pytest.fixture
+def memory(shared_embedding_service):
+    memory = VectorMemory(db_path="unused", embedding_service=shared_embedding_service, backend=InMemoryBackend())
+    for _, document, metadata in REPORTS:
+        memory.backend.add([metadata["ticker"] + metadata["date"]], shared_embedding_service.embed([document]),
+                           [document], [metadata])
+    return memory
+
+
+def test_keyword_query_skips_embedding(memory):
+    """Test that ticker lookups are answered by the inverted index without embedding the query"""
+    with patch.object(memory, "_embed", wraps=memory._embed) as embed:
+        assert memory.query_memory("NVDA", n_results=2) == [REPORTS[1][1], REPORTS[3][1]]
+        assert memory.query_memory("sell", n_results=1) == [REPORTS[0][1]]
+        embed.assert_not_called()
+
+        results = memory.query_memory("which company has strong data center demand", n_results=2)
+        embed.assert_called_once()
+    assert set(results) == {REPORTS[1][1], REPORTS[3][1]}
+
+
+def test_added_reports_are_searchable_by_keyword(memory):
+    memory.add_analysis("TSLA", "Recommendation: Sell. Deliveries fell again.")
+
+    assert memory.query_memory("TSLA", n_results=1, mode="lexical") == ["Recommendation: Sell. Deliveries fell again."]
+    with pytest.raises(ValueError):
+        memory.query_memory("TSLA", mode="regex")
+
+
+@patch('v2_llm_graph.src.agent_graph.VectorMemory')
+def test_retrieve_from_memory_looks_up_ticker_first(mock_vector_memory):
+    mock_vector_memory.return_value.query_memory.return_value = ["Past NVDA analysis"]
+
+    result = retrieve_from_memory_node({"company_name": "NVIDIA", "company_ticker": "NVDA"})
+
+    assert result["past_analysis"] == "Past NVDA analysis"
+    mock_vector_memory.return_value.query_memory.assert_called_once_with(
+        "NVDA summary recommendation", n_results=MEMORY_CONTEXT_SECTIONS, where={"ticker": "NVDA"},
+        max_chars=MEMORY_CONTEXT_CHARS)
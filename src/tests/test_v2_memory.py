@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import patch, MagicMock
 from datetime import datetime
 from v2_llm_graph.src.memory.vector_memory import VectorMemory
+from v2_llm_graph.src.memory.embedding_service import get_embedding_service
 
 @pytest.fixture
 def mock_chroma_client():
@@ -43,6 +44,7 @@ def test_add_analysis_success(mock_chroma_client):
     assert len(call_args['documents']) == 1
     assert call_args['documents'][0] == "Test analysis report"
     assert call_args['metadatas'][0]['ticker'] == "AAPL"
+    assert call_args['embeddings'] == get_embedding_service().embed(["Test analysis report"])
     assert 'date' in call_args['metadatas'][0]
 
 def test_add_analysis_error(mock_chroma_client):
@@ -79,7 +81,7 @@ def test_query_memory_success(mock_chroma_client):
     assert results[0] == 'Test analysis 1'
     assert results[1] == 'Test analysis 2'
     mock_collection.query.assert_called_once_with(
-        query_texts=["test query"],
+        query_embeddings=get_embedding_service().embed(["test query"]),
         n_results=2
     )
 
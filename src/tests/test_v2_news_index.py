@@ -0,0 +1,90 @@
+import pytest
+from unittest.mock import patch
+
+from v2_llm_graph.src.agent_graph import gather_data_node
+from v2_llm_graph.src.tools.news_index import NewsIndex, hamming_distance, simhash
+
+STORY = ("Nvidia shares jumped after the chipmaker reported record data center revenue and raised its "
+         "guidance for the next quarter, citing strong demand for its AI accelerators from cloud providers")
+
+
+def article(url, content, published_at, source="Wire", title="Nvidia beats estimates"):
+    return {"source": source, "title": title, "url": url, "publishedAt": published_at, "content": content}
+
+
+@pytest.fixture
+def index(tmp_path):
+    news_index = NewsIndex(str(tmp_path / "news.sqlite"))
+    yield news_index
+    news_index.close()
+
+
+def test_simhash_matches_syndicated_copies():
+    """Test that lightly edited copies are near each other and a different story is not"""
+    copy = STORY.replace("jumped", "rose") + "… [+2345 chars]"
+    other = "Starbucks announced a new chief executive and outlined plans to close underperforming stores"
+
+    assert hamming_distance(simhash(STORY), simhash(copy)) <= 10
+    assert hamming_distance(simhash(STORY), simhash(other)) > 10
+
+
+def test_merge_collapses_duplicates_and_tracks_watermark(index):
+    """Test near-duplicates collapse into the first copy and the watermark is the latest publishedAt"""
+    fetched = {"articles": [
+        article("http://a.com/1", STORY, "2025-10-18T10:00:00Z", source="Reuters"),
+        article("http://b.com/1", STORY.replace("jumped", "rose"), "2025-10-18T11:00:00Z", source="Yahoo"),
+        article("http://c.com/1", "Regulators opened an inquiry into export licences for advanced chips shipped abroad",
+                "2025-10-17T09:00:00Z", title="Export probe"),
+    ]}
+
+    result = index.merge("NVIDIA", fetched, num_articles=3)
+
+    assert result["new_articles"] == 2
+    assert result["duplicates_collapsed"] == 1
+    assert [a["url"] for a in result["articles"]] == ["http://a.com/1", "http://c.com/1"]
+    assert result["articles"][0]["duplicate_sources"] == ["Yahoo"]
+    assert index.watermark("NVIDIA") == "2025-10-18T11:00:00Z"
+
+
+def test_merge_skips_seen_urls_and_known_stories(index):
+    """Test that a refetch adds nothing new and a later syndicated copy of a known story is dropped"""
+    index.merge("NVIDIA", {"articles": [article("http://a.com/1", STORY, "2025-10-18T10:00:00Z")]}, 3)
+
+    result = index.merge("NVIDIA", {"articles": [
+        article("http://a.com/1", STORY, "2025-10-18T10:00:00Z"),
+        article("http://d.com/9", STORY + " Shares were up 4%.", "2025-10-19T08:00:00Z"),
+    ]}, 3)
+
+    assert result["new_articles"] == 0
+    assert result["duplicates_collapsed"] == 1
+    assert [a["url"] for a in result["articles"]] == ["http://a.com/1"]
+
+
+def test_merge_falls_back_to_stored_articles_on_error(index):
+    """Test a failed fetch still returns the stored stories"""
+    index.merge("NVIDIA", {"articles": [article("http://a.com/1", STORY, "2025-10-18T10:00:00Z")]}, 3)
+
+    result = index.merge("NVIDIA", {"error": "rate limited"}, 3)
+
+    assert [a["url"] for a in result["articles"]] == ["http://a.com/1"]
+    assert index.merge("OTHER", {"error": "rate limited"}, 3) == {"error": "rate limited"}
+
+
+@patch('v2_llm_graph.src.agent_graph.get_stock_fundamentals')
+@patch('v2_llm_graph.src.agent_graph.get_macro_economic_data')
+@patch('v2_llm_graph.src.agent_graph.get_company_news')
+def test_gather_data_requests_news_from_watermark(mock_news, mock_macro, mock_stock):
+    """Test that the second run only asks NewsAPI for articles after the watermark"""
+    mock_stock.return_value = {"stock": "data"}
+    mock_macro.return_value = {"macro": "data"}
+    mock_news.return_value = {"articles": [article("http://a.com/1", STORY, "2025-10-18T10:00:00Z")]}
+    state = {"company_name": "NVIDIA", "company_ticker": "NVDA"}
+
+    first = gather_data_node(state)
+    second = gather_data_node(state)
+
+    assert mock_news.call_args_list[0][1]["since"] is None
+    assert mock_news.call_args_list[1][1]["since"] == "2025-10-18T10:00:00Z"
+    assert first["news_data"]["new_articles"] == 1
+    assert second["news_data"]["new_articles"] == 0
+    assert second["news_data"]["articles"] == first["news_data"]["articles"]
@@ -0,0 +1,89 @@
+import json
+import pytest
+from v2_llm_graph.src.workflows.prompt_builder import (
+    TRUNCATION_MARKER,
+    build_prompt,
+    compact_serialize,
+    estimate_tokens,
+    extract_sections,
+    fit_section,
+    summarize_past_analysis,
+    truncate_to_tokens,
+)
+from v2_llm_graph.src.workflows.report_evaluator import SYNTHESIS_PROMPT_TEMPLATE
+
+PAST_REPORT = """## Executive Summary
+NVIDIA remains the leader in AI accelerators.
+
+## Key Findings
+""" + "\n".join(f"- Finding number {i} with supporting detail." for i in range(200)) + """
+
+## Final Recommendation
+**Buy**
+
+## Justification
+- Data center growth.
+"""
+
+def test_compact_serialize_drops_empty_fields_and_rounds():
+    """Test compact serialization of data dicts"""
+    data = {"ticker": "AAPL", "trailingPE": 38.343468123, "dividendYield": None, "tags": [], "marketCap": 3744230277120}
+
+    result = compact_serialize(data)
+
+    assert json.loads(result) == {"ticker": "AAPL", "trailingPE": 38.3435, "marketCap": 3744230277120}
+    assert " " not in result
+    assert len(result) < len(str(data))
+    assert compact_serialize("already text") == "already text"
+
+def test_truncate_to_tokens():
+    """Test truncation respects the budget and marks the cut"""
+    text = "First sentence. " * 200
+
+    result = truncate_to_tokens(text, 50)
+
+    assert estimate_tokens(result) <= 50
+    assert result.endswith(TRUNCATION_MARKER)
+    assert truncate_to_tokens("short", 50) == "short"
+
+def test_extract_sections_keeps_bold_rating_in_body():
+    """Test section splitting on Markdown and bold headings"""
+    sections = extract_sections(PAST_REPORT)
+
+    assert list(sections) == ["executive summary", "key findings", "final recommendation", "justification"]
+    assert sections["final recommendation"] == "**Buy**"
+
+def test_summarize_past_analysis_keeps_key_sections():
+    """Test that long past analyses are reduced to summary and recommendation"""
+    result = summarize_past_analysis(PAST_REPORT, 60)
+
+    assert estimate_tokens(result) <= 60
+    assert "leader in AI accelerators" in result
+    assert "**Buy**" in result
+    assert "Finding number 150" not in result
+
+def test_fit_section_handles_missing_values():
+    """Test that empty sections render as 'Not available'"""
+    assert fit_section("sec_filings_summary", {}, 100) == "Not available"
+    assert fit_section("sec_filings_summary", None, 100) == "Not available"
+
+def test_build_prompt_enforces_budgets_and_reports_tokens():
+    """Test prompt assembly with per-section budgets and a token report"""
+    sections = {
+        "past_analysis": PAST_REPORT,
+        "sec_filings_summary": {"filing_type": "10-K", "summary_of_mdna": "x" * 20000},
+        "financial_analysis": "Financial analysis",
+        "news_impact_analysis": "News analysis",
+        "market_context_analysis": "Macro analysis",
+    }
+    budgets = {"past_analysis": 100, "sec_filings_summary": 200, "financial_analysis": 100,
+               "news_impact_analysis": 100, "market_context_analysis": 100}
+
+    prompt, report = build_prompt(SYNTHESIS_PROMPT_TEMPLATE, sections, budgets, company_name="NVIDIA")
+
+    assert "NVIDIA" in prompt
+    assert report["past_analysis"] <= 100
+    assert report["sec_filings_summary"] <= 200
+    assert report["total"] == estimate_tokens(prompt)
+    assert report["template"] > 0
+    assert report["total"] < 1000
@@ -0,0 +1,116 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+from v2_llm_graph.src.agent_graph import app, check_inputs_node, specialist_analysis_node
+from v2_llm_graph.src.memory.report_cache import ReportCache, changed_inputs, fingerprint, input_fingerprints
+
+
+def gathered_state(price_to_book=10.0, url="https://news/1", filed_at="2025-08-01"):
+    return {
+        "company_name": "Test Corp",
+        "company_ticker": "TEST",
+        "revision_count": 0,
+        "financial_data": {"ticker": "TEST", "priceToBook": price_to_book},
+        "macro_data": {"UnemploymentRate": 4.1},
+        "news_data": {"articles": [{"url": url, "publishedAt": "2025-10-01", "content": "news"}]},
+        "sec_filings_data": {"filing_type": "10-Q", "filed_at": filed_at},
+    }
+
+
+def test_fingerprint_ignores_key_order_and_news_text():
+    """Test that fingerprints are stable and news is identified by URL and publish time only"""
+    assert fingerprint({"a": 1, "b": 2}) == fingerprint({"b": 2, "a": 1})
+
+    state = gathered_state()
+    edited = gathered_state()
+    edited["news_data"]["articles"][0]["content"] = "edited text"
+    assert input_fingerprints(state) == input_fingerprints(edited)
+    assert changed_inputs(input_fingerprints(gathered_state(url="https://news/2")), input_fingerprints(state)) == [
+        "analyze_news_impact"
+    ]
+
+
+def test_failed_fetch_never_matches():
+    """Test that an input whose fetch failed is always reported as changed"""
+    state = gathered_state()
+    state["macro_data"] = {"error": "FRED down"}
+
+    fingerprints = input_fingerprints(state)
+
+    assert fingerprints["analyze_market_context"] is None
+    assert "analyze_market_context" in changed_inputs(fingerprints, fingerprints)
+
+
+def test_report_cache_round_trip(tmp_path):
+    """Test storing and loading the last run of a ticker"""
+    cache = ReportCache(str(tmp_path / "cache.sqlite"))
+    cache.put("TEST", {"analyze_financials": "abc"}, {"financial_analysis": "strong"}, "Report")
+
+    stored = cache.get("TEST")
+
+    assert stored["fingerprints"] == {"analyze_financials": "abc"}
+    assert stored["analyses"] == {"financial_analysis": "strong"}
+    assert stored["report"] == "Report"
+    assert cache.get("OTHER") is None
+
+
+@pytest.fixture
+def mock_tools():
+    with patch('v2_llm_graph.src.agent_graph.get_stock_fundamentals') as mock_stock, \
+         patch('v2_llm_graph.src.agent_graph.get_macro_economic_data') as mock_macro, \
+         patch('v2_llm_graph.src.agent_graph.get_company_news') as mock_news, \
+         patch('v2_llm_graph.src.agent_graph.get_cached_sec_filings') as mock_sec, \
+         patch('v2_llm_graph.src.agent_graph.VectorMemory') as mock_memory, \
+         patch('v2_llm_graph.src.agent_graph.llm') as mock_llm, \
+         patch('v2_llm_graph.src.agent_graph.fast_llm') as mock_fast_llm:
+        state = gathered_state()
+        mock_stock.return_value = state["financial_data"]
+        mock_macro.return_value = state["macro_data"]
+        mock_news.return_value = state["news_data"]
+        mock_sec.return_value = state["sec_filings_data"]
+        mock_memory.return_value.query_memory.return_value = []
+        response = MagicMock(text="Report text.\nVERDICT: ACCEPT")
+        mock_llm.generate_content.return_value = response
+        mock_fast_llm.generate_content.return_value = response
+        yield {"stock": mock_stock, "llm": mock_llm, "fast_llm": mock_fast_llm}
+
+
+def test_unchanged_inputs_reuse_stored_report(mock_tools):
+    """Test that a rerun with identical inputs ends with the stored report and no LLM calls"""
+    first = app.invoke({"company_name": "Test Corp", "company_ticker": "TEST", "revision_count": 0})
+    llm_calls = mock_tools["llm"].generate_content.call_count + mock_tools["fast_llm"].generate_content.call_count
+
+    second = app.invoke({"company_name": "Test Corp", "company_ticker": "TEST", "revision_count": 0})
+
+    assert second["report_reused"] is True
+    assert second["final_report"] == first["draft_report"]
+    assert mock_tools["llm"].generate_content.call_count + mock_tools["fast_llm"].generate_content.call_count == llm_calls
+
+
+@patch('v2_llm_graph.src.agent_graph.REPORT_REUSE_MODE', 'partial')
+@patch('v2_llm_graph.src.agent_graph.analyze_article_chain')
+@patch('v2_llm_graph.src.agent_graph.route_and_execute_task')
+def test_partial_mode_reruns_only_changed_specialists(mock_route, mock_analyze, tmp_path):
+    """Test that partial mode reuses specialist outputs whose inputs did not change"""
+    previous = gathered_state()
+    cache = ReportCache(str(tmp_path / "report_cache.sqlite"))
+    cache.put("TEST", input_fingerprints(previous), {
+        "financial_analysis": "old financials",
+        "structured_news_analysis": {"news_items": ["old"]},
+        "news_impact_analysis": "old news",
+        "market_context_analysis": "old macro",
+    }, "Old report")
+    cache.close()
+    mock_route.return_value = "new financials"
+
+    state = gathered_state(price_to_book=12.0)
+    state.update(check_inputs_node(state))
+    result = specialist_analysis_node(state)
+
+    assert state["report_reused"] is False
+    assert mock_route.call_count == 1
+    assert mock_route.call_args[0][0] == "analyze_financials"
+    mock_analyze.assert_not_called()
+    assert result["financial_analysis"] == "new financials"
+    assert result["news_impact_analysis"] == "old news"
+    assert result["market_context_analysis"] == "old macro"
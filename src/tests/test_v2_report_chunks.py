@@ -0,0 +1,93 @@
+import pytest
+
+from v2_llm_graph.src.memory.report_chunks import chunk_report, select_sections
+from v2_llm_graph.src.memory.vector_backends import InMemoryBackend
+from v2_llm_graph.src.memory.vector_memory import VectorMemory
+
+REPORT = """# Investment Report for NVIDIA (NVDA)
+**To:** Investment Committee
+
+### **Executive Summary**
+NVIDIA has exceptional financial health but trades at a premium valuation.
+
+### **Key Findings**
+**1. Dominant Market Position:**
+Data center revenue keeps compounding.
+**2. Geopolitical Risk:**
+Export controls threaten China sales.
+
+### **Recommendation: HOLD**
+We recommend a **Hold** rating.
+
+### **Justification for Recommendation**
+Valuation leaves no margin of safety.
+**Conclusion:**
+Keep current exposure.
+"""
+
+
+def test_chunk_report_splits_top_level_sections():
+    chunks = dict(chunk_report(REPORT))
+
+    assert list(chunks) == ["executive summary", "key findings", "recommendation", "justification"]
+    assert chunks["recommendation"].startswith("Recommendation: HOLD")
+    assert "Export controls" in chunks["key findings"] and "Dominant Market Position" in chunks["key findings"]
+    assert "Keep current exposure." in chunks["justification"]
+    assert "Investment Committee" not in "".join(chunks.values())
+
+
+def test_chunk_report_keeps_unstructured_reports_whole():
+    assert chunk_report("Recommendation: Sell. Deliveries fell again.") == [
+        (None, "Recommendation: Sell. Deliveries fell again.")]
+
+
+def test_select_sections_respects_budget_and_report_order():
+    hits = [
+        {"id": "a#recommendation", "document": "Recommendation: HOLD",
+         "metadata": {"ticker": "NVDA", "date": "2025-10-17-09:00:00", "parent_id": "a", "section": "recommendation"}},
+        {"id": "a#key_findings", "document": "x" * 500,
+         "metadata": {"ticker": "NVDA", "date": "2025-10-17-09:00:00", "parent_id": "a", "section": "key findings"}},
+        {"id": "a#executive_summary", "document": "Executive Summary\nStrong but expensive.",
+         "metadata": {"ticker": "NVDA", "date": "2025-10-17-09:00:00", "parent_id": "a", "section": "executive summary"}},
+    ]
+
+    assert select_sections(hits, 120) == ["[NVDA 2025-10-17] Executive Summary\nStrong but expensive.",
+                                          "[NVDA 2025-10-17] Recommendation: HOLD"]
+
+
+def test_select_sections_condenses_a_single_oversized_report():
+    hits = [{"id": "old", "document": REPORT * 5, "metadata": {"ticker": "NVDA", "date": "2025-01-01"}}]
+
+    (document,) = select_sections(hits, 300)
+
+    assert len(document) <= 300
+    assert document.startswith("[NVDA 2025-01-01] Executive Summary")
+
+
+@pytest.fixture
+def memory(shared_embedding_service):
+    return VectorMemory(db_path="unused", embedding_service=shared_embedding_service, backend=InMemoryBackend())
+
+
+def test_reports_are_stored_as_sections_with_parent_ids(memory):
+    memory.add_analysis("NVDA", REPORT)
+
+    records = memory.backend.get_all()
+    assert [m["section"] for m in records["metadatas"]] == [
+        "executive summary", "key findings", "recommendation", "justification"]
+    assert len({m["parent_id"] for m in records["metadatas"]}) == 1
+    assert all(entry_id.startswith(records["metadatas"][0]["parent_id"] + "#") for entry_id in records["ids"])
+
+
+def test_budgeted_query_returns_top_sections_without_embedding(memory):
+    memory.add_analysis("NVDA", REPORT)
+    memory.add_analysis("TSLA", "Recommendation: Sell. Deliveries fell again.")
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(memory, "_embed", lambda texts: pytest.fail("embedded a keyword query"))
+        results = memory.query_memory("NVDA summary recommendation", n_results=2, where={"ticker": "NVDA"},
+                                      max_chars=400)
+
+    assert len(results) == 2 and sum(map(len, results)) <= 400
+    assert results[0].split("] ")[1].startswith("Executive Summary")
+    assert results[1].split("] ")[1].startswith("Recommendation: HOLD")
@@ -0,0 +1,298 @@
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+from google.api_core import exceptions as google_exceptions
+
+from v2_llm_graph.src.llm import resilient_client
+from v2_llm_graph.src.llm.resilient_client import (
+    CallPolicy,
+    LatencyTracker,
+    LLMDeadlineExceeded,
+    LLMPoolSaturated,
+    _AttemptPool,
+    backoff_delay,
+    call_llm,
+    is_transient_error,
+    policy_from_env,
+    stream_llm,
+)
+
+FAST_POLICY = CallPolicy(deadline=2.0, max_retries=2, base_delay=0.0, max_delay=0.0)
+
+
+@pytest.fixture
+def tracker():
+    return LatencyTracker()
+
+
+@pytest.fixture
+def small_pool(monkeypatch):
+    """Swap the shared worker pool for a tiny one so saturation is easy to provoke"""
+    def make(max_workers, max_abandoned):
+        pool = _AttemptPool(max_workers=max_workers, max_abandoned=max_abandoned)
+        monkeypatch.setattr(resilient_client, "_pool", pool)
+        return pool
+    return make
+
+
+def slow_model(seconds, text="slow"):
+    mock_llm = MagicMock()
+    def generate(*args, **kwargs):
+        time.sleep(seconds)
+        return MagicMock(text=text)
+    mock_llm.generate_content.side_effect = generate
+    return mock_llm
+
+
+def test_call_llm_success_records_latency(tracker):
+    """Test a successful call returns the response and records one latency sample"""
+    mock_llm = MagicMock()
+    mock_llm.generate_content.return_value = MagicMock(text="ok")
+
+    response = call_llm(mock_llm, "prompt", call_site="unit", policy=FAST_POLICY, tracker=tracker)
+
+    assert response.text == "ok"
+    assert tracker.count("unit") == 1
+    kwargs = mock_llm.generate_content.call_args[1]
+    assert kwargs["request_options"] == {"timeout": 2.0}
+
+
+def test_call_llm_retries_transient_errors(tracker):
+    """Test that transient errors are retried until the call succeeds"""
+    mock_llm = MagicMock()
+    mock_llm.generate_content.side_effect = [
+        google_exceptions.ServiceUnavailable("busy"),
+        TimeoutError("slow"),
+        MagicMock(text="recovered"),
+    ]
+
+    response = call_llm(mock_llm, "prompt", call_site="unit", policy=FAST_POLICY, tracker=tracker)
+
+    assert response.text == "recovered"
+    assert mock_llm.generate_content.call_count == 3
+    assert tracker.report()["unit"]["retries"] == 2
+
+
+def test_call_llm_does_not_retry_permanent_errors(tracker):
+    """Test that non-transient errors are raised immediately"""
+    mock_llm = MagicMock()
+    mock_llm.generate_content.side_effect = ValueError("bad prompt")
+
+    with pytest.raises(ValueError):
+        call_llm(mock_llm, "prompt", call_site="unit", policy=FAST_POLICY, tracker=tracker)
+
+    assert mock_llm.generate_content.call_count == 1
+    assert tracker.report()["unit"]["errors"] == 1
+
+
+def test_call_llm_gives_up_after_max_retries(tracker):
+    """Test that retries are bounded"""
+    mock_llm = MagicMock()
+    mock_llm.generate_content.side_effect = ConnectionError("reset")
+
+    with pytest.raises(ConnectionError):
+        call_llm(mock_llm, "prompt", call_site="unit", policy=FAST_POLICY, tracker=tracker)
+
+    assert mock_llm.generate_content.call_count == FAST_POLICY.max_retries + 1
+
+
+def test_call_llm_enforces_deadline(tracker):
+    """Test that an attempt exceeding its deadline raises LLMDeadlineExceeded"""
+    mock_llm = MagicMock()
+    mock_llm.generate_content.side_effect = lambda *args, **kwargs: time.sleep(0.5)
+    policy = CallPolicy(deadline=0.05, max_retries=0)
+
+    with pytest.raises(LLMDeadlineExceeded):
+        call_llm(mock_llm, "prompt", call_site="unit", policy=policy, tracker=tracker)
+
+    assert tracker.report()["unit"]["timeouts"] == 1
+
+
+def test_call_llm_hedges_slow_requests(tracker):
+    """Test that a duplicate request is sent once an attempt exceeds the p95 latency"""
+    for _ in range(5):
+        tracker.record("unit", 0.01)
+    calls = []
+
+    def generate(*args, **kwargs):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            time.sleep(0.5)
+            return MagicMock(text="slow")
+        return MagicMock(text="hedged")
+
+    mock_llm = MagicMock()
+    mock_llm.generate_content.side_effect = generate
+    policy = CallPolicy(deadline=2.0, max_retries=0, hedge=True, hedge_min_samples=5)
+
+    response = call_llm(mock_llm, "prompt", call_site="unit", policy=policy, tracker=tracker)
+
+    assert response.text == "hedged"
+    stats = tracker.report()["unit"]
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_latency_tracker_quantiles(tracker):
+    """Test nearest-rank tail latency reporting"""
+    for value in range(1, 101):
+        tracker.record("site", value / 100)
+
+    report = tracker.report()["site"]
+
+    assert report["samples"] == 100
+    assert report["p50"] == pytest.approx(0.50)
+    assert report["p95"] == pytest.approx(0.95)
+    assert report["p99"] == pytest.approx(0.99)
+    assert report["max"] == pytest.approx(1.00)
+
+
+def test_transient_classification_and_backoff_bounds():
+    """Test error classification and that jittered backoff stays within bounds"""
+    assert is_transient_error(google_exceptions.TooManyRequests("429"))
+    assert is_transient_error(LLMDeadlineExceeded("deadline"))
+    assert not is_transient_error(Exception("API timeout"))
+
+    policy = CallPolicy(base_delay=1.0, max_delay=3.0)
+    for attempt in range(6):
+        assert 0 <= backoff_delay(attempt, policy) <= min(3.0, 2 ** attempt)
+
+
+def test_policy_from_env(monkeypatch):
+    """Test that the default policy honours the LLM_* environment variables"""
+    monkeypatch.setenv("LLM_CALL_DEADLINE", "12.5")
+    monkeypatch.setenv("LLM_MAX_RETRIES", "4")
+    monkeypatch.setenv("LLM_HEDGE_REQUESTS", "true")
+
+    policy = policy_from_env()
+
+    assert policy.deadline == 12.5
+    assert policy.max_retries == 4
+    assert policy.hedge is True
+
+
+def test_deadline_starts_when_worker_picks_up_call(small_pool, tracker):
+    """Test that time spent queued for a worker does not count against the deadline"""
+    small_pool(max_workers=1, max_abandoned=1)
+    blocker = threading.Thread(
+        target=call_llm,
+        args=(slow_model(0.3), "prompt"),
+        kwargs={"call_site": "blocker", "policy": CallPolicy(deadline=2.0, max_retries=0), "tracker": tracker},
+    )
+    blocker.start()
+    time.sleep(0.05)
+
+    # Queued ~0.25s behind the blocker, then runs for 0.2s: 0.45s wall clock, within 0.3s once started.
+    response = call_llm(slow_model(0.2, text="queued"), "prompt", call_site="queued",
+                        policy=CallPolicy(deadline=0.3, max_retries=0), tracker=tracker)
+    blocker.join()
+
+    assert response.text == "queued"
+
+
+def test_saturated_pool_rejects_new_attempts(small_pool, tracker):
+    """Test that stuck abandoned calls cap new work instead of queueing behind them"""
+    pool = small_pool(max_workers=2, max_abandoned=1)
+    policy = CallPolicy(deadline=0.05, max_retries=0)
+
+    with pytest.raises(LLMDeadlineExceeded):
+        call_llm(slow_model(0.4), "prompt", call_site="stuck", policy=policy, tracker=tracker)
+    assert pool.abandoned == 1
+
+    fresh_llm = slow_model(0.0)
+    with pytest.raises(LLMPoolSaturated):
+        call_llm(fresh_llm, "prompt", call_site="fresh", policy=policy, tracker=tracker)
+    fresh_llm.generate_content.assert_not_called()
+
+    # Once the stuck call returns, its worker is released and new calls go through.
+    time.sleep(0.5)
+    assert pool.abandoned == 0
+    assert call_llm(fresh_llm, "prompt", call_site="fresh", policy=policy, tracker=tracker).text == "slow"
+
+
+def test_queued_attempt_is_cancelled_not_abandoned(small_pool, tracker):
+    """Test that an attempt that never got a worker is cancelled and reported as saturation"""
+    pool = small_pool(max_workers=1, max_abandoned=5)
+    blocker = threading.Thread(
+        target=call_llm,
+        args=(slow_model(0.4), "prompt"),
+        kwargs={"call_site": "blocker", "policy": CallPolicy(deadline=2.0, max_retries=0), "tracker": tracker},
+    )
+    blocker.start()
+    time.sleep(0.05)
+
+    queued_llm = slow_model(0.0)
+    with pytest.raises(LLMPoolSaturated):
+        call_llm(queued_llm, "prompt", call_site="queued", policy=CallPolicy(deadline=0.1, max_retries=0),
+                 tracker=tracker)
+    blocker.join()
+
+    queued_llm.generate_content.assert_not_called()
+    assert pool.abandoned == 0
+    assert is_transient_error(LLMPoolSaturated("saturated"))
+
+
+def test_hedging_skipped_when_pool_saturated(small_pool, tracker):
+    """Test that no duplicate request is sent when every worker is busy"""
+    small_pool(max_workers=1, max_abandoned=1)
+    for _ in range(5):
+        tracker.record("unit", 0.01)
+    policy = CallPolicy(deadline=2.0, max_retries=0, hedge=True, hedge_min_samples=5)
+    mock_llm = slow_model(0.2)
+
+    response = call_llm(mock_llm, "prompt", call_site="unit", policy=policy, tracker=tracker)
+
+    assert response.text == "slow"
+    assert mock_llm.generate_content.call_count == 1
+    assert tracker.report()["unit"]["hedges"] == 0
+
+
+def chunk(text):
+    return MagicMock(text=text)
+
+
+def test_stream_llm_yields_chunks_and_records_first_token(tracker):
+    """Test that streamed text is yielded in order and time to first token is tracked"""
+    mock_llm = MagicMock()
+    mock_llm.generate_content.return_value = iter([chunk("Hello"), chunk(""), chunk(" world")])
+
+    parts = list(stream_llm(mock_llm, "prompt", call_site="unit", policy=FAST_POLICY, tracker=tracker))
+
+    assert parts == ["Hello", " world"]
+    assert mock_llm.generate_content.call_args[1]["stream"] is True
+    assert tracker.count("unit/first_token") == 1
+    assert tracker.count("unit") == 1
+
+
+def test_stream_llm_retries_before_first_chunk(tracker):
+    """Test that a transient failure before any output is retried"""
+    mock_llm = MagicMock()
+    mock_llm.generate_content.side_effect = [
+        google_exceptions.ServiceUnavailable("busy"),
+        iter([chunk("recovered")]),
+    ]
+
+    parts = list(stream_llm(mock_llm, "prompt", call_site="unit", policy=FAST_POLICY, tracker=tracker))
+
+    assert parts == ["recovered"]
+    assert tracker.report()["unit"]["retries"] == 1
+
+
+def test_stream_llm_does_not_retry_after_first_chunk(tracker):
+    """Test that a failure mid-stream is raised instead of restarting the output"""
+    def broken_stream():
+        yield chunk("partial")
+        raise ConnectionError("reset")
+
+    mock_llm = MagicMock()
+    mock_llm.generate_content.return_value = broken_stream()
+    parts = []
+
+    with pytest.raises(ConnectionError):
+        for text in stream_llm(mock_llm, "prompt", call_site="unit", policy=FAST_POLICY, tracker=tracker):
+            parts.append(text)
+
+    assert parts == ["partial"]
+    assert mock_llm.generate_content.call_count == 1
+    assert tracker.report()["unit"]["errors"] == 1
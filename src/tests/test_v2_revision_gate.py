@@ -0,0 +1,71 @@
+import pytest
+from unittest.mock import MagicMock
+from v2_llm_graph.src.workflows.revision_gate import (
+    GateStats,
+    decide_revision,
+    heuristic_decision,
+    parse_verdict,
+)
+
+@pytest.fixture
+def stats():
+    return GateStats()
+
+@pytest.fixture
+def mock_llm():
+    mock = MagicMock()
+    mock.generate_content.return_value = MagicMock(text="No")
+    return mock
+
+def test_parse_verdict():
+    """Test reading the structured verdict line from evaluator feedback"""
+    assert parse_verdict("- Point one\nVERDICT: REVISE") == "refine"
+    assert parse_verdict("- Looks good\n**Verdict:** accept") == "end"
+    assert parse_verdict("- No verdict line here") is None
+
+def test_heuristic_decision():
+    """Test the local keyword classifier"""
+    assert heuristic_decision("- The justification lacks data on margins.") == "refine"
+    assert heuristic_decision("- No major issues. The report is well-balanced.") == "end"
+    assert heuristic_decision("- No revision needed.") == "end"
+    assert heuristic_decision("- The report discusses revenue.") is None
+    assert heuristic_decision("") == "end"
+
+def test_heuristic_ignores_generic_words_in_positive_feedback():
+    """Test that modals and substrings in positive feedback do not trigger a revision"""
+    positive = "- The analysis is unbiased and the report should be published as is."
+    assert heuristic_decision(positive) == "end"
+    assert heuristic_decision("- The valuation discussion should mention the sector average.") is None
+    assert heuristic_decision("- The recommendation is biased toward growth.") == "refine"
+
+def test_decide_revision_prefers_verdict(stats, mock_llm):
+    """Test that a structured verdict decides without any LLM call"""
+    result = decide_revision("- Minor gap in risk\nVERDICT: ACCEPT", llm=mock_llm, use_llm_fallback=True, stats=stats)
+
+    assert result == "end"
+    mock_llm.generate_content.assert_not_called()
+    assert stats.report()["verdict"]["count"] == 1
+
+def test_decide_revision_llm_fallback_is_opt_in(stats, mock_llm):
+    """Test that ambiguous feedback only reaches the LLM when enabled"""
+    ambiguous = "- The report discusses revenue."
+
+    assert decide_revision(ambiguous, llm=mock_llm, stats=stats) == "refine"
+    mock_llm.generate_content.assert_not_called()
+
+    assert decide_revision(ambiguous, llm=mock_llm, use_llm_fallback=True, stats=stats) == "end"
+    mock_llm.generate_content.assert_called_once()
+
+    report = stats.report()
+    assert report["default"]["count"] == 1
+    assert report["llm"]["count"] == 1
+    assert report["llm"]["share"] == pytest.approx(0.5)
+
+def test_decide_revision_llm_failure_defaults_to_refine(stats, mock_llm):
+    """Test that an LLM gate error falls back to the default path"""
+    mock_llm.generate_content.side_effect = Exception("API Error")
+
+    result = decide_revision("- The report discusses revenue.", llm=mock_llm, use_llm_fallback=True, stats=stats)
+
+    assert result == "refine"
+    assert stats.report()["default"]["count"] == 1
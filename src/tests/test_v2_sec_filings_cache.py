@@ -0,0 +1,101 @@
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+
+from v2_llm_graph.src.tools.sec_filings_cache import (
+    BULK_QUERY_TICKERS,
+    SecFilingIndex,
+    get_cached_sec_filings,
+    refresh_filing_index,
+)
+
+
+def filing(ticker, form_type="10-Q", filed_at="2025-08-01T16:00:00-04:00"):
+    return {
+        "ticker": ticker,
+        "formType": form_type,
+        "filedAt": filed_at,
+        "accessionNo": f"0000-{ticker}-{filed_at[:10]}",
+        "linkToFilingDetails": f"https://sec.gov/{ticker}",
+    }
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "index.sqlite")
+
+
+@patch('v2_llm_graph.src.tools.sec_filings_cache.get_latest_sec_filings')
+def test_cached_filings_refresh_lazily(mock_fetch, db_path):
+    """Test that sec-api is only asked again once the indexed entry is older than the interval"""
+    mock_fetch.return_value = {
+        "filing_type": "10-K", "filed_at": "2025-02-01", "accession_no": "0001",
+        "link_to_filing": "https://sec.gov/AAPL", "summary_of_risk_factors": "r", "summary_of_mdna": "m",
+    }
+
+    first = get_cached_sec_filings("AAPL", "fake_key", max_age_hours=24, db_path=db_path)
+    second = get_cached_sec_filings("AAPL", "fake_key", max_age_hours=24, db_path=db_path)
+
+    assert mock_fetch.call_count == 1
+    assert second["accession_no"] == "0001"
+    assert second["filed_at"] == first["filed_at"]
+    assert second["link_to_filing"] == first["link_to_filing"]
+
+    get_cached_sec_filings("AAPL", "fake_key", max_age_hours=0, db_path=db_path)
+    assert mock_fetch.call_count == 2
+
+
+@patch('v2_llm_graph.src.tools.sec_filings_cache.get_latest_sec_filings')
+def test_stale_entry_served_when_refresh_fails(mock_fetch, db_path):
+    """Test that a failed refresh falls back to the last indexed filing"""
+    index = SecFilingIndex(db_path)
+    index.put("AAPL", filing("AAPL", "10-K"))
+    index.close()
+    mock_fetch.return_value = {"error": "API Error"}
+
+    result = get_cached_sec_filings("AAPL", "fake_key", max_age_hours=0, db_path=db_path)
+
+    assert result["filing_type"] == "10-K"
+
+
+@patch('v2_llm_graph.src.tools.sec_filings_cache.QueryApi')
+def test_bulk_refresh_uses_one_query_for_stale_tickers(mock_api, db_path):
+    """Test that one query covers every stale ticker and keeps the latest filing per ticker"""
+    index = SecFilingIndex(db_path)
+    index.put("MSFT", filing("MSFT"))
+    index.close()
+    mock_api.return_value.get_filings.return_value = {"filings": [
+        filing("AAPL", "10-Q", "2025-08-01T16:00:00-04:00"),
+        filing("AAPL", "10-K", "2024-11-01T16:00:00-04:00"),
+    ]}
+
+    refreshed = refresh_filing_index(["AAPL", "MSFT", "NOPE"], "fake_key", max_age_hours=24, db_path=db_path)
+
+    assert refreshed == 2
+    assert mock_api.return_value.get_filings.call_count == 1
+    query = mock_api.return_value.get_filings.call_args[0][0]["query"]["query_string"]["query"]
+    assert "AAPL" in query and "NOPE" in query and "MSFT" not in query
+
+    index = SecFilingIndex(db_path)
+    assert index.get("AAPL")["form_type"] == "10-Q"
+    assert index.get("NOPE")["form_type"] is None
+    assert index.is_fresh("NOPE", 24)
+    index.close()
+    assert "error" in get_cached_sec_filings("NOPE", "fake_key", max_age_hours=24, db_path=db_path)
+
+
+@patch('v2_llm_graph.src.tools.sec_filings_cache.QueryApi')
+def test_bulk_refresh_splits_large_batches(mock_api, db_path):
+    """Test that stale tickers are queried BULK_QUERY_TICKERS at a time"""
+    tickers = [f"T{i:03d}" for i in range(BULK_QUERY_TICKERS * 2 + 1)]
+    mock_api.return_value.get_filings.side_effect = lambda query: {"filings": [
+        filing(ticker) for ticker in ("T000", "T050", "T100") if ticker in query["query"]["query_string"]["query"]]}
+
+    refreshed = refresh_filing_index(tickers, "fake_key", max_age_hours=24, db_path=db_path)
+
+    queries = [call[0][0]["query"]["query_string"]["query"] for call in mock_api.return_value.get_filings.call_args_list]
+    assert [len(query.split(") AND")[0].split(" OR ")) for query in queries] == [BULK_QUERY_TICKERS, BULK_QUERY_TICKERS, 1]
+    assert refreshed == len(tickers)
+    index = SecFilingIndex(db_path)
+    assert [index.get(ticker)["form_type"] for ticker in ("T000", "T050", "T100", "T001")] == ["10-Q", "10-Q", "10-Q", None]
+    index.close()
@@ -75,6 +75,6 @@ def test_get_latest_sec_filings_query_structure():
         query = mock_instance.get_filings.call_args[0][0]
         assert 'query' in query
         assert 'ticker:AAPL' in query['query']['query_string']['query']
-        assert 'formType:"10-K" OR formType:"10-Q"' in query['query']['query_string']['query']
+        assert 'AND formType:("10-K" OR "10-Q")' in query['query']['query_string']['query']
         assert query['size'] == '1'
-        assert query['sort'][0]['filedAt']['order'] == 'desc'
\ No newline at end of file
+        assert query['sort'][0]['filedAt']['order'] == 'desc'
@@ -0,0 +1,115 @@
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from v2_llm_graph.src.tools.sec_section_extractor import (
+    SectionExtractor,
+    SectionStore,
+    get_filing_sections,
+    with_filing_sections,
+)
+
+TEN_K_HTML = """<html><head><style>p {color: red}</style></head><body>
+<table>
+<tr><td>Item 1A.</td><td>Risk Factors</td><td>12</td></tr>
+<tr><td>Item 1B.</td><td>Unresolved Staff Comments</td><td>25</td></tr>
+<tr><td>Item 7.</td><td>Management's Discussion and Analysis</td><td>30</td></tr>
+<tr><td>Item 7A.</td><td>Quantitative and Qualitative Disclosures</td><td>45</td></tr>
+</table>
+<p>Item 1. Business</p><p>We sell widgets.</p>
+<p><b>Item 1A.</b></p><p><b>Risk Factors</b></p>
+<p>Competition in the widget market is intense &amp; growing.</p>
+<p>Supply chain disruptions could hurt margins.</p>
+<p>Item 1B. Unresolved Staff Comments</p><p>None.</p>
+<div>ITEM 7. MANAGEMENT'S DISCUSSION AND ANALYSIS OF FINANCIAL CONDITION</div>
+<p>Revenue grew 12% year over year.</p>
+<p>Item 7A. Quantitative and Qualitative Disclosures About Market Risk</p><p>Rates.</p>
+<p>Item 8. Financial Statements</p>
+</body></html>"""
+
+
+def extract(html, form_type="10-K", chunk_size=7):
+    """Feed the document in small chunks, as the streaming download does"""
+    extractor = SectionExtractor(form_type)
+    for start in range(0, len(html), chunk_size):
+        extractor.feed(html[start:start + chunk_size])
+    extractor.close()
+    return extractor.sections
+
+
+@pytest.fixture
+def filing_server():
+    """Serve TEN_K_HTML from a local HTTP server and count the requests"""
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(self.path)
+            body = TEN_K_HTML.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/filing.htm", requests
+    server.shutdown()
+
+
+def test_extractor_skips_table_of_contents_and_reads_sections():
+    """Test that the body sections win over the table of contents, across chunk boundaries"""
+    sections = extract(TEN_K_HTML)
+
+    assert sections["risk_factors"] == (
+        "Competition in the widget market is intense & growing.\nSupply chain disruptions could hurt margins."
+    )
+    assert sections["mdna"] == "Revenue grew 12% year over year."
+
+
+def test_extractor_uses_10q_headings():
+    """Test that a 10-Q reads MD&A from Item 2 and Risk Factors from Part II Item 1A"""
+    html = ("<p>Item 2. Management's Discussion and Analysis</p><p>Sales were flat.</p>"
+            "<p>Item 3. Quantitative Disclosures</p><p>Part II, Item 1A. Risk Factors</p><p>No changes.</p>"
+            "<p>Item 2. Unregistered Sales of Equity Securities</p><p>None.</p>")
+
+    sections = extract(html, form_type="10-Q")
+
+    assert sections == {"risk_factors": "No changes.", "mdna": "Sales were flat."}
+
+
+def test_sections_downloaded_once_per_accession(filing_server, tmp_path):
+    """Test that a filing is streamed and parsed once, then served from the compressed store"""
+    url, requests = filing_server
+    store_dir = str(tmp_path / "sections")
+
+    first = get_filing_sections(url, "0000320193-25-000001", "10-K", store_dir)
+    second = get_filing_sections(url, "0000320193-25-000001", "10-K", store_dir)
+
+    assert len(requests) == 1
+    assert first == second
+    assert "Revenue grew" in second["mdna"]
+    assert (tmp_path / "sections" / "0000320193-25-000001.json.gz").exists()
+    assert SectionStore(store_dir).get("unknown") is None
+
+
+def test_with_filing_sections_replaces_placeholders(filing_server, tmp_path):
+    """Test that the filing summary carries the real section text, and failures keep the placeholders"""
+    url, _ = filing_server
+    sec_data = {"filing_type": "10-K", "accession_no": "0001", "link_to_filing": url,
+                "summary_of_risk_factors": "placeholder", "summary_of_mdna": "placeholder"}
+
+    result = with_filing_sections(sec_data, str(tmp_path / "sections"))
+
+    assert result["summary_of_risk_factors"].startswith("Competition in the widget market")
+    assert result["summary_of_mdna"] == "Revenue grew 12% year over year."
+    assert result["sections_extracted"] == ["risk_factors", "mdna"]
+
+    unreachable = dict(sec_data, accession_no="0002", link_to_filing="http://127.0.0.1:9/missing.htm")
+    assert with_filing_sections(unreachable, str(tmp_path / "sections")) == unreachable
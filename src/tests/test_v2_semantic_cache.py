@@ -0,0 +1,74 @@
+import pytest
+from unittest.mock import MagicMock, patch
+
+from v2_llm_graph.src.memory.semantic_cache import SemanticCache, parse_thresholds
+from v2_llm_graph.src.workflows.specialist_router import FINANCIAL_ANALYST_PROMPT, route_and_execute_task
+
+
+def financial_prompt(market_cap):
+    return FINANCIAL_ANALYST_PROMPT.format(financial_data=f'{{"marketCap":{market_cap},"trailingPE":35.2}}')
+
+
+@pytest.fixture
+def cache(tmp_path, shared_embedding_service):
+    return SemanticCache(str(tmp_path / "semantic_cache"), embedding_service=shared_embedding_service,
+                         thresholds={"analyze_financials": 0.95})
+
+
+def test_parse_thresholds():
+    assert parse_thresholds("analyze_financials=0.99, analyze_news_impact=0.9") == {
+        "analyze_financials": 0.99, "analyze_news_impact": 0.9}
+    with pytest.raises(ValueError):
+        parse_thresholds("analyze_financials=high")
+    with pytest.raises(ValueError):
+        parse_thresholds("analyze_financials=1.5")
+
+
+def test_lookup_reuses_near_identical_prompt_of_same_task(cache):
+    """Test a prompt differing only in one figure hits, and the hit rate is reported"""
+    cache.store("analyze_financials", financial_prompt(3000000000000), "Strong margins.")
+
+    assert cache.lookup("analyze_financials", financial_prompt(3000000000001)) == "Strong margins."
+    assert cache.lookup("analyze_news_impact", financial_prompt(3000000000001)) is None
+
+    report = cache.report()
+    assert report["analyze_financials"] == {"lookups": 1, "hits": 1, "hit_rate": 1.0, "threshold": 0.95}
+    assert report["analyze_news_impact"]["hits"] == 0
+
+
+def test_lookup_misses_below_threshold(cache):
+    """Test that a dissimilar prompt of the same task is not served from the cache"""
+    cache.store("analyze_financials", financial_prompt(3000000000000), "Strong margins.")
+
+    assert cache.lookup("analyze_financials", "Summarize the quarterly revenue trend of a regional bank") is None
+
+
+@patch('v2_llm_graph.src.workflows.specialist_router.get_semantic_cache')
+def test_router_skips_llm_on_semantic_hit(mock_get_cache, cache):
+    """Test the specialist router stores responses and serves near-identical prompts from the cache"""
+    mock_get_cache.return_value = cache
+    llm = MagicMock()
+    llm.generate_content.return_value = MagicMock(text="Strong margins.")
+
+    first = route_and_execute_task('analyze_financials', {"marketCap": 3000000000000, "trailingPE": 35.2}, llm)
+    second = route_and_execute_task('analyze_financials', {"marketCap": 3000000000001, "trailingPE": 35.2}, llm)
+
+    assert first == second == "Strong margins."
+    llm.generate_content.assert_called_once()
+
+
+@patch('v2_llm_graph.src.workflows.specialist_router.get_semantic_cache')
+def test_router_does_not_share_entries_between_tickers(mock_get_cache, cache):
+    """Test that near-identical payloads of two companies each get their own analysis"""
+    mock_get_cache.return_value = cache
+    llm = MagicMock()
+    llm.generate_content.side_effect = [MagicMock(text="AAPL margins."), MagicMock(text="MSFT margins.")]
+
+    aapl = route_and_execute_task('analyze_financials', {"marketCap": 3000000000000, "trailingPE": 35.2}, llm, ticker="AAPL")
+    msft = route_and_execute_task('analyze_financials', {"marketCap": 3000000000001, "trailingPE": 35.2}, llm, ticker="MSFT")
+
+    assert (aapl, msft) == ("AAPL margins.", "MSFT margins.")
+    assert llm.generate_content.call_count == 2
+    assert cache.lookup("analyze_financials", financial_prompt(3000000000002), "AAPL") == "AAPL margins."
+    assert cache.lookup("analyze_financials", financial_prompt(3000000000002), "MSFT") == "MSFT margins."
+    assert cache.lookup("analyze_financials", financial_prompt(3000000000002)) is None
@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+import pytest
+
+from v2_llm_graph.src.memory.snapshot import (EMBEDDINGS_FILE, export_snapshot, load_snapshot, read_snapshot,
+                                              restore_snapshot)
+from v2_llm_graph.src.memory.vector_backends import ChromaBackend, InMemoryBackend
+
+
+@pytest.fixture
+def backend():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(50, 16)).astype(np.float32)
+    store = InMemoryBackend()
+    store.add([f"id{i}" for i in range(50)], vectors.tolist(), [f"report {i}" for i in range(50)],
+              [{"ticker": "NVDA" if i % 2 else "AAPL", "date": f"2025-01-{i % 28 + 1:02d}"} for i in range(50)])
+    return store
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_export_and_load_round_trip(tmp_path, backend, dtype):
+    """Test a snapshot loads without re-embedding and answers queries like the original"""
+    path = str(tmp_path / "snapshot")
+    manifest = export_snapshot(backend, path, dtype=dtype)
+
+    replica = load_snapshot(path)
+
+    assert manifest == {"version": 1, "count": 50, "dim": 16, "dtype": dtype}
+    assert isinstance(replica._vectors, np.memmap)
+    assert replica.count() == 50
+    query = backend.get_all()["embeddings"][7]
+    assert replica.query(query, 3)[0]["id"] == backend.query(query, 3)[0]["id"] == "id7"
+    assert replica.query(query, 3, where={"ticker": "AAPL"})[0]["metadata"]["ticker"] == "AAPL"
+
+
+def test_float16_snapshot_halves_matrix_size(tmp_path, backend):
+    export_snapshot(backend, str(tmp_path / "f32"), dtype="float32")
+    export_snapshot(backend, str(tmp_path / "f16"), dtype="float16")
+
+    f32 = os.path.getsize(tmp_path / "f32" / EMBEDDINGS_FILE)
+    f16 = os.path.getsize(tmp_path / "f16" / EMBEDDINGS_FILE)
+    assert f16 < 0.6 * f32
+
+
+def test_loaded_replica_accepts_new_entries_and_flushes_only_those(tmp_path, backend):
+    path = str(tmp_path / "snapshot")
+    export_snapshot(backend, path, dtype="float16")
+    replica = load_snapshot(path)
+
+    replica.add(["new"], [[1.0] + [0.0] * 15], ["new report"], [{"ticker": "MSFT"}])
+    target = InMemoryBackend()
+
+    assert replica.flush(target) == 1
+    assert target.get_all()["ids"] == ["new"]
+
+
+def test_restore_snapshot_into_chroma(tmp_path, backend):
+    path = str(tmp_path / "snapshot")
+    export_snapshot(backend, path)
+
+    assert restore_snapshot(path, str(tmp_path / "chroma")) == 50
+    chroma = ChromaBackend(str(tmp_path / "chroma"))
+    assert chroma.count() == 50
+    assert chroma.query(backend.get_all()["embeddings"][3], 1)[0]["id"] == "id3"
+
+
+def test_export_rejects_unknown_dtype_and_read_rejects_other_versions(tmp_path, backend):
+    with pytest.raises(ValueError):
+        export_snapshot(backend, str(tmp_path / "snapshot"), dtype="int4")
+
+    path = str(tmp_path / "snapshot")
+    export_snapshot(backend, path)
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        f.write('{"version": 99}')
+    with pytest.raises(ValueError):
+        read_snapshot(path)
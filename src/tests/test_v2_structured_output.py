@@ -0,0 +1,104 @@
+import json
+
+import pytest
+from unittest.mock import MagicMock
+from google.api_core import exceptions as google_exceptions
+
+from v2_llm_graph.src.llm.resilient_client import CallPolicy, LatencyTracker
+from v2_llm_graph.src.llm.structured_output import generate_json, parse_json
+
+KEYS = ["reasoning", "sentiment", "key_takeaways", "summary"]
+COMPLETE = {"reasoning": "Costs rise.", "sentiment": "Negative", "key_takeaways": ["a", "b"], "summary": "Bad."}
+POLICY = CallPolicy(deadline=None, max_retries=0)
+
+
+def llm_returning(*texts):
+    llm = MagicMock()
+    llm.generate_content.side_effect = [MagicMock(text=text) for text in texts]
+    return llm
+
+
+@pytest.mark.parametrize("text", [
+    json.dumps(COMPLETE),
+    "```json\n" + json.dumps(COMPLETE) + "\n```",
+    "Here is the analysis:\n" + json.dumps(COMPLETE) + "\nLet me know if you need more.",
+    '{"reasoning": "Costs rise.", "sentiment": "Negative", "key_takeaways": ["a", "b",], "summary": "Bad.",}',
+])
+def test_parse_json_tolerates_fences_prose_and_trailing_commas(text):
+    """Test common formatting slips are repaired without another LLM call"""
+    assert parse_json(text) == COMPLETE
+
+
+def test_parse_json_closes_truncated_output():
+    """Test a response cut off mid-string keeps everything that was generated"""
+    result = parse_json('{"reasoning": "Costs rise.", "sentiment": "Negative", "key_takeaways": ["a", "b')
+
+    assert result == {"reasoning": "Costs rise.", "sentiment": "Negative", "key_takeaways": ["a", "b"]}
+
+
+def test_parse_json_falls_back_to_last_complete_member():
+    """Test a response cut off after a key keeps the members before it"""
+    assert parse_json('{"reasoning": "Costs rise.", "sentiment"') == {"reasoning": "Costs rise."}
+
+
+def test_parse_json_returns_none_for_prose():
+    assert parse_json("I cannot analyze this article.") is None
+
+
+def test_generate_json_requests_json_mode_and_skips_reask_when_repairable():
+    """Test a repairable response costs exactly one call made in JSON mode"""
+    llm = llm_returning(json.dumps(COMPLETE)[:-1] + ",}")
+
+    result, _ = generate_json(llm, "prompt", KEYS, call_site="test", policy=POLICY, schema={"type": "object"})
+
+    assert result == COMPLETE
+    assert llm.generate_content.call_count == 1
+    config = llm.generate_content.call_args.kwargs["generation_config"]
+    assert config == {"response_mime_type": "application/json", "response_schema": {"type": "object"}}
+
+
+def test_generate_json_reasks_with_repair_prompt_only_when_unrecoverable():
+    """Test the re-ask sends back the broken output rather than re-running the original prompt"""
+    llm = llm_returning("Sentiment: negative, costs rise.", json.dumps(COMPLETE))
+    tracker = LatencyTracker()
+
+    result, _ = generate_json(llm, "ORIGINAL PROMPT", KEYS, call_site="test", policy=POLICY, tracker=tracker)
+
+    assert result == COMPLETE
+    repair_prompt = llm.generate_content.call_args_list[1][0][0]
+    assert "Sentiment: negative, costs rise." in repair_prompt
+    assert "ORIGINAL PROMPT" not in repair_prompt
+    assert tracker.report()["test"]["reasks"] == 1
+
+
+def test_generate_json_asks_only_for_missing_keys():
+    """Test a truncated response is completed by asking for the keys it lacks"""
+    llm = llm_returning('{"reasoning": "Costs rise.", "sentiment": "Negative", "key_takeaways": ["a", "b"]',
+                        '{"summary": "Bad."}')
+
+    result, _ = generate_json(llm, "prompt", KEYS, call_site="test", policy=POLICY)
+
+    assert result == COMPLETE
+    assert "summary" in llm.generate_content.call_args_list[1][0][0]
+
+
+def test_generate_json_falls_back_when_json_mode_is_rejected():
+    """Test models without JSON mode are called again without the generation config"""
+    llm = MagicMock()
+    llm.generate_content.side_effect = [google_exceptions.InvalidArgument("response_mime_type unsupported"),
+                                        MagicMock(text=json.dumps(COMPLETE))]
+
+    result, _ = generate_json(llm, "prompt", KEYS, call_site="test", policy=POLICY)
+
+    assert result == COMPLETE
+    assert "generation_config" not in llm.generate_content.call_args.kwargs
+
+
+def test_generate_json_accepts_well_formed_partial_objects():
+    """Test a complete JSON object without every key is returned without a re-ask"""
+    llm = llm_returning('{"sentiment": "Neutral"}')
+
+    result, _ = generate_json(llm, "prompt", KEYS, call_site="test", policy=POLICY)
+
+    assert result == {"sentiment": "Neutral"}
+    assert llm.generate_content.call_count == 1
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from v2_llm_graph.src.memory.vector_backends import (ChromaBackend, InMemoryBackend, flush_memory_backends,
+                                                     matches_where, open_backend)
+from v2_llm_graph.src.memory import vector_backends
+from v2_llm_graph.src.memory.vector_memory import VectorMemory
+
+
+def unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+@pytest.fixture
+def backend():
+    store = InMemoryBackend(capacity=2)
+    store.add(["a", "b", "c"], [unit(1, 0), unit(1, 1), unit(0, 1)], ["doc a", "doc b", "doc c"],
+              [{"ticker": "NVDA", "year": 2024}, {"ticker": "NVDA", "year": 2025}, {"ticker": "AAPL", "year": 2025}])
+    return store
+
+
+def test_query_ranks_by_cosine_distance(backend):
+    hits = backend.query(unit(1, 0.1), n_results=2)
+
+    assert [hit["id"] for hit in hits] == ["a", "b"]
+    assert hits[0]["distance"] < hits[1]["distance"]
+    assert hits[0]["document"] == "doc a" and hits[0]["metadata"]["ticker"] == "NVDA"
+
+
+def test_query_applies_where_filter(backend):
+    assert [hit["id"] for hit in backend.query(unit(1, 0), 3, where={"ticker": "AAPL"})] == ["c"]
+    assert [hit["id"] for hit in backend.query(unit(1, 0), 3, where={"year": {"$gte": 2025}})] == ["b", "c"]
+    both = {"$and": [{"ticker": {"$in": ["NVDA"]}}, {"year": {"$ne": 2024}}]}
+    assert [hit["id"] for hit in backend.query(unit(1, 0), 3, where=both)] == ["b"]
+    assert backend.query(unit(1, 0), 3, where={"ticker": "MSFT"}) == []
+
+
+def test_matches_where_rejects_unknown_operators():
+    with pytest.raises(ValueError):
+        matches_where({"year": 2025}, {"year": {"$regex": "20"}})
+
+
+def test_add_grows_matrix_and_ignores_existing_ids(backend):
+    backend.add(["a", "d"], [unit(0, 1), unit(-1, 0)], ["changed", "doc d"], [{}, {}])
+
+    assert backend.count() == 4
+    assert backend.query(unit(1, 0), 1)[0]["document"] == "doc a"
+
+
+def test_load_from_chroma_and_flush_only_new_entries(tmp_path, backend):
+    """Test a batch job can load a Chroma snapshot, work in RAM and write back only what it added"""
+    chroma = ChromaBackend(str(tmp_path / "chroma"))
+    records = backend.get_all()
+    chroma.add(records["ids"], records["embeddings"], records["documents"], records["metadatas"])
+
+    in_memory = InMemoryBackend()
+    assert in_memory.load(chroma) == 3
+    in_memory.add(["d"], [unit(-1, 0)], ["doc d"], [{"ticker": "MSFT"}])
+
+    assert in_memory.flush(chroma) == 1
+    assert chroma.count() == 4
+    assert in_memory.pending() == 0
+    assert [hit["id"] for hit in chroma.query(unit(-1, 0), 1)] == ["d"]
+
+
+def test_memory_backend_is_shared_per_path_and_flushed(tmp_path):
+    path = str(tmp_path / "chroma")
+    first = VectorMemory(db_path=path, backend=open_backend(path, kind="memory"))
+    first.add_analysis("NVDA", "Nvidia report")
+
+    second = VectorMemory(db_path=path, backend=open_backend(path, kind="memory"))
+    assert second.query_memory("Nvidia report", n_results=1, where={"ticker": "NVDA"}) == ["Nvidia report"]
+
+    assert flush_memory_backends() == 1
+    assert ChromaBackend(path).count() == 1
+
+
+def test_open_backend_rejects_unknown_kind(tmp_path):
+    with pytest.raises(ValueError):
+        open_backend(str(tmp_path), kind="faiss")
+
+
+def test_memory_backends_are_flushed_at_exit(tmp_path, monkeypatch):
+    registered = []
+    monkeypatch.setattr(vector_backends, "_flush_at_exit", False)
+    monkeypatch.setattr(vector_backends.atexit, "register", registered.append)
+
+    open_backend(str(tmp_path / "a"), kind="memory")
+    open_backend(str(tmp_path / "b"), kind="memory")
+
+    assert registered == [flush_memory_backends]
@@ -3,6 +3,7 @@ from unittest.mock import patch, MagicMock
 import json
 from v2_llm_graph.src.workflows.news_analysis_chain import analyze_article_chain
 from v2_llm_graph.src.workflows.specialist_router import route_and_execute_task
+from v2_llm_graph.src.workflows.prompt_builder import compact_serialize
 
 # News Analysis Chain Tests
 @pytest.fixture
@@ -118,7 +119,7 @@ def test_route_financial_analysis(mock_specialist_llm):
     assert result == "Specialist analysis result"
     prompt = mock_specialist_llm.generate_content.call_args[0][0]
     assert "Quantitative Financial Analyst" in prompt
-    assert str(test_data) in prompt
+    assert compact_serialize(test_data) in prompt
 
 def test_route_news_analysis(mock_specialist_llm):
     """
@@ -137,7 +138,7 @@ def test_route_news_analysis(mock_specialist_llm):
     assert result == "Specialist analysis result"
     prompt = mock_specialist_llm.generate_content.call_args[0][0]
     assert "Investment News Analyst" in prompt
-    assert str(test_data) in prompt
+    assert compact_serialize(test_data) in prompt
 
 def test_route_market_analysis(mock_specialist_llm):
     """
@@ -156,7 +157,7 @@ def test_route_market_analysis(mock_specialist_llm):
     assert result == "Specialist analysis result"
     prompt = mock_specialist_llm.generate_content.call_args[0][0]
     assert "Macroeconomic Analyst" in prompt
-    assert str(test_data) in prompt
+    assert compact_serialize(test_data) in prompt
 
 def test_route_invalid_task(mock_specialist_llm):
     """
@@ -0,0 +1,70 @@
+from typing import Dict, List, Any
+
+import numpy as np
+import pandas as pd
+
+FRESH_DAYS = 7
+_EMPTY = {}
+
+
+def reflection_feedback(avg_score: float) -> str:
+    return f"Avg {avg_score:.2f}: {'Excellent' if avg_score >= 0.9 else 'Good' if avg_score >= 0.75 else 'Refine: Boost depth with more insights'}"
+
+
+def step_table(reports: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Flattens every report's plan into one row per (report, step) with error flag and raw timestamp."""
+    plans = [report.get('plan', []) for report in reports]
+    step_data = [results.get(step, _EMPTY) for report, plan in zip(reports, plans)
+                 for results in (report.get('results', _EMPTY),) for step in plan]
+    return pd.DataFrame({
+        'report': np.repeat(np.arange(len(reports)), [len(plan) for plan in plans]),
+        'has_error': np.fromiter(('error' in data for data in step_data), dtype=bool, count=len(step_data)),
+        'timestamp': [data.get('timestamp') for data in step_data],
+    })
+
+
+def report_table(reports: List[Dict[str, Any]]) -> pd.DataFrame:
+    """One row per report: run timestamp, plan length, insight count and distinct news sentiments."""
+    def news_sentiments(report):
+        classified = report['results'].get('news', {}).get('news', {}).get('classified', [])
+        return len(set(item['sentiment'] for item in classified)) if classified else 0
+
+    return pd.DataFrame({
+        'timestamp': [report['timestamp'] for report in reports],
+        'plan_len': [len(report.get('plan', [])) for report in reports],
+        'insight_len': [len(report['results'].get('financials', {}).get('financials', {}).get('insights', [])) for report in reports],
+        'news_sentiments': [news_sentiments(report) for report in reports],
+    })
+
+
+def score_reports(reports: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Batch version of InvestmentResearchAgent.self_reflect: same reflection dict per report
+    (also stored in report['reflection']), scored with column operations over all plan steps."""
+    if not reports:
+        return []
+    per_report = report_table(reports)
+    steps = step_table(reports)
+    report_idx = steps['report'].to_numpy()
+    run_ts = pd.to_datetime(per_report['timestamp'], format='ISO8601', errors='coerce').to_numpy()
+    step_ts = pd.to_datetime(steps['timestamp'], format='ISO8601', errors='coerce').to_numpy()
+    # Like timedelta.days < 7: days are floored, future timestamps count as fresh, missing or bad ones as stale
+    with np.errstate(invalid='ignore'):
+        age_days = (run_ts[report_idx] - step_ts) // np.timedelta64(1, 'D')
+    fresh_steps = ~np.isnat(step_ts) & ~np.isnat(run_ts[report_idx]) & (age_days < FRESH_DAYS)
+    ok_steps = ~steps['has_error'].to_numpy()
+
+    n = len(reports)
+    plan_len = per_report['plan_len'].to_numpy()
+    divisor = np.maximum(plan_len, 1)
+    error_free = np.where(plan_len > 0, np.bincount(report_idx, weights=ok_steps, minlength=n) / divisor, 0.0)
+    fresh = np.where(plan_len > 0, np.bincount(report_idx, weights=fresh_steps, minlength=n) / divisor, 0.0)
+    completeness = error_free
+    depth = np.minimum(1.0, (per_report['insight_len'].to_numpy() + per_report['news_sentiments'].to_numpy()) / 2.0)
+    accuracy = (fresh + error_free) / 2
+    avg_score = (completeness + depth + accuracy) / 3
+
+    reflections = []
+    for report, c, d, a, avg in zip(reports, completeness.tolist(), depth.tolist(), accuracy.tolist(), avg_score.tolist()):
+        report['reflection'] = {'scores': {'completeness': c, 'depth': d, 'accuracy': a}, 'feedback': reflection_feedback(avg), 'avg_score': avg}
+        reflections.append(report['reflection'])
+    return reflections
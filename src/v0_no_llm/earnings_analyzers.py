@@ -1,22 +1,86 @@
-from typing import Dict, Any
-from datetime import datetime, timedelta
+import os
+from typing import Dict, Any, List
+
+import numpy as np
+import pandas as pd
+
+# Earnings previews: one row per (symbol, date) with eps_forecast and revenue_forecast (billions).
+# CSV or Parquet; override with EARNINGS_CALENDAR_FILE.
+EARNINGS_CALENDAR_FILE = os.getenv('EARNINGS_CALENDAR_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'earnings_calendar.csv'))
+
+PE_RISK_THRESHOLD = 30
+REVENUE_THRESHOLD_B = 100  # Used when a symbol has no revenue forecast
+
+
+class EarningsCalendar:
+    """Earnings previews indexed by (symbol, date)."""
+
+    def __init__(self, table: pd.DataFrame):
+        table = table.assign(symbol=table['symbol'].str.upper(), date=pd.to_datetime(table['date']))
+        self.table = table.set_index(['symbol', 'date']).sort_index()
+
+    @classmethod
+    def load(cls, path: str = None) -> 'EarningsCalendar':
+        path = path or EARNINGS_CALENDAR_FILE
+        if not os.path.exists(path):
+            print(f"Earnings calendar not found at {path}; no previews loaded")
+            return cls(pd.DataFrame(columns=['symbol', 'date', 'eps_forecast', 'revenue_forecast']))
+        table = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+        return cls(table)
+
+    def previews(self, symbols: List[str], as_of=None) -> pd.DataFrame:
+        """Per symbol, the next preview on or after as_of (default today), else the latest past one with stale=True."""
+        as_of = pd.Timestamp(as_of) if as_of is not None else pd.Timestamp.now().normalize()
+        table = self.table[self.table.index.get_level_values('symbol').isin([s.upper() for s in symbols])].reset_index()
+        upcoming = table[table['date'] >= as_of].groupby('symbol').first()
+        latest = table.groupby('symbol').last()
+        previews = upcoming.combine_first(latest).rename(columns={'date': 'earnings_date'})
+        previews['stale'] = previews['earnings_date'] < as_of
+        return previews
+
+    def preview(self, symbol: str, as_of=None) -> Dict[str, Any]:
+        previews = self.previews([symbol], as_of)
+        if previews.empty:
+            return {}
+        row = previews.iloc[0]
+        return {'date': row['earnings_date'].strftime('%Y-%m-%d'), 'eps_forecast': float(row['eps_forecast']), 'revenue_forecast': float(row['revenue_forecast']), 'stale': bool(row['stale'])}
+
 
 class EarningsAnalyzer:
-    def __init__(self):
-        self.earnings_preview = {  # Updated Oct 11, 2025
-            'AAPL': {'date': '2025-10-30', 'eps_forecast': 1.74, 'revenue_forecast': 101.72}  # Billions
-        }
-    
-    def analyze(self, financials: Dict[str, Any]) -> Dict[str, Any]:
-        revenue = financials.get('revenue', 0) / 1e9
-        pe = financials.get('pe_ratio', 0)
+    def __init__(self, calendar: EarningsCalendar = None):
+        self.calendar = calendar or EarningsCalendar.load()
+
+    def analyze_universe(self, financials: pd.DataFrame, as_of=None) -> pd.DataFrame:
+        """Vectorized analysis: one row per symbol (a symbol column or index, revenue, pe_ratio) in, one row of flags out."""
+        frame = financials.reset_index() if 'symbol' not in financials.columns else financials.copy()
+        frame['symbol'] = frame['symbol'].str.upper()
+        for column in ('revenue', 'pe_ratio'):  # Missing figures count as 0, as in analyze()
+            if column not in frame.columns:
+                frame[column] = 0
+        previews = self.calendar.previews(frame['symbol'].tolist(), as_of)
+        frame = frame.merge(previews, left_on='symbol', right_index=True, how='left')
+        frame['stale'] = frame['stale'].eq(True)  # No calendar row: nothing to be stale
+        frame['revenue_b'] = frame['revenue'].fillna(0) / 1e9
+        frame['high_valuation_risk'] = frame['pe_ratio'].fillna(0) > PE_RISK_THRESHOLD
+        frame['strong_revenue'] = frame['revenue_b'] > frame['revenue_forecast'].fillna(REVENUE_THRESHOLD_B)
+        frame['risk_score'] = frame['high_valuation_risk'].astype(int)
+        return frame.set_index('symbol')
+
+    def analyze(self, financials: Dict[str, Any], symbol: str = 'AAPL', as_of=None) -> Dict[str, Any]:
+        row = self.analyze_universe(pd.DataFrame([{**financials, 'symbol': symbol}]), as_of).iloc[0]
         insights = []
-        if pe > 30:
+        if row['high_valuation_risk']:
             insights.append('high_valuation_risk: PE above historical avg')
-        if revenue > 100:  # Q4 forecast context
-            insights.append('strong_revenue: TTM aligns with Q4 $101.72B forecast')
-        # Tie to preview
-        preview = self.earnings_preview.get('AAPL', {})
-        insights.append(f'earnings_preview: {preview["date"]}, EPS ${preview["eps_forecast"]}, Rev ${preview["revenue_forecast"]}B')
-        risk_score = len([i for i in insights if 'risk' in i.lower()])
-        return {'financials': financials, 'insights': insights, 'risk_score': risk_score}
\ No newline at end of file
+        has_preview = not pd.isna(row['earnings_date'])
+        if row['strong_revenue']:
+            target = row['revenue_forecast'] if has_preview else REVENUE_THRESHOLD_B
+            insights.append(f'strong_revenue: TTM aligns with ${target}B forecast')
+        # Tie to preview; a past one is only the last known figures, not an upcoming report
+        if has_preview and row['stale']:
+            insights.append(f"earnings_preview: stale, last {row['earnings_date']:%Y-%m-%d}, EPS ${row['eps_forecast']}, Rev ${row['revenue_forecast']}B; none scheduled for {symbol}")
+        elif has_preview:
+            insights.append(f"earnings_preview: {row['earnings_date']:%Y-%m-%d}, EPS ${row['eps_forecast']}, Rev ${row['revenue_forecast']}B")
+        else:
+            insights.append(f'earnings_preview: none scheduled for {symbol}')
+        risk_score = int(row['risk_score'])
+        return {'financials': financials, 'insights': insights, 'risk_score': risk_score}
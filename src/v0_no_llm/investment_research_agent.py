@@ -3,14 +3,17 @@ import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Any
 
+from batch_reflection import reflection_feedback, score_reports
+from report_writer import ReportWriter
 from tool_router import ToolRouter
 
 class InvestmentResearchAgent:
-    def __init__(self, memory_file: str = 'agent_memory.json', output_file: str = 'test_output.json'):
+    def __init__(self, memory_file: str = 'agent_memory.json', output_file: str = None, tool_router: ToolRouter = None, output_dir: str = None):
         self.memory_file = memory_file
-        self.output_file = output_file
+        self.output_file = output_file  # Default: <output_dir>/<symbol>_report.json
+        self.report_writer = ReportWriter(output_dir)
         self.memory = self.load_memory()
-        self.tool_router = ToolRouter()
+        self.tool_router = tool_router or ToolRouter()  # Pass a MemoizedToolRouter to share fetches across a batch
         self.plan = []
     
     def load_memory(self) -> Dict:
@@ -93,10 +96,14 @@ class InvestmentResearchAgent:
         error_free = sum(1 for step in plan if 'error' not in report['results'].get(step, {})) / len(plan) if len(plan) > 0 else 0
         scores['accuracy'] = (fresh + error_free) / 2
         avg_score = sum(scores.values()) / len(scores)
-        feedback = f"Avg {avg_score:.2f}: {'Excellent' if avg_score >= 0.9 else 'Good' if avg_score >= 0.75 else 'Refine: Boost depth with more insights'}"
+        feedback = reflection_feedback(avg_score)
         report['reflection'] = {'scores': scores, 'feedback': feedback, 'avg_score': avg_score}
         return report['reflection']
     
+    def batch_self_reflect(self, reports: List[Dict[str, Any]]) -> List[Dict]:
+        # Same reflection dicts as self_reflect, scored in one vectorized pass (e.g. QA over historical reports)
+        return score_reports(reports)
+    
     def research(self, symbol: str, max_refines: int = 2) -> Dict[str, Any]:
         iteration = 0
         report = self.generate_report({}, symbol)
@@ -109,7 +116,7 @@ class InvestmentResearchAgent:
                 break
             low_crit = min(reflection['scores'], key=reflection['scores'].get)
             low_step = 'financials' if low_crit == 'depth' else 'news'
-            report['results'][low_step] = self.tool_router.route(low_step, symbol)
+            report['results'][low_step] = self.tool_router.route(low_step, symbol, refresh=True)  # Bypass a batch cache
             iteration += 1
             report['refinement'] = f"Refined {low_step} for {low_crit} (iter {iteration})"
         # Learning: Extract & store insights
@@ -125,16 +132,6 @@ class InvestmentResearchAgent:
         if 'earnings_preview_needed' not in self.memory['insights'].get(symbol, []):
             self.memory['insights'][symbol].append('earnings_preview_needed')  # Flag for future
         self.save_memory()
-        # Markdown export
-        md_report = f"# Research Report: {report['symbol']}\n\n"
-        md_report += f"**Timestamp**: {report['timestamp']}\n\n"
-        md_report += f"**Plan**: {', '.join(report['plan'])}\n\n"
-        for key, data in report['results'].items():
-            md_report += f"## {key.upper()}\n{json.dumps(data, indent=2)[:200]}...\n\n"
-        md_report += f"**Reflection**: {report['reflection']['feedback']} (Avg: {report['reflection']['avg_score']:.2f})\n"
-        md_report += f"**Learned**: {report['learned_insights']}\n"
-        with open(f"{symbol}_report.md", 'w') as md:
-            md.write(md_report)
-        with open(self.output_file, 'w') as f:
-            json.dump(report, f, indent=2)
+        # JSON (long arrays in an .npz sidecar) and Markdown export
+        self.report_writer.write(report, self.output_file)
         return report
\ No newline at end of file
@@ -0,0 +1,89 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any
+
+from tool_router import ToolRouter
+
+# Steps whose result does not depend on the symbol: fetched once per batch.
+# fetch_edgar still returns the same placeholder filing for every symbol; drop it from here
+# once it fetches real per-company filings.
+SHARED_STEPS = ('economic', 'edgar')
+
+DEFAULT_WORKERS = 4
+
+
+class MemoizedToolRouter(ToolRouter):
+    """Per-run tool cache: shared steps once per batch, other steps once per (symbol, step, params).
+
+    Whatever a tool returns is cached, including its fallback mock data when a fetch fails, so a
+    failed fetch is served for the rest of the batch. route(..., refresh=True) fetches again and
+    replaces the entry; research() uses it for the step it refines.
+    """
+
+    def __init__(self, shared_steps: tuple = SHARED_STEPS):
+        super().__init__()
+        self.shared_steps = set(shared_steps)
+        self.cache = {}
+        self.stats = {'hits': 0, 'misses': 0}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def cache_key(self, task: str, symbol: str, **kwargs) -> tuple:
+        params = tuple(sorted(kwargs.items()))
+        return (task, params) if task in self.shared_steps else (symbol, task, params)
+
+    def route(self, task: str, symbol: str, refresh: bool = False, **kwargs) -> Dict[str, Any]:
+        key = self.cache_key(task, symbol, **kwargs)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # One lock per key: concurrent callers of the same step wait for the first fetch instead of repeating it
+        with key_lock:
+            with self._lock:
+                if key in self.cache and not refresh:
+                    self.stats['hits'] += 1
+                    return self.cache[key]
+            result = super().route(task, symbol, **kwargs)  # Errors propagate and are not cached
+            with self._lock:
+                self.cache[key] = result
+                self.stats['misses'] += 1
+            return result
+
+
+def prefetch(agent, symbols: List[str], max_workers: int = DEFAULT_WORKERS) -> Dict[str, int]:
+    """Fetches every planned step of every symbol concurrently through the agent's router."""
+    tasks = {(step, symbol) for symbol in symbols for step in list(agent.plan_research(symbol))}
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(agent.tool_router.route, step, symbol) for step, symbol in tasks]
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:  # Unknown steps etc. surface again in research()
+                failed += 1
+                print(f"Prefetch error: {e}")
+    return {'tasks': len(tasks), 'failed': failed}
+
+
+def research_batch(symbols: List[str], max_workers: int = DEFAULT_WORKERS, **agent_kwargs) -> Dict[str, Dict[str, Any]]:
+    """Researches many symbols with one shared MemoizedToolRouter.
+
+    Tool calls run concurrently in prefetch(); research() then runs per symbol from the cache,
+    so the agent's memory file and outputs are still written one symbol at a time.
+    """
+    from investment_research_agent import InvestmentResearchAgent
+
+    router = MemoizedToolRouter()
+    agent = InvestmentResearchAgent(tool_router=router, **agent_kwargs)
+    prefetch(agent, symbols, max_workers)
+    reports = {symbol: agent.research(symbol) for symbol in symbols}
+    print(f"Tool cache: {router.stats['hits']} hits, {router.stats['misses']} fetches for {len(symbols)} symbols")
+    return reports
+
+
+if __name__ == "__main__":
+    # Run from v0_no_llm/: python memoized_router.py AAPL TSLA MSFT
+    import sys
+
+    reports = research_batch(sys.argv[1:] or ['AAPL', 'TSLA'])
+    for symbol, report in reports.items():
+        print(f"{symbol}: {report['reflection']['feedback']}")
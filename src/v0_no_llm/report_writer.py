@@ -0,0 +1,120 @@
+import io
+import json
+import os
+import tempfile
+from typing import Dict, Any
+
+import numpy as np
+
+# Where per-symbol reports are written; override with RESEARCH_OUTPUT_DIR.
+OUTPUT_DIR = os.getenv('RESEARCH_OUTPUT_DIR', 'reports')
+
+SIDECAR_MIN_LENGTH = 64  # Numeric lists at least this long go to the .npz sidecar
+PREVIEW_CHARS = 200
+SIDECAR_REF = '$sidecar'
+
+
+def atomic_write(path: str, data: bytes):
+    """Writes to a temporary file next to path and renames it into place."""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def preview(data: Any, limit: int = PREVIEW_CHARS) -> str:
+    """Same text as json.dumps(data, indent=2)[:limit], but stops encoding once limit is reached."""
+    parts, size = [], 0
+    for chunk in json.JSONEncoder(indent=2, default=str).iterencode(data):
+        parts.append(chunk)
+        size += len(chunk)
+        if size >= limit:
+            break
+    return ''.join(parts)[:limit]
+
+
+def _is_numeric_array(value: Any) -> bool:
+    if not isinstance(value, list) or len(value) < SIDECAR_MIN_LENGTH:
+        return False
+    return all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value)
+
+
+def split_arrays(data: Any, sidecar_name: str, arrays: Dict[str, np.ndarray], path: str = '') -> Any:
+    """Replaces long numeric lists with references and collects them in arrays (key = JSON path)."""
+    if isinstance(data, dict):
+        return {k: split_arrays(v, sidecar_name, arrays, f'{path}/{k}') for k, v in data.items()}
+    if _is_numeric_array(data):
+        arrays[path.lstrip('/')] = np.asarray(data)
+        return {SIDECAR_REF: sidecar_name, 'key': path.lstrip('/'), 'length': len(data)}
+    if isinstance(data, list):
+        return [split_arrays(v, sidecar_name, arrays, f'{path}/{i}') for i, v in enumerate(data)]
+    return data
+
+
+def join_arrays(data: Any, arrays) -> Any:
+    if isinstance(data, dict):
+        if SIDECAR_REF in data:
+            return arrays[data['key']].tolist()
+        return {k: join_arrays(v, arrays) for k, v in data.items()}
+    if isinstance(data, list):
+        return [join_arrays(v, arrays) for v in data]
+    return data
+
+
+class ReportWriter:
+    """Writes a research report as compact JSON plus an .npz sidecar for long numeric arrays
+    (price history), and a Markdown summary. Every file is written atomically."""
+
+    def __init__(self, output_dir: str = None):
+        self.output_dir = output_dir or OUTPUT_DIR
+
+    def paths(self, symbol: str) -> Dict[str, str]:
+        base = os.path.join(self.output_dir, f'{symbol}_report')
+        return {'json': base + '.json', 'sidecar': base + '.npz', 'markdown': base + '.md'}
+
+    def render_markdown(self, report: Dict[str, Any]) -> str:
+        md_report = f"# Research Report: {report['symbol']}\n\n"
+        md_report += f"**Timestamp**: {report['timestamp']}\n\n"
+        md_report += f"**Plan**: {', '.join(report['plan'])}\n\n"
+        for key, data in report['results'].items():
+            md_report += f"## {key.upper()}\n{preview(data)}...\n\n"
+        md_report += f"**Reflection**: {report['reflection']['feedback']} (Avg: {report['reflection']['avg_score']:.2f})\n"
+        md_report += f"**Learned**: {report['learned_insights']}\n"
+        return md_report
+
+    def write(self, report: Dict[str, Any], json_path: str = None) -> Dict[str, str]:
+        paths = self.paths(report['symbol'])
+        if json_path:
+            paths['json'] = json_path
+            paths['sidecar'] = os.path.splitext(json_path)[0] + '.npz'
+        arrays = {}
+        compact = split_arrays(report, os.path.basename(paths['sidecar']), arrays)
+        if arrays:
+            buffer = io.BytesIO()
+            np.savez_compressed(buffer, **arrays)
+            atomic_write(paths['sidecar'], buffer.getvalue())
+        else:
+            # A sidecar left by an earlier report would be joined back into this one by load_report
+            sidecar = paths.pop('sidecar')
+            if os.path.exists(sidecar):
+                os.unlink(sidecar)
+        atomic_write(paths['json'], json.dumps(compact, separators=(',', ':'), default=str).encode('utf-8'))
+        atomic_write(paths['markdown'], self.render_markdown(report).encode('utf-8'))
+        return paths
+
+
+def load_report(json_path: str) -> Dict[str, Any]:
+    """Reads a report written by ReportWriter, with sidecar arrays restored as lists."""
+    with open(json_path) as f:
+        report = json.load(f)
+    sidecar = os.path.splitext(json_path)[0] + '.npz'
+    if not os.path.exists(sidecar):
+        return report
+    with np.load(sidecar) as arrays:
+        return join_arrays(report, arrays)
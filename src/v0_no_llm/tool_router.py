@@ -6,7 +6,7 @@ from typing import Dict, List, Any
 import yfinance as yf
 
 from news_processor import NewsProcessor
-from src.no_llm.earnings_analyzers import EarningsAnalyzer
+from earnings_analyzers import EarningsAnalyzer
 
 # Placeholder for tools (in full build, integrate actual APIs/tools)
 class ToolRouter:
@@ -21,7 +21,8 @@ class ToolRouter:
         self.news_processor = NewsProcessor()
         self.earnings_analyzer = EarningsAnalyzer()
     
-    def route(self, task: str, symbol: str, **kwargs) -> Dict[str, Any]:
+    def route(self, task: str, symbol: str, refresh: bool = False, **kwargs) -> Dict[str, Any]:
+        # Every call fetches; refresh only matters for caching routers (MemoizedToolRouter)
         if task in self.tools:
             return self.tools[task](symbol, **kwargs)
         raise ValueError(f"Unknown task: {task}")
@@ -58,7 +59,7 @@ class ToolRouter:
                 'market_cap': info.get('marketCap', 0)
             }
             # Route to specialist
-            analyzed = self.earnings_analyzer.analyze(fin)
+            analyzed = self.earnings_analyzer.analyze(fin, symbol)
             return {'financials': analyzed, 'timestamp': datetime.now().isoformat()}
         except Exception as e:
             print(f"Financials fetch error for {symbol}: {e}")
@@ -69,7 +70,7 @@ class ToolRouter:
                 'gross_profit': 169148000000,  # FY24
                 'market_cap': 3910350000000  # Approx from revenue/growth
             }
-            analyzed = self.earnings_analyzer.analyze(fallback_fin)
+            analyzed = self.earnings_analyzer.analyze(fallback_fin, symbol)
             return {'financials': analyzed, 'timestamp': datetime.now().isoformat()}
     
     def fetch_news(self, symbol: str, limit: int = 5) -> Dict[str, Any]:
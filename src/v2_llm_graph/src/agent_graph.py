@@ -1,20 +1,48 @@
+import asyncio
 import os
 from typing import TypedDict, List, Annotated
 import operator
 
 from dotenv import load_dotenv
 import google.generativeai as genai
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, END
 
+# Load .env before importing the project's modules: their settings (model tiers, call policy,
+# vector backend, caches) are read from the environment when they are imported.
+load_dotenv()
+
 # --- Import all our project's tools and workflows ---
 from .tools.financial_data_fetcher import get_stock_fundamentals, get_macro_economic_data
 from .tools.news_fetcher import get_company_news
-from .tools.sec_filings_fetcher import get_latest_sec_filings
-from .workflows.news_analysis_chain import analyze_article_chain
+from .tools.news_index import NewsIndex
+from .tools.sec_filings_cache import aget_cached_sec_filings, get_cached_sec_filings, refresh_filing_index
+from .tools.sec_section_extractor import load_filing_sections, with_filing_sections
+from .tools.async_fetchers import (
+    aget_company_news,
+    aget_macro_economic_data,
+    aget_stock_fundamentals,
+    close_async_client,
+)
+from .workflows.news_analysis_chain import NEWS_ANALYSIS_PROMPT_VERSION, analyze_article_chain
 from .workflows.specialist_router import route_and_execute_task
 from .workflows.report_evaluator import SYNTHESIS_PROMPT_TEMPLATE, EVALUATOR_PROMPT_TEMPLATE, REFINEMENT_PROMPT_TEMPLATE
+from .workflows.revision_gate import GATE_STATS, decide_revision
+from .workflows.filing_summarizer import summarize_filing_sections
+from .workflows.prompt_builder import SYNTHESIS_BUDGETS, REFINEMENT_BUDGETS, build_prompt, format_token_report
+from .llm.resilient_client import LATENCY_TRACKER, call_llm, policy_from_env, stream_llm
+from .llm.model_router import MODEL_TIERS, load_task_tiers, tier_for_task
 # memory using chromadb
-from .memory.vector_memory import VectorMemory
+from .memory.vector_memory import MEMORY_CONTEXT_CHARS, MEMORY_CONTEXT_SECTIONS, VectorMemory
+# checkpoints for resumable runs
+from .memory.checkpoint_store import open_checkpointer, run_status, thread_config
+# input fingerprints for skipping unchanged runs
+from .memory.article_cache import ArticleAnalysisCache
+from .memory.embedding_service import get_embedding_service
+from .memory.semantic_cache import get_semantic_cache
+from .memory.vector_backends import flush_memory_backends
+from .memory.report_cache import DEFAULT_REPORT_CACHE_PATH, ReportCache, changed_inputs, input_fingerprints
 
 
 # --- 1. Define the Agent's State ---
@@ -36,12 +64,83 @@ class AgentState(TypedDict):
     feedback: str
     final_report: str
     revision_count: int
+    # estimated prompt tokens per section, keyed by prompt name
+    prompt_tokens: dict
+    # input fingerprints and the outputs reused from the previous run of the ticker
+    input_fingerprints: dict
+    reused_analyses: dict
+    report_reused: bool
  
 
 # --- Configure the LLM ---
-load_dotenv()
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-llm = genai.GenerativeModel('gemini-2.5-pro', generation_config={'temperature': 0.2})
+llm = genai.GenerativeModel(MODEL_TIERS['large'], generation_config={'temperature': 0.2})
+fast_llm = genai.GenerativeModel(MODEL_TIERS['fast'], generation_config={'temperature': 0.2})
+
+# Per-task model routing (see llm/model_router.py). Override with MODEL_ROUTES="task=tier,...".
+TASK_TIERS = load_task_tiers()
+
+
+def llm_for(task: str):
+    """
+    Returns the model instance that serves the given task according to TASK_TIERS.
+    """
+    return fast_llm if tier_for_task(task, TASK_TIERS) == "fast" else llm
+
+
+# Per-call deadline, retry and hedging policy for every LLM call made by the graph.
+# Hedged duplicate requests are opt-in because they can double spend on slow calls.
+LLM_CALL_POLICY = policy_from_env()
+
+# The revision gate decides from the evaluator's verdict line or a local heuristic.
+# Set USE_LLM_GATE=true to send ambiguous feedback to the LLM instead of defaulting to a revision.
+USE_LLM_GATE = os.getenv("USE_LLM_GATE", "false").lower() == "true"
+
+# Reuse of previous runs when the gathered inputs are unchanged (see memory/report_cache.py):
+#   off     - always run the full graph
+#   full    - return the stored report when every input fingerprint matches
+#   partial - as full, and otherwise re-run only the specialists whose inputs changed
+REPORT_REUSE_MODE = os.getenv("REPORT_REUSE_MODE", "full").lower()
+REPORT_CACHE_PATH = DEFAULT_REPORT_CACHE_PATH
+
+# The state fields each specialist produces. They are reused together when its inputs are unchanged.
+SPECIALIST_OUTPUTS = {
+    "analyze_financials": ("financial_analysis",),
+    "analyze_news_impact": ("structured_news_analysis", "news_impact_analysis"),
+    "analyze_market_context": ("market_context_analysis",),
+}
+
+# News is fetched from the publishedAt watermark onwards and collapsed to distinct stories
+# (see tools/news_index.py). NEWS_FETCH_SIZE leaves room for the duplicates that get dropped.
+NEWS_ARTICLES = 3
+NEWS_FETCH_SIZE = 10
+
+REPORT_ERROR_PREFIX = "Error generating report"
+EVALUATION_ERROR_PREFIX = "Evaluation failed"
+
+
+def is_error_report(report: str) -> bool:
+    """
+    Returns True if the report text is the placeholder written when synthesis failed.
+    """
+    return bool(report) and report.startswith(REPORT_ERROR_PREFIX)
+
+
+def generate_report_text(task: str, prompt: str, config: RunnableConfig = None) -> str:
+    """
+    Generates report text for a synthesis or refinement node. When the run was started with
+    `configurable.stream_report=True`, the response is streamed and every chunk is emitted as a
+    LangGraph custom stream event {"node": task, "token": text} while it is being generated.
+    """
+    model = llm_for(task)
+    if not (config or {}).get("configurable", {}).get("stream_report"):
+        return call_llm(model, prompt, call_site=task, policy=LLM_CALL_POLICY).text
+    writer = get_stream_writer()
+    parts = []
+    for text in stream_llm(model, prompt, call_site=task, policy=LLM_CALL_POLICY):
+        parts.append(text)
+        writer({"node": task, "token": text})
+    return "".join(parts)
 
 # --- 2. Define the Graph Nodes ---
 # Each node is a function that takes the state as input and returns a dictionary to update the state.
@@ -49,10 +148,36 @@ llm = genai.GenerativeModel('gemini-2.5-pro', generation_config={'temperature':
 def sec_filings_node(state: AgentState):
     print("[Node]: Fetching SEC Filings...")
     company_ticker = state['company_ticker']
-    sec_data = get_latest_sec_filings(company_ticker, os.getenv("SEC_API_KEY"))
+    # Served from the local filing index, which asks sec-api at most once per SEC_INDEX_MAX_AGE_HOURS.
+    sec_data = get_cached_sec_filings(company_ticker, os.getenv("SEC_API_KEY"))
+    # Item 1A / Item 7 text, downloaded and parsed once per accession number.
+    sec_data = with_filing_sections(sec_data)
+    return {"sec_filings_data": sec_data}
+
+
+async def asec_filings_node(state: AgentState):
+    print("[Node]: Fetching SEC Filings (async)...")
+    sec_data = await aget_cached_sec_filings(state['company_ticker'], os.getenv("SEC_API_KEY"))
+    sec_data = await asyncio.to_thread(with_filing_sections, sec_data)
     return {"sec_filings_data": sec_data}
 
 
+def dedupe_news(news_index, company_name: str, news_data: dict) -> dict:
+    """
+    Folds fetched news into the news index and returns the latest distinct stories for the company.
+    Without an index (or if it fails), the fetched news is passed through as is.
+    """
+    if news_index is None:
+        return news_data
+    try:
+        return news_index.merge(company_name, news_data, NEWS_ARTICLES)
+    except Exception as e:
+        print(f"[Error] News deduplication failed: {str(e)}")
+        return news_data
+    finally:
+        news_index.close()
+
+
 def gather_data_node(state: AgentState):
     print("[Node]: Gathering Data...")
     company_name = state['company_name']
@@ -71,10 +196,19 @@ def gather_data_node(state: AgentState):
         macro_data = {"error": str(e), "data": {}}
         
     try:
-        news_data = get_company_news(company_name, os.getenv("NEWS_API_KEY"), num_articles=3)
+        news_index = NewsIndex()
+    except Exception as e:
+        print(f"[Error] News index unavailable: {str(e)}")
+        news_index = None
+
+    try:
+        since = news_index.watermark(company_name) if news_index else None
+        news_data = get_company_news(company_name, os.getenv("NEWS_API_KEY"),
+                                     num_articles=NEWS_FETCH_SIZE if news_index else NEWS_ARTICLES, since=since)
     except Exception as e:
         print(f"[Error] Failed to fetch news data: {str(e)}")
         news_data = {"error": str(e), "articles": []}
+    news_data = dedupe_news(news_index, company_name, news_data)
     
     return {
         "financial_data": financial_data,
@@ -83,20 +217,155 @@ def gather_data_node(state: AgentState):
     }
     
 
+def check_inputs_node(state: AgentState):
+    print("[Node]: Checking Input Fingerprints...")
+    fingerprints = input_fingerprints(state)
+    update = {"input_fingerprints": fingerprints, "reused_analyses": {}, "report_reused": False}
+    if REPORT_REUSE_MODE == "off":
+        return update
+
+    try:
+        cache = ReportCache(REPORT_CACHE_PATH)
+        previous = cache.get(state['company_ticker'])
+        cache.close()
+    except Exception as e:
+        print(f"[Error] Report cache error: {str(e)}")
+        return update
+    if not previous:
+        print("--- [Fingerprint]: No previous run stored for this ticker. ---")
+        return update
+
+    changed = changed_inputs(fingerprints, previous['fingerprints'])
+    if not changed and previous['report']:
+        print(f"--- [Fingerprint]: Inputs unchanged since {previous['updated_at']}. Reusing the stored report. ---")
+        return {**update, "report_reused": True, "draft_report": previous['report'], "final_report": previous['report']}
+
+    if REPORT_REUSE_MODE == "partial":
+        update["reused_analyses"] = {
+            field: previous['analyses'][field]
+            for task, fields in SPECIALIST_OUTPUTS.items() if task not in changed
+            for field in fields if field in previous['analyses']
+        }
+    print(f"--- [Fingerprint]: Changed inputs: {', '.join(changed)}. "
+          f"Reusing {len(update['reused_analyses'])} specialist outputs. ---")
+    return update
+
+
+async def agather_data_node(state: AgentState):
+    print("[Node]: Gathering Data (async)...")
+    company_name = state['company_name']
+    company_ticker = state['company_ticker']
+
+    try:
+        news_index = NewsIndex()
+        since = news_index.watermark(company_name)
+    except Exception as e:
+        print(f"[Error] News index unavailable: {str(e)}")
+        news_index, since = None, None
+
+    # All three sources are fetched concurrently on the shared keep-alive client.
+    financial_data, macro_data, news_data = await asyncio.gather(
+        aget_stock_fundamentals(company_ticker),
+        aget_macro_economic_data(os.getenv("FRED_API_KEY")),
+        aget_company_news(company_name, os.getenv("NEWS_API_KEY"), num_articles=NEWS_FETCH_SIZE, since=since),
+        return_exceptions=True,
+    )
+    if isinstance(financial_data, Exception):
+        print(f"[Error] Failed to fetch stock fundamentals: {str(financial_data)}")
+        financial_data = {"error": str(financial_data), "data": {}}
+    if isinstance(macro_data, Exception):
+        print(f"[Error] Failed to fetch macro data: {str(macro_data)}")
+        macro_data = {"error": str(macro_data), "data": {}}
+    if isinstance(news_data, Exception):
+        print(f"[Error] Failed to fetch news data: {str(news_data)}")
+        news_data = {"error": str(news_data), "articles": []}
+    news_data = dedupe_news(news_index, company_name, news_data)
+
+    return {
+        "financial_data": financial_data,
+        "macro_data": macro_data,
+        "news_data": news_data
+    }
+
+
+def summarize_filings_node(state: AgentState):
+    print("[Node]: Summarizing SEC Filing Sections...")
+    sec_data = state.get('sec_filings_data') or {}
+    sections = load_filing_sections(sec_data) if sec_data.get('sections_extracted') else None
+    if not sections:
+        return {}
+    try:
+        digests = summarize_filing_sections(sections, llm_for('summarize_filing'), policy=LLM_CALL_POLICY)
+    except Exception as e:
+        # The section excerpts from the SEC node stay in place.
+        print(f"[Error] Filing summarization error: {str(e)}")
+        return {}
+    updated = dict(sec_data)
+    for name, field in (("risk_factors", "summary_of_risk_factors"), ("mdna", "summary_of_mdna")):
+        if digests.get(name):
+            updated[field] = digests[name]
+    return {"sec_filings_data": updated}
+
+
+def analyze_articles(articles: list) -> list:
+    """
+    Returns the structured analysis of every article, reusing stored analyses of identical content
+    (across tickers and runs) and only calling the LLM for articles not seen before.
+    """
+    try:
+        cache = ArticleAnalysisCache()
+    except Exception as e:
+        print(f"[Error] Article cache unavailable: {str(e)}")
+        cache = None
+
+    analyses, hits = [], 0
+    for article in articles:
+        content = article['content']
+        analysis = cache.get(content, NEWS_ANALYSIS_PROMPT_VERSION) if cache else None
+        if analysis is not None:
+            hits += 1
+        else:
+            analysis = analyze_article_chain(content, llm_for('news_analysis'), policy=LLM_CALL_POLICY)
+            if cache:
+                cache.put(content, NEWS_ANALYSIS_PROMPT_VERSION, analysis)
+        analyses.append(analysis)
+    if cache:
+        cache.close()
+    if articles:
+        print(f"--- [Article Cache]: {hits} of {len(articles)} article analyses reused. ---")
+    return analyses
+
+
 def specialist_analysis_node(state: AgentState):
     print("[Node]: Performing Specialist Analysis...")
     news_data = state['news_data']
     financial_data = state['financial_data']
     macro_data = state['macro_data']
-    
-    # Process news with prompt chaining
-    processed_analyses = [analyze_article_chain(article['content'], llm) for article in news_data["articles"]]
-    structured_news_analysis = {"news_items": processed_analyses}
+    # Outputs carried over from the previous run in partial reuse mode.
+    reused = state.get('reused_analyses') or {}
+
+    def is_reused(task):
+        return all(field in reused for field in SPECIALIST_OUTPUTS[task])
+
+    if is_reused('analyze_news_impact'):
+        structured_news_analysis = reused['structured_news_analysis']
+        news_impact_analysis = reused['news_impact_analysis']
+    else:
+        # Process news with prompt chaining
+        processed_analyses = analyze_articles(news_data["articles"])
+        structured_news_analysis = {"news_items": processed_analyses}
+        news_impact_analysis = route_and_execute_task('analyze_news_impact', structured_news_analysis, llm_for('analyze_news_impact'), policy=LLM_CALL_POLICY, ticker=state['company_ticker'])
 
     # Route to specialists
-    financial_analysis = route_and_execute_task('analyze_financials', financial_data, llm)
-    news_impact_analysis = route_and_execute_task('analyze_news_impact', structured_news_analysis, llm)
-    market_context_analysis = route_and_execute_task('analyze_market_context', macro_data, llm)
+    if is_reused('analyze_financials'):
+        financial_analysis = reused['financial_analysis']
+    else:
+        financial_analysis = route_and_execute_task('analyze_financials', financial_data, llm_for('analyze_financials'), policy=LLM_CALL_POLICY, ticker=state['company_ticker'])
+    if is_reused('analyze_market_context'):
+        market_context_analysis = reused['market_context_analysis']
+    else:
+        # Macro data is the same for every company, so its analysis is shared across tickers.
+        market_context_analysis = route_and_execute_task('analyze_market_context', macro_data, llm_for('analyze_market_context'), policy=LLM_CALL_POLICY)
     
     return {
         "structured_news_analysis": structured_news_analysis,
@@ -106,54 +375,86 @@ def specialist_analysis_node(state: AgentState):
     }
 
 
-def synthesize_report_node(state: AgentState):
+def synthesize_report_node(state: AgentState, config: RunnableConfig = None):
     print("[Node]: Synthesizing Draft Report...")
+    prompt_tokens = state.get('prompt_tokens') or {}
     try:
-        prompt = SYNTHESIS_PROMPT_TEMPLATE.format(
+        prompt, token_report = build_prompt(
+            SYNTHESIS_PROMPT_TEMPLATE,
+            {
+                "past_analysis": state['past_analysis'],
+                "sec_filings_summary": state.get('sec_filings_data'),
+                "financial_analysis": state['financial_analysis'],
+                "news_impact_analysis": state['news_impact_analysis'],
+                "market_context_analysis": state['market_context_analysis'],
+            },
+            SYNTHESIS_BUDGETS,
             company_name=state['company_name'],
-            past_analysis=state['past_analysis'],
-            sec_filings_summary=state.get('sec_filings_data', 'Not available'),
-            financial_analysis=state['financial_analysis'],
-            news_impact_analysis=state['news_impact_analysis'],
-            market_context_analysis=state['market_context_analysis']
         )
-        draft_report = llm.generate_content(prompt, timeout=30).text
+        print(format_token_report("synthesize_report", token_report))
+        prompt_tokens = {**(state.get('prompt_tokens') or {}), "synthesize_report": token_report}
+        draft_report = generate_report_text("synthesize_report", prompt, config)
     except Exception as e:
         print(f"[Error] LLM synthesis error: {str(e)}")
-        draft_report = f"Error generating report: {str(e)}"
+        draft_report = f"{REPORT_ERROR_PREFIX}: {str(e)}"
     
     revision_count = state.get('revision_count', 0) + 1
-    return {"draft_report": draft_report, "revision_count": revision_count}
+    return {"draft_report": draft_report, "revision_count": revision_count, "prompt_tokens": prompt_tokens}
 
 
 def evaluate_report_node(state: AgentState):
     print("[Node]: Evaluating Draft Report...")
+    if is_error_report(state['draft_report']):
+        print("--- [Evaluation]: Draft generation failed. Skipping evaluation. ---")
+        return {"feedback": "Evaluation skipped: the draft report could not be generated."}
     prompt = EVALUATOR_PROMPT_TEMPLATE.format(draft_report=state['draft_report'])
-    feedback = llm.generate_content(prompt).text
+    try:
+        feedback = call_llm(llm_for('evaluate_report'), prompt, call_site="evaluate_report", policy=LLM_CALL_POLICY).text
+    except Exception as e:
+        print(f"[Error] LLM evaluation error: {str(e)}")
+        feedback = f"{EVALUATION_ERROR_PREFIX}: {str(e)}"
     return {"feedback": feedback}
 
 
-def refine_report_node(state: AgentState):
+def refine_report_node(state: AgentState, config: RunnableConfig = None):
     print("[Node]: Refining Final Report...")
-    prompt = REFINEMENT_PROMPT_TEMPLATE.format(
-        company_name=state['company_name'],
-        financial_analysis=state['financial_analysis'],
-        news_impact_analysis=state['news_impact_analysis'],
-        market_context_analysis=state['market_context_analysis'],
-        feedback=state['feedback']
-    )
-    final_report = llm.generate_content(prompt).text
-    return {"final_report": final_report}
+    prompt_tokens = state.get('prompt_tokens') or {}
+    try:
+        prompt, token_report = build_prompt(
+            REFINEMENT_PROMPT_TEMPLATE,
+            {
+                "financial_analysis": state['financial_analysis'],
+                "news_impact_analysis": state['news_impact_analysis'],
+                "market_context_analysis": state['market_context_analysis'],
+                "feedback": state['feedback'],
+            },
+            REFINEMENT_BUDGETS,
+            company_name=state['company_name'],
+        )
+        print(format_token_report("refine_report", token_report))
+        prompt_tokens = {**prompt_tokens, "refine_report": token_report}
+        final_report = generate_report_text("refine_report", prompt, config)
+    except Exception as e:
+        # Fall back to the draft rather than persisting an error string as the final report.
+        print(f"[Error] LLM refinement error: {str(e)}")
+        final_report = state['draft_report']
+    return {"final_report": final_report, "prompt_tokens": prompt_tokens}
 
 
 def retrieve_from_memory_node(state: AgentState):
     print("--- [Node]: Retrieving from Vector Memory... ---")
     company_name = state['company_name']
+    company_ticker = state['company_ticker']
     try:
         memory = VectorMemory()
-        # Formulate a query to find relevant past analyses
-        query = f"What was my past analysis and conclusion for {company_name}?"
-        results = memory.query_memory(query, n_results=1)
+        # The ticker and section names are exact terms, so this is served by the lexical index without
+        # an embedding. The semantic question is only used when the ticker was never stored under its
+        # own symbol. Only the best sections within the prompt's budget are returned, not whole reports.
+        results = memory.query_memory(f"{company_ticker} summary recommendation", n_results=MEMORY_CONTEXT_SECTIONS,
+                                      where={"ticker": company_ticker}, max_chars=MEMORY_CONTEXT_CHARS)
+        if not results:
+            query = f"What was my past analysis and conclusion for {company_name}?"
+            results = memory.query_memory(query, n_results=MEMORY_CONTEXT_SECTIONS, max_chars=MEMORY_CONTEXT_CHARS)
         
         if results:
             past_analysis = "\n".join(results)
@@ -174,64 +475,89 @@ def save_to_memory_node(state: AgentState):
     # Save the final report if it exists, otherwise save the draft
     report_to_save = state.get('final_report') or state.get('draft_report')
     
-    if report_to_save:
+    if is_error_report(report_to_save):
+        print("--- [Memory]: Report generation failed. Not saving to memory. ---")
+    elif report_to_save:
         memory = VectorMemory()
         memory.add_analysis(company_ticker, report_to_save)
+        save_to_report_cache(state, report_to_save)
     
     # This is a final node, so it doesn't need to return anything to the state
     return {}
 
 
+def save_to_report_cache(state: AgentState, report: str):
+    """
+    Stores the run's input fingerprints, specialist outputs and report so an unchanged rerun can reuse them.
+    """
+    fingerprints = state.get('input_fingerprints')
+    if REPORT_REUSE_MODE == "off" or not fingerprints:
+        return
+    analyses = {field: state.get(field) for fields in SPECIALIST_OUTPUTS.values() for field in fields}
+    try:
+        cache = ReportCache(REPORT_CACHE_PATH)
+        cache.put(state['company_ticker'], fingerprints, analyses, report)
+        cache.close()
+    except Exception as e:
+        print(f"[Error] Report cache error: {str(e)}")
+
+
 # --- 3. Define Conditional Edges ---
+def route_after_input_check(state: AgentState):
+    """
+    Ends the run early when the stored report was reused, otherwise continues to the specialists.
+    """
+    if state.get('report_reused'):
+        print("--- [Decision]: Inputs unchanged. Ending with the stored report. ---")
+        return "reuse"
+    return "analyze"
+
+
 # This function decides where to go after the evaluation node.
 def should_refine_or_end(state: AgentState):
     """
-    Uses the LLM to decide whether to refine the report or end the process.
+    Decides whether to refine the report or end the process.
+    Uses the evaluator's structured verdict or a local heuristic, and only
+    falls back to an LLM round trip when USE_LLM_GATE is enabled.
     """
-    print("--- [Conditional Edge]: Using LLM to check feedback... ---")
+    print("--- [Conditional Edge]: Checking feedback... ---")
     feedback = state['feedback']
     revision_count = state['revision_count']
     
     if revision_count > 1:
         print("--- [Decision]: Maximum revisions reached. Ending. ---")
+        GATE_STATS.record("max_revisions")
         return "end"
-    
-    # Create a dedicated prompt for the decision
-    decision_prompt = f"""
-    You are a gatekeeper. Your task is to decide if a report needs revision based on the following feedback.
-    If the feedback points out any flaws, weaknesses, or areas for improvement, a revision is required.
-    
-    Feedback:
-    ---
-    {feedback}
-    ---
-    
-    Based on the feedback, is a revision required? Answer ONLY with the word "Yes" or "No".
-    """
-    
-    try:
-        response = llm.generate_content(decision_prompt)
-        decision = response.text.strip().lower()
-        
-        if "yes" in decision:
-            print("--- [LLM Decision]: Feedback requires revision. Refining report. ---")
-            return "refine"
-        else:
-            print("--- [LLM Decision]: Feedback is positive or sufficient. Ending. ---")
-            return "end"
-            
-    except Exception as e:
-        print(f"--- [Error]: Could not make a decision. Defaulting to end. Details: {e} ---")
+
+    if is_error_report(state.get('draft_report', '')):
+        print("--- [Decision]: Draft generation failed. Ending. ---")
+        GATE_STATS.record("draft_failed")
         return "end"
+
+    if feedback.startswith(EVALUATION_ERROR_PREFIX):
+        # There is no critique to act on, so a refinement call would only echo the error.
+        print("--- [Decision]: Evaluation failed. Ending with the draft report. ---")
+        GATE_STATS.record("evaluation_failed")
+        return "end"
+    
+    decision = decide_revision(feedback, llm=llm_for('revision_gate'), use_llm_fallback=USE_LLM_GATE, policy=LLM_CALL_POLICY)
+    if decision == "refine":
+        print("--- [Decision]: Feedback requires revision. Refining report. ---")
+    else:
+        print("--- [Decision]: Feedback is positive or sufficient. Ending. ---")
+    return decision
     
 
 # --- 4. Assemble the Graph ---
 workflow = StateGraph(AgentState)
 
 # Add nodes
-workflow.add_node("gather_data", gather_data_node)
+# The data nodes have async variants, used when the graph runs with ainvoke/astream.
+workflow.add_node("gather_data", RunnableLambda(gather_data_node, afunc=agather_data_node))
 workflow.add_node("retrieve_from_memory", retrieve_from_memory_node)
-workflow.add_node("fetch_sec_filings", sec_filings_node)
+workflow.add_node("fetch_sec_filings", RunnableLambda(sec_filings_node, afunc=asec_filings_node))
+workflow.add_node("check_inputs", check_inputs_node)
+workflow.add_node("summarize_filings", summarize_filings_node)
 workflow.add_node("analyze_specialists", specialist_analysis_node)
 workflow.add_node("synthesize_report", synthesize_report_node)
 workflow.add_node("evaluate_report", evaluate_report_node)
@@ -242,13 +568,22 @@ workflow.add_node("save_to_memory", save_to_memory_node)
 workflow.set_entry_point("gather_data")
 workflow.add_edge("gather_data", "retrieve_from_memory")
 workflow.add_edge("retrieve_from_memory", "fetch_sec_filings")
-workflow.add_edge("fetch_sec_filings", "analyze_specialists")
+workflow.add_edge("fetch_sec_filings", "check_inputs")
+workflow.add_edge("summarize_filings", "analyze_specialists")
 workflow.add_edge("analyze_specialists", "synthesize_report")
 workflow.add_edge("synthesize_report", "evaluate_report")
 workflow.add_edge("refine_report", "save_to_memory")
 workflow.add_edge("save_to_memory", END)
 
-# Add conditional edge
+# Add conditional edges
+workflow.add_conditional_edges(
+    "check_inputs",
+    route_after_input_check,
+    {
+        "analyze": "summarize_filings",
+        "reuse": END
+    }
+)
 workflow.add_conditional_edges(
     "evaluate_report",
     should_refine_or_end,
@@ -258,5 +593,188 @@ workflow.add_conditional_edges(
     }
 )
 
+def build_app(checkpointer=None):
+    """
+    Compiles the graph. With a checkpointer, AgentState is saved after every node so that a
+    run can be resumed by its thread ID.
+    """
+    return workflow.compile(checkpointer=checkpointer)
+
+
 # Compile the graph into a runnable app
-app = workflow.compile()
\ No newline at end of file
+app = build_app()
+
+
+def run_analysis(initial_state: AgentState, thread_id: str, checkpointer=None, flush_memory: bool = True) -> dict:
+    """
+    Runs the graph with persistent checkpoints, resuming the run if it was interrupted.
+
+    A new thread ID starts a fresh run. An unfinished run continues from the node after the
+    last completed one, so fetches and LLM calls already made are not repeated. A finished
+    run returns its saved final state without calling anything.
+
+    Args:
+        initial_state: The initial AgentState, used only when the run is new.
+        thread_id: The run ID under which checkpoints are stored.
+        checkpointer: The checkpointer to use. Defaults to the SQLite store at CHECKPOINT_DB_PATH.
+        flush_memory: Whether to write in-memory vector entries to disk when the run ends.
+            run_batch flushes once for the whole batch instead.
+
+    Returns:
+        The final AgentState of the run.
+    """
+    graph = build_app(checkpointer or open_checkpointer())
+    config = thread_config(thread_id)
+    status = run_status(graph, thread_id)
+
+    if status == "complete":
+        print(f"--- [Checkpoints]: Run '{thread_id}' already complete. Loading saved state. ---")
+        return graph.get_state(config).values
+    try:
+        if status == "in_progress":
+            pending = ", ".join(graph.get_state(config).next)
+            print(f"--- [Checkpoints]: Resuming run '{thread_id}' at {pending}. ---")
+            return graph.invoke(None, config)
+        return graph.invoke(initial_state, config)
+    finally:
+        if flush_memory:
+            flush_memory_backends()
+
+
+def prefetch_sec_filings(companies: list):
+    """
+    Refreshes the SEC filing index for a whole batch with one bulk query, so the per-ticker
+    SEC nodes are served locally.
+    """
+    try:
+        refresh_filing_index([ticker for _, ticker in companies], os.getenv("SEC_API_KEY"))
+    except Exception as e:
+        # Each ticker falls back to its own query in the SEC node.
+        print(f"[Error] Bulk SEC index refresh failed: {str(e)}")
+
+
+def warm_up_embeddings():
+    """
+    Loads the embedding model before the first run, so memory lookups do not stall mid-run.
+    """
+    try:
+        get_embedding_service()
+    except Exception as e:
+        # Memory add and query report their own errors if the model is still unavailable.
+        print(f"[Error] Embedding model failed to load: {str(e)}")
+
+
+def run_batch(companies: list, batch_id: str, checkpointer=None) -> dict:
+    """
+    Analyzes several companies under one batch ID. Restarting the same batch skips tickers that
+    already finished and resumes the ones that were interrupted.
+
+    Args:
+        companies: A list of (company_name, company_ticker) tuples.
+        batch_id: The batch ID. Each ticker is checkpointed under '<batch_id>/<ticker>'.
+        checkpointer: The checkpointer to use. Defaults to the SQLite store at CHECKPOINT_DB_PATH.
+
+    Returns:
+        A dictionary mapping each ticker to its final AgentState, or None if its run failed.
+    """
+    checkpointer = checkpointer or open_checkpointer()
+    prefetch_sec_filings(companies)
+    warm_up_embeddings()
+    results = {}
+    for company_name, company_ticker in companies:
+        initial_state = {"company_name": company_name, "company_ticker": company_ticker, "revision_count": 0}
+        try:
+            results[company_ticker] = run_analysis(initial_state, f"{batch_id}/{company_ticker}", checkpointer,
+                                                   flush_memory=False)
+        except Exception as e:
+            # The checkpoint keeps the completed nodes, so rerunning the batch picks up from here.
+            print(f"[Error] Run for {company_ticker} failed: {str(e)}")
+            results[company_ticker] = None
+    flush_memory_backends()
+    LATENCY_TRACKER.print_report()
+    semantic_cache = get_semantic_cache()
+    if semantic_cache is not None:
+        semantic_cache.print_report()
+    return results
+
+
+def stream_report(initial_state: AgentState, on_token=None, sink_path: str = None, config: dict = None) -> dict:
+    """
+    Runs the graph with streaming report generation, so callers can render or persist the
+    report while it is still being written.
+
+    Args:
+        initial_state: The initial AgentState for the run.
+        on_token: Optional callback `on_token(node, text)` invoked for every streamed chunk,
+            where node is 'synthesize_report' or 'refine_report'.
+        sink_path: Optional file the report in progress is written to as it streams. The file is
+            restarted when refinement begins and holds the saved report once the run ends.
+        config: Optional extra LangGraph config (e.g. a thread_id).
+
+    Returns:
+        The final AgentState of the run.
+    """
+    run_config = dict(config or {})
+    run_config["configurable"] = {**run_config.get("configurable", {}), "stream_report": True}
+
+    final_state, current_node, sink = None, None, None
+    try:
+        for mode, payload in app.stream(initial_state, config=run_config, stream_mode=["custom", "values"]):
+            if mode == "values":
+                final_state = payload
+                continue
+            node, text = payload["node"], payload["token"]
+            if sink_path and node != current_node:
+                if sink:
+                    sink.close()
+                sink = open(sink_path, "w")
+            current_node = node
+            if sink:
+                sink.write(text)
+                sink.flush()
+            if on_token:
+                on_token(node, text)
+    finally:
+        if sink:
+            sink.close()
+        flush_memory_backends()
+
+    # A failed refinement falls back to the draft, so rewrite the sink with the report that was kept.
+    if sink_path and final_state:
+        report = final_state.get('final_report') or final_state.get('draft_report') or ""
+        with open(sink_path, "w") as f:
+            f.write(report)
+    return final_state
+
+
+async def analyze_companies_async(companies: list, max_concurrency: int = 20) -> dict:
+    """
+    Runs the graph for many companies on one event loop. Data fetching uses the async tool layer,
+    so the I/O of all in-flight tickers shares one pooled HTTP client instead of a thread each.
+
+    Args:
+        companies: A list of (company_name, company_ticker) tuples.
+        max_concurrency: The maximum number of graph runs in flight at once.
+
+    Returns:
+        A dictionary mapping each ticker to its final AgentState, or None if its run failed.
+    """
+    await asyncio.to_thread(prefetch_sec_filings, companies)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(company_name, company_ticker):
+        async with semaphore:
+            try:
+                return await app.ainvoke(
+                    {"company_name": company_name, "company_ticker": company_ticker, "revision_count": 0}
+                )
+            except Exception as e:
+                print(f"[Error] Run for {company_ticker} failed: {str(e)}")
+                return None
+
+    try:
+        results = await asyncio.gather(*(run_one(name, ticker) for name, ticker in companies))
+    finally:
+        await close_async_client()
+        flush_memory_backends()
+    return {ticker: result for (_, ticker), result in zip(companies, results)}
@@ -0,0 +1,63 @@
+import os
+
+# Model behind each tier. Override with FAST_MODEL / LARGE_MODEL in the .env file.
+MODEL_TIERS = {
+    "fast": os.getenv("FAST_MODEL", "gemini-2.5-flash"),
+    "large": os.getenv("LARGE_MODEL", "gemini-2.5-pro"),
+}
+
+# Which tier serves each LLM task in the v2 graph. Lightweight extraction, specialist
+# summaries, filing digests and critique go to the fast tier; only synthesis and refinement need the large model.
+TASK_TIERS = {
+    "news_analysis": "fast",
+    "analyze_financials": "fast",
+    "analyze_news_impact": "fast",
+    "analyze_market_context": "fast",
+    "evaluate_report": "fast",
+    "revision_gate": "fast",
+    "summarize_filing": "fast",
+    "synthesize_report": "large",
+    "refine_report": "large",
+}
+
+DEFAULT_TIER = "large"
+
+
+def parse_task_routes(spec: str) -> dict:
+    """
+    Parses a routing override such as "evaluate_report=large,news_analysis=fast".
+
+    Args:
+        spec: Comma-separated task=tier pairs.
+
+    Returns:
+        A dictionary mapping task names to tiers.
+
+    Raises:
+        ValueError: If an entry is malformed or names an unknown tier.
+    """
+    routes = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        task, sep, tier = entry.partition("=")
+        task, tier = task.strip(), tier.strip()
+        if not sep or not task or tier not in MODEL_TIERS:
+            raise ValueError(f"Invalid model route '{entry}'. Expected task=tier with tier in {sorted(MODEL_TIERS)}.")
+        routes[task] = tier
+    return routes
+
+
+def load_task_tiers() -> dict:
+    """
+    Returns TASK_TIERS with any overrides from the MODEL_ROUTES environment variable applied.
+    """
+    routes = dict(TASK_TIERS)
+    routes.update(parse_task_routes(os.getenv("MODEL_ROUTES", "")))
+    return routes
+
+
+def tier_for_task(task: str, routes: dict = None) -> str:
+    """
+    Returns the tier ('fast' or 'large') that should serve a task. Unknown tasks use the large model.
+    """
+    routes = TASK_TIERS if routes is None else routes
+    return routes.get(task, DEFAULT_TIER)
@@ -0,0 +1,410 @@
+import os
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Optional
+
+try:
+    from google.api_core import exceptions as google_exceptions
+except ImportError:  # pragma: no cover - google-api-core ships with google-generativeai
+    google_exceptions = None
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """Raised when an LLM call does not complete within its per-call deadline."""
+
+
+@dataclass
+class CallPolicy:
+    """
+    Controls how a single logical LLM call is executed.
+
+    Attributes:
+        deadline: Seconds allowed per attempt before it is abandoned (None disables the deadline).
+        max_retries: How many times a transient failure is retried after the first attempt.
+        base_delay: Initial backoff in seconds; doubled on every retry.
+        max_delay: Upper bound for a single backoff sleep.
+        hedge: If True, a duplicate request is sent once an attempt outlives the call site's latency quantile.
+        hedge_quantile: The latency quantile (e.g. 0.95 for p95) used as the hedging threshold.
+        hedge_min_samples: Minimum latency samples for a call site before hedging kicks in.
+    """
+    deadline: Optional[float] = 90.0
+    max_retries: int = 2
+    base_delay: float = 1.0
+    max_delay: float = 8.0
+    hedge: bool = False
+    hedge_quantile: float = 0.95
+    hedge_min_samples: int = 20
+
+
+class LatencyTracker:
+    """
+    Thread-safe latency and outcome bookkeeping per LLM call site.
+    Keeps a sliding window of successful attempt latencies so tail percentiles stay current.
+    """
+
+    def __init__(self, window: int = 500):
+        self._lock = threading.Lock()
+        self._latencies = defaultdict(lambda: deque(maxlen=window))
+        self._counters = defaultdict(lambda: defaultdict(int))
+
+    def record(self, call_site: str, seconds: float):
+        with self._lock:
+            self._latencies[call_site].append(seconds)
+            self._counters[call_site]["calls"] += 1
+
+    def increment(self, call_site: str, counter: str):
+        with self._lock:
+            self._counters[call_site][counter] += 1
+
+    def count(self, call_site: str) -> int:
+        with self._lock:
+            return len(self._latencies[call_site])
+
+    def quantile(self, call_site: str, q: float) -> Optional[float]:
+        """
+        Returns the q-quantile (nearest-rank) of recorded latencies for a call site, or None if empty.
+        """
+        with self._lock:
+            samples = sorted(self._latencies[call_site])
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, int(round(q * len(samples))) - 1))
+        return samples[index]
+
+    def report(self) -> dict:
+        """
+        Returns a per-call-site summary with p50/p95/p99/max latency and retry/hedge/error/re-ask counts.
+        """
+        with self._lock:
+            call_sites = set(self._latencies) | set(self._counters)
+        summary = {}
+        for call_site in sorted(call_sites):
+            with self._lock:
+                counters = dict(self._counters[call_site])
+            summary[call_site] = {
+                "samples": self.count(call_site),
+                "p50": self.quantile(call_site, 0.50),
+                "p95": self.quantile(call_site, 0.95),
+                "p99": self.quantile(call_site, 0.99),
+                "max": self.quantile(call_site, 1.0),
+                "calls": counters.get("calls", 0),
+                "retries": counters.get("retries", 0),
+                "timeouts": counters.get("timeouts", 0),
+                "errors": counters.get("errors", 0),
+                "hedges": counters.get("hedges", 0),
+                "hedge_wins": counters.get("hedge_wins", 0),
+                "reasks": counters.get("reasks", 0),
+            }
+        return summary
+
+    def print_report(self):
+        print("--- [LLM Latency Report] ---")
+        for call_site, stats in self.report().items():
+            def fmt(value):
+                return f"{value:.2f}s" if value is not None else "n/a"
+            print(
+                f"  {call_site}: n={stats['samples']} p50={fmt(stats['p50'])} p95={fmt(stats['p95'])} "
+                f"p99={fmt(stats['p99'])} max={fmt(stats['max'])} retries={stats['retries']} "
+                f"timeouts={stats['timeouts']} errors={stats['errors']} "
+                f"hedges={stats['hedges']} (won {stats['hedge_wins']}) reasks={stats['reasks']}"
+            )
+
+    def reset(self):
+        with self._lock:
+            self._latencies.clear()
+            self._counters.clear()
+
+
+def policy_from_env() -> CallPolicy:
+    """
+    Builds a CallPolicy from LLM_CALL_DEADLINE, LLM_MAX_RETRIES and LLM_HEDGE_REQUESTS.
+    Unset variables keep the CallPolicy defaults.
+    """
+    return CallPolicy(
+        deadline=float(os.getenv("LLM_CALL_DEADLINE", CallPolicy.deadline)),
+        max_retries=int(os.getenv("LLM_MAX_RETRIES", CallPolicy.max_retries)),
+        hedge=os.getenv("LLM_HEDGE_REQUESTS", "false").lower() == "true",
+    )
+
+
+DEFAULT_POLICY = policy_from_env()
+LATENCY_TRACKER = LatencyTracker()
+
+
+class LLMPoolSaturated(RuntimeError):
+    """Raised when an attempt is rejected because the worker pool is clogged with stuck calls."""
+
+
+class _Attempt:
+    """
+    One `generate_content` call submitted to the pool. The deadline clock starts when a worker
+    picks the call up, so time spent queued behind other calls does not count against it.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor, fn, prompt, kwargs):
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.abandoned = False
+        self.future = executor.submit(self._run, fn, prompt, kwargs)
+
+    def _run(self, fn, prompt, kwargs):
+        self.started_at = time.monotonic()
+        return fn(prompt, **kwargs)
+
+    def expires_at(self, deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        # A queued attempt may wait at most one deadline for a worker before it is cancelled.
+        return (self.started_at if self.started_at is not None else self.submitted_at) + deadline
+
+
+class _AttemptPool:
+    """
+    Worker pool for deadline-bound and hedged attempts. Python threads cannot be killed, so an
+    attempt that outlives its deadline keeps its worker until the SDK returns. The pool counts
+    these abandoned attempts and rejects new work once `max_abandoned` of them are stuck, instead
+    of letting them crowd out every worker.
+    """
+
+    def __init__(self, max_workers: int = 32, max_abandoned: int = 16):
+        self.max_workers = max_workers
+        self.max_abandoned = max_abandoned
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-call")
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.abandoned = 0
+
+    def submit(self, fn, prompt, kwargs) -> _Attempt:
+        with self._lock:
+            if self.abandoned >= self.max_abandoned:
+                raise LLMPoolSaturated(
+                    f"{self.abandoned} abandoned LLM calls are still running; not starting another."
+                )
+            self.in_flight += 1
+        attempt = _Attempt(self.executor, fn, prompt, kwargs)
+        attempt.future.add_done_callback(lambda _future: self._finished(attempt))
+        return attempt
+
+    def saturated(self) -> bool:
+        with self._lock:
+            return self.in_flight >= self.max_workers
+
+    def abandon(self, attempt: _Attempt):
+        # Attempts still waiting for a worker are cancelled outright and never reach the SDK.
+        if attempt.future.cancel():
+            return
+        with self._lock:
+            if not attempt.future.done() and not attempt.abandoned:
+                attempt.abandoned = True
+                self.abandoned += 1
+
+    def _finished(self, attempt: _Attempt):
+        with self._lock:
+            self.in_flight -= 1
+            if attempt.abandoned:
+                self.abandoned -= 1
+
+
+_pool = _AttemptPool()
+
+# How often a pending hedge checks whether its primary attempt has started running.
+_START_POLL_INTERVAL = 0.005
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Returns True for errors that are worth retrying (timeouts, rate limits, 5xx, dropped connections).
+    """
+    if isinstance(error, (TimeoutError, ConnectionError, LLMPoolSaturated)):
+        return True
+    if google_exceptions is not None:
+        transient_types = (
+            google_exceptions.DeadlineExceeded,
+            google_exceptions.ServiceUnavailable,
+            google_exceptions.TooManyRequests,
+            google_exceptions.ResourceExhausted,
+            google_exceptions.InternalServerError,
+            google_exceptions.GatewayTimeout,
+        )
+        if isinstance(error, transient_types):
+            return True
+    return False
+
+
+def backoff_delay(attempt: int, policy: CallPolicy) -> float:
+    """
+    Full-jitter exponential backoff: a uniform sleep in [0, min(max_delay, base_delay * 2**attempt)].
+    """
+    return random.uniform(0, min(policy.max_delay, policy.base_delay * (2 ** attempt)))
+
+
+def _run_attempt(llm, prompt, call_site: str, policy: CallPolicy, tracker: LatencyTracker, kwargs: dict):
+    if policy.deadline is None and not policy.hedge:
+        return llm.generate_content(prompt, **kwargs)
+
+    pool = _pool
+    primary = pool.submit(llm.generate_content, prompt, kwargs)
+    active = [primary]
+
+    hedge_after = None
+    if policy.hedge and tracker.count(call_site) >= policy.hedge_min_samples:
+        hedge_after = tracker.quantile(call_site, policy.hedge_quantile)
+
+    last_error = None
+    queue_expired = False
+    while active:
+        now = time.monotonic()
+        wake_times = [a.expires_at(policy.deadline) for a in active if a.expires_at(policy.deadline) is not None]
+        hedge_at = None
+        if hedge_after is not None:
+            if primary.started_at is not None:
+                hedge_at = primary.started_at + hedge_after
+                wake_times.append(hedge_at)
+            else:
+                # The hedge clock starts when a worker picks the primary up; poll until it has.
+                wake_times.append(now + _START_POLL_INTERVAL)
+        timeout = max(0.0, min(wake_times) - now) if wake_times else None
+
+        done, _ = wait([a.future for a in active], timeout=timeout, return_when=FIRST_COMPLETED)
+        for attempt in [a for a in active if a.future in done]:
+            active.remove(attempt)
+            if attempt.future.exception() is None:
+                for other in active:
+                    pool.abandon(other)
+                if attempt is not primary:
+                    tracker.increment(call_site, "hedge_wins")
+                return attempt.future.result()
+            last_error = attempt.future.exception()
+
+        now = time.monotonic()
+        for attempt in list(active):
+            expires_at = attempt.expires_at(policy.deadline)
+            if expires_at is not None and now >= expires_at:
+                queue_expired = queue_expired or attempt.started_at is None
+                pool.abandon(attempt)
+                active.remove(attempt)
+
+        if hedge_at is not None and now >= hedge_at and primary in active:
+            hedge_after = None  # Only one hedge per attempt.
+            if pool.saturated():
+                print(f"--- [LLM Hedge]: {call_site} is slow but the pool is saturated. Not hedging. ---")
+                continue
+            print(f"--- [LLM Hedge]: {call_site} exceeded p{int(policy.hedge_quantile * 100)}. "
+                  f"Sending duplicate request. ---")
+            try:
+                active.append(pool.submit(llm.generate_content, prompt, kwargs))
+                tracker.increment(call_site, "hedges")
+            except LLMPoolSaturated:
+                pass
+
+    if last_error is not None:
+        raise last_error
+    tracker.increment(call_site, "timeouts")
+    if queue_expired:
+        raise LLMPoolSaturated(f"LLM call '{call_site}' waited {policy.deadline}s without a free worker.")
+    raise LLMDeadlineExceeded(f"LLM call '{call_site}' exceeded its {policy.deadline}s deadline.")
+
+
+def call_llm(llm, prompt, call_site: str = "default", policy: Optional[CallPolicy] = None,
+             tracker: Optional[LatencyTracker] = None, **kwargs):
+    """
+    Calls `llm.generate_content` with a per-attempt deadline, bounded retries with jittered
+    exponential backoff for transient errors, and optional hedged duplicate requests.
+
+    Args:
+        llm: The initialized Gemini GenerativeModel instance (or any object with `generate_content`).
+        prompt: The prompt passed to `generate_content`.
+        call_site: A short label used to group latency statistics (e.g. 'synthesize_report').
+        policy: The CallPolicy to apply. Defaults to DEFAULT_POLICY.
+        tracker: The LatencyTracker to record into. Defaults to the module-level LATENCY_TRACKER.
+        **kwargs: Extra keyword arguments forwarded to `generate_content`.
+
+    Returns:
+        The response object returned by `generate_content`.
+
+    Raises:
+        The last error once retries are exhausted, or immediately for non-transient errors.
+    """
+    policy = policy or DEFAULT_POLICY
+    tracker = tracker or LATENCY_TRACKER
+    if policy.deadline is not None:
+        kwargs.setdefault("request_options", {"timeout": policy.deadline})
+
+    for attempt in range(policy.max_retries + 1):
+        start = time.monotonic()
+        try:
+            response = _run_attempt(llm, prompt, call_site, policy, tracker, kwargs)
+            tracker.record(call_site, time.monotonic() - start)
+            return response
+        except Exception as e:
+            if not is_transient_error(e) or attempt == policy.max_retries:
+                tracker.increment(call_site, "errors")
+                raise
+            delay = backoff_delay(attempt, policy)
+            tracker.increment(call_site, "retries")
+            print(f"--- [LLM Retry]: {call_site} attempt {attempt + 1} failed ({e}). "
+                  f"Retrying in {delay:.2f}s ---")
+            time.sleep(delay)
+
+
+def _chunk_text(chunk) -> str:
+    # A streamed chunk without text parts (e.g. a safety-only chunk) raises on `.text`.
+    try:
+        return chunk.text or ""
+    except ValueError:
+        return ""
+
+
+def stream_llm(llm, prompt, call_site: str = "default", policy: Optional[CallPolicy] = None,
+               tracker: Optional[LatencyTracker] = None, **kwargs):
+    """
+    Streams `llm.generate_content(prompt, stream=True)` and yields text chunks as they arrive.
+
+    Transient errors are retried with jittered backoff only until the first chunk has been yielded;
+    after that a failure is raised to the caller, which already holds partial output. The deadline
+    is passed to the SDK as the request timeout. Time to first token is recorded under
+    '<call_site>/first_token' and the full stream duration under the call site itself.
+
+    Args:
+        llm: The initialized Gemini GenerativeModel instance.
+        prompt: The prompt passed to `generate_content`.
+        call_site: A short label used to group latency statistics.
+        policy: The CallPolicy to apply. Defaults to DEFAULT_POLICY. Hedging does not apply to streams.
+        tracker: The LatencyTracker to record into. Defaults to LATENCY_TRACKER.
+        **kwargs: Extra keyword arguments forwarded to `generate_content`.
+
+    Yields:
+        Non-empty text chunks in order.
+    """
+    policy = policy or DEFAULT_POLICY
+    tracker = tracker or LATENCY_TRACKER
+    if policy.deadline is not None:
+        kwargs.setdefault("request_options", {"timeout": policy.deadline})
+
+    for attempt in range(policy.max_retries + 1):
+        start = time.monotonic()
+        yielded = False
+        try:
+            for chunk in llm.generate_content(prompt, stream=True, **kwargs):
+                text = _chunk_text(chunk)
+                if not text:
+                    continue
+                if not yielded:
+                    tracker.record(f"{call_site}/first_token", time.monotonic() - start)
+                    yielded = True
+                yield text
+            tracker.record(call_site, time.monotonic() - start)
+            return
+        except Exception as e:
+            if yielded or not is_transient_error(e) or attempt == policy.max_retries:
+                tracker.increment(call_site, "errors")
+                raise
+            delay = backoff_delay(attempt, policy)
+            tracker.increment(call_site, "retries")
+            print(f"--- [LLM Retry]: {call_site} stream attempt {attempt + 1} failed ({e}). "
+                  f"Retrying in {delay:.2f}s ---")
+            time.sleep(delay)
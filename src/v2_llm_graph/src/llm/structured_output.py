@@ -0,0 +1,199 @@
+import json
+import os
+import re
+from typing import Optional
+
+from .resilient_client import LATENCY_TRACKER, CallPolicy, LatencyTracker, call_llm
+
+try:
+    from google.api_core import exceptions as google_exceptions
+except ImportError:  # pragma: no cover - google-api-core ships with google-generativeai
+    google_exceptions = None
+
+# Ask Gemini for JSON directly (response_mime_type / response_schema). Models that reject the
+# setting are called again without it. Disable with LLM_JSON_MODE=false in the .env file.
+JSON_MODE = os.getenv("LLM_JSON_MODE", "true").lower() == "true"
+
+# Characters of an unparseable response that are printed and sent back in the repair prompt.
+RAW_PREVIEW_CHARS = 300
+REPAIR_MAX_CHARS = 4000
+
+_CODE_FENCE = re.compile(r"```(?:json)?\s*|```")
+_CLOSERS = {"{": "}", "[": "]"}
+
+REPAIR_PROMPT = """
+The text below was meant to be a single JSON object with the keys {keys}, but it is not valid JSON.
+Return only the corrected JSON object, with no commentary and no code fences.
+
+**Text:**
+{raw}
+"""
+
+MISSING_KEYS_PROMPT = """{prompt}
+
+Your previous answer was missing the keys {missing}. Return only a JSON object with exactly these keys.
+"""
+
+
+def _drop_trailing_comma(out: list):
+    i = len(out) - 1
+    while i >= 0 and out[i].isspace():
+        i -= 1
+    if i >= 0 and out[i] == ",":
+        del out[i]
+
+
+def _repair(text: str) -> list:
+    """
+    Returns candidate repairs of a malformed JSON text: trailing commas removed, text after the
+    first complete value dropped, and a truncated value closed either where it stops or at the
+    last complete member.
+    """
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return []
+    out, stack, in_string, escape, last_member = [], [], False, False, None
+    for ch in text[min(starts):]:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+        elif ch in "}]":
+            if not stack or stack[-1] != ch:
+                continue
+            _drop_trailing_comma(out)
+            stack.pop()
+            if not stack:
+                out.append(ch)
+                return ["".join(out)]
+        elif ch == ",":
+            last_member = (len(out), list(stack))
+        out.append(ch)
+
+    # The text was cut off inside a value.
+    closed = out + (['"'] if in_string else [])
+    _drop_trailing_comma(closed)
+    if "".join(closed).rstrip().endswith(":"):
+        closed.append(" null")
+    candidates = ["".join(closed) + "".join(reversed(stack))]
+    if last_member is not None:
+        length, member_stack = last_member
+        candidates.append("".join(out[:length]) + "".join(reversed(member_stack)))
+    return candidates
+
+
+def _parse(text: str) -> tuple:
+    """
+    Returns (result, repaired): the parsed dictionary or None, and whether the text had to be repaired.
+    """
+    cleaned = _CODE_FENCE.sub("", text or "").strip()
+    try:
+        result = json.loads(cleaned, strict=False)
+        if isinstance(result, dict):
+            return result, False
+    except json.JSONDecodeError:
+        pass
+    for candidate in _repair(cleaned):
+        try:
+            result = json.loads(candidate, strict=False)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(result, dict):
+            return result, True
+    return None, True
+
+
+def parse_json(text: str) -> Optional[dict]:
+    """
+    Parses a JSON object from an LLM response, tolerating code fences, surrounding prose,
+    trailing commas and truncated output.
+
+    Args:
+        text: The raw response text.
+
+    Returns:
+        The parsed dictionary, or None if the text cannot be repaired.
+    """
+    return _parse(text)[0]
+
+
+def json_generation_config(schema: dict = None) -> dict:
+    """
+    Returns the generation_config that puts Gemini in JSON mode, constrained to `schema` if given.
+    """
+    config = {"response_mime_type": "application/json"}
+    if schema is not None:
+        config["response_schema"] = schema
+    return config
+
+
+def _is_unsupported_config(error: Exception) -> bool:
+    return google_exceptions is not None and isinstance(error, google_exceptions.InvalidArgument)
+
+
+def _call(llm, prompt, call_site: str, policy: CallPolicy, schema: dict):
+    if not JSON_MODE:
+        return call_llm(llm, prompt, call_site=call_site, policy=policy)
+    try:
+        return call_llm(llm, prompt, call_site=call_site, policy=policy,
+                        generation_config=json_generation_config(schema))
+    except Exception as e:
+        if not _is_unsupported_config(e):
+            raise
+        print(f"--- [Structured Output]: JSON mode rejected for {call_site} ({e}). Retrying without it. ---")
+        return call_llm(llm, prompt, call_site=call_site, policy=policy)
+
+
+def generate_json(llm, prompt: str, required_keys: list, call_site: str = "default",
+                  policy: CallPolicy = None, schema: dict = None,
+                  tracker: LatencyTracker = None) -> tuple:
+    """
+    Calls the LLM for a JSON object and repairs the response locally where possible.
+
+    The response is requested in JSON mode, then parsed with `parse_json`. Only when the text cannot
+    be repaired is the model asked again, and then only to fix its own output (a short prompt
+    under `{call_site}/repair`). If a repaired (truncated) response lacks required keys, only those
+    keys are asked for, under `{call_site}/missing_keys`. A well-formed response is returned as is.
+
+    Args:
+        llm: The initialized Gemini GenerativeModel instance.
+        prompt: The prompt asking for the JSON object.
+        required_keys: The keys the object must contain.
+        call_site: The call site label used for latency statistics.
+        policy: The CallPolicy for the LLM calls. Defaults to the environment-configured policy.
+        schema: An optional response schema for Gemini's JSON mode.
+        tracker: The LatencyTracker counting repairs. Defaults to LATENCY_TRACKER.
+
+    Returns:
+        A (result, raw_text) tuple. `result` is None if no JSON object could be obtained.
+    """
+    tracker = tracker or LATENCY_TRACKER
+    raw = _call(llm, prompt, call_site, policy, schema).text
+    result, repaired = _parse(raw)
+
+    if result is None:
+        tracker.increment(call_site, "reasks")
+        print(f"--- [Structured Output]: Could not repair the {call_site} response. Asking the model to fix it. ---")
+        repair_prompt = REPAIR_PROMPT.format(keys=", ".join(required_keys), raw=raw[:REPAIR_MAX_CHARS])
+        raw = _call(llm, repair_prompt, f"{call_site}/repair", policy, schema).text
+        result, repaired = _parse(raw)
+        if result is None:
+            return None, raw
+
+    missing = [key for key in required_keys if key not in result]
+    if missing and repaired:
+        tracker.increment(call_site, "reasks")
+        print(f"--- [Structured Output]: {call_site} response is missing {', '.join(missing)}. Asking for them. ---")
+        followup = _call(llm, MISSING_KEYS_PROMPT.format(prompt=prompt, missing=", ".join(missing)),
+                         f"{call_site}/missing_keys", policy, None).text
+        result = {**result, **{k: v for k, v in (parse_json(followup) or {}).items() if k in missing}}
+    return result, raw
@@ -0,0 +1,159 @@
+import json
+import os
+import re
+import time
+from typing import Callable, Optional
+
+import google.generativeai as genai
+from dotenv import load_dotenv
+
+# Load .env before the project modules below read their settings (e.g. FAST_MODEL) at import time.
+load_dotenv()
+
+from .model_router import MODEL_TIERS
+from .resilient_client import LatencyTracker
+from ..workflows.news_analysis_chain import analyze_article_chain
+from ..workflows.revision_gate import llm_gate_decision
+from ..workflows.specialist_router import route_and_execute_task
+
+DEFAULT_FIXTURES_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "tier_eval_fixtures.json")
+
+
+def _run_specialist(task: str) -> Callable:
+    return lambda payload, llm: route_and_execute_task(task, payload, llm)
+
+
+# How each routed task is executed against a model, given a fixture's "input".
+TASK_RUNNERS = {
+    "news_analysis": lambda payload, llm: analyze_article_chain(payload, llm),
+    "revision_gate": lambda payload, llm: llm_gate_decision(payload, llm),
+    "analyze_financials": _run_specialist("analyze_financials"),
+    "analyze_news_impact": _run_specialist("analyze_news_impact"),
+    "analyze_market_context": _run_specialist("analyze_market_context"),
+}
+
+
+def _tokens(text: str) -> set:
+    return set(re.findall(r"[a-z0-9]+", str(text).lower()))
+
+
+def text_agreement(fast_output, large_output, threshold: float = 0.5) -> bool:
+    """
+    Free-text outputs agree when their word sets overlap (Jaccard) by at least `threshold`.
+    """
+    fast_tokens, large_tokens = _tokens(fast_output), _tokens(large_output)
+    if not fast_tokens and not large_tokens:
+        return True
+    return len(fast_tokens & large_tokens) / len(fast_tokens | large_tokens) >= threshold
+
+
+def sentiment_agreement(fast_output: dict, large_output: dict) -> bool:
+    """
+    Structured article analyses agree when both parsed and they carry the same sentiment label.
+    """
+    if "error" in fast_output or "error" in large_output:
+        return False
+    return str(fast_output.get("sentiment", "")).lower() == str(large_output.get("sentiment", "")).lower()
+
+
+# How agreement between the fast and large tier outputs is judged per task.
+AGREEMENT_FUNCTIONS = {
+    "news_analysis": sentiment_agreement,
+    "revision_gate": lambda fast_output, large_output: fast_output == large_output,
+}
+
+
+def load_fixtures(path: str = DEFAULT_FIXTURES_PATH) -> list:
+    """
+    Loads the tier evaluation fixtures: a JSON list of {"task": ..., "input": ...} objects.
+    """
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def compare_tiers(
+    fixtures: list,
+    fast_llm: genai.GenerativeModel,
+    large_llm: genai.GenerativeModel,
+    tasks: Optional[list] = None,
+    tracker: Optional[LatencyTracker] = None,
+) -> dict:
+    """
+    Runs every fixture on both tiers and reports latency saved against output agreement.
+
+    Args:
+        fixtures: A list of {"task": ..., "input": ...} objects (see load_fixtures).
+        fast_llm: The fast-tier model.
+        large_llm: The large-tier model.
+        tasks: Optional subset of task names to evaluate. Defaults to every task in the fixtures.
+        tracker: The LatencyTracker used for per-tier percentiles, under call sites '<task>/<tier>'.
+            Defaults to a fresh tracker so production statistics are not polluted.
+
+    Returns:
+        A dictionary keyed by task (plus 'overall') with sample count, mean and p95 latency per tier,
+        the latency saved by the fast tier (seconds and percent) and the agreement rate.
+    """
+    tracker = tracker or LatencyTracker()
+    totals = {}
+    for fixture in fixtures:
+        task = fixture["task"]
+        if (tasks is not None and task not in tasks) or task not in TASK_RUNNERS:
+            continue
+        runner = TASK_RUNNERS[task]
+        agree = AGREEMENT_FUNCTIONS.get(task, text_agreement)
+
+        outputs = {}
+        bucket = totals.setdefault(task, {"n": 0, "agreements": 0, "fast": 0.0, "large": 0.0})
+        for tier, model in (("fast", fast_llm), ("large", large_llm)):
+            start = time.monotonic()
+            outputs[tier] = runner(fixture["input"], model)
+            elapsed = time.monotonic() - start
+            tracker.record(f"{task}/{tier}", elapsed)
+            bucket[tier] += elapsed
+        bucket["n"] += 1
+        bucket["agreements"] += int(bool(agree(outputs["fast"], outputs["large"])))
+
+    def summarize(n, agreements, fast_total, large_total, task=None):
+        saved = large_total - fast_total
+        return {
+            "samples": n,
+            "fast_mean_latency": fast_total / n if n else None,
+            "large_mean_latency": large_total / n if n else None,
+            "fast_p95_latency": tracker.quantile(f"{task}/fast", 0.95) if task else None,
+            "large_p95_latency": tracker.quantile(f"{task}/large", 0.95) if task else None,
+            "latency_saved_seconds": saved,
+            "latency_saved_pct": saved / large_total if large_total else 0.0,
+            "agreement_rate": agreements / n if n else 0.0,
+        }
+
+    report = {
+        task: summarize(b["n"], b["agreements"], b["fast"], b["large"], task)
+        for task, b in totals.items()
+    }
+    report["overall"] = summarize(
+        sum(b["n"] for b in totals.values()),
+        sum(b["agreements"] for b in totals.values()),
+        sum(b["fast"] for b in totals.values()),
+        sum(b["large"] for b in totals.values()),
+    )
+    return report
+
+
+def print_tier_report(report: dict):
+    print("--- [Tier Evaluation Report] ---")
+    for task, stats in report.items():
+        if not stats["samples"]:
+            continue
+        print(
+            f"  {task}: n={stats['samples']} fast={stats['fast_mean_latency']:.2f}s "
+            f"large={stats['large_mean_latency']:.2f}s saved={stats['latency_saved_seconds']:.2f}s "
+            f"({stats['latency_saved_pct']:.0%}) agreement={stats['agreement_rate']:.0%}"
+        )
+
+
+if __name__ == "__main__":
+    # Run from src/: python -m v2_llm_graph.src.llm.tier_evaluation
+    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+    fast = genai.GenerativeModel(MODEL_TIERS["fast"], generation_config={"temperature": 0.2})
+    large = genai.GenerativeModel(MODEL_TIERS["large"], generation_config={"temperature": 0.2})
+    print_tier_report(compare_tiers(load_fixtures(), fast, large))
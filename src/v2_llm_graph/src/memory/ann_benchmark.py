@@ -0,0 +1,98 @@
+import time
+
+import numpy as np
+
+from .vector_backends import InMemoryBackend
+
+
+def synthetic_embeddings(n: int, dim: int, n_clusters: int = 256, noise: float = 2.0, seed: int = 0) -> np.ndarray:
+    """
+    Returns `n` normalized float32 vectors scattered around random cluster centres, which is closer
+    to the structure of sentence embeddings than uniform noise.
+    """
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    vectors = centres[rng.integers(0, n_clusters, n)] + noise * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def recall_at_k(found: list, expected: list) -> float:
+    """
+    Returns the mean share of the exact top-k ids that an approximate search also returned.
+    """
+    if not expected:
+        return 0.0
+    return float(np.mean([len(set(f) & set(e)) / len(e) for f, e in zip(found, expected)]))
+
+
+def _search(backend, queries: np.ndarray, k: int) -> tuple:
+    start = time.perf_counter()
+    results = [[hit["id"] for hit in backend.query(query, k)] for query in queries]
+    return results, (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def benchmark(n: int = 100_000, dim: int = 384, n_queries: int = 100, k: int = 10,
+              dtypes: tuple = ("float32", "float16", "int8"), n_lists: int = None,
+              n_probes: tuple = (1, 4, 8, 16, 32), seed: int = 0) -> list:
+    """
+    Measures recall@k, query latency and embedding memory of each storage type, exact and with an
+    IVF index at each `n_probe`, against exact float32 search on synthetic embeddings.
+
+    Args:
+        n: The number of stored vectors.
+        dim: The embedding dimension.
+        n_queries: The number of queries.
+        k: The number of neighbours per query.
+        dtypes: The storage types to measure.
+        n_lists: The IVF cluster count. Defaults to about sqrt(n).
+        n_probes: The clusters scanned per query.
+        seed: The random seed.
+
+    Returns:
+        One dictionary per configuration with 'dtype', 'n_probe' (None for exact search), 'recall',
+        'latency_ms' and 'memory_mb'.
+    """
+    vectors = synthetic_embeddings(n + n_queries, dim, seed=seed)
+    data, queries = vectors[:n], vectors[n:]
+    ids = [str(i) for i in range(n)]
+    n_lists = n_lists or max(1, int(np.sqrt(n)))
+
+    expected, _ = _search(InMemoryBackend.from_arrays(ids, data, ids, [None] * n), queries, k)
+    rows = []
+    for dtype in dtypes:
+        backend = InMemoryBackend(dim=dim, capacity=n, dtype=dtype)
+        backend.add(ids, data, [""] * n, [None] * n)
+        memory_mb = backend.memory_bytes() / 2**20
+        found, latency = _search(backend, queries, k)
+        rows.append({"dtype": dtype, "n_probe": None, "recall": recall_at_k(found, expected),
+                     "latency_ms": latency, "memory_mb": memory_mb})
+        backend.build_index(n_lists, seed=seed)
+        for n_probe in n_probes:
+            backend.index.n_probe = n_probe
+            found, latency = _search(backend, queries, k)
+            rows.append({"dtype": dtype, "n_probe": n_probe, "recall": recall_at_k(found, expected),
+                         "latency_ms": latency, "memory_mb": memory_mb})
+    return rows
+
+
+def print_benchmark(rows: list, k: int = 10):
+    print(f"--- [ANN Benchmark]: recall@{k} against exact float32 search ---")
+    for row in rows:
+        search = f"ivf n_probe={row['n_probe']}" if row["n_probe"] else "exact"
+        print(f"  {row['dtype']:>7} {search:<17} recall={row['recall']:.3f} "
+              f"latency={row['latency_ms']:.2f}ms memory={row['memory_mb']:.1f}MB")
+
+
+if __name__ == "__main__":
+    # Run from src/: python -m v2_llm_graph.src.memory.ann_benchmark --n 100000
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark quantized and approximate vector search.")
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--lists", type=int, default=None)
+    args = parser.parse_args()
+
+    print_benchmark(benchmark(args.n, args.dim, args.queries, args.k, n_lists=args.lists), k=args.k)
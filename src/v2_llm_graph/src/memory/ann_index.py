@@ -0,0 +1,111 @@
+import numpy as np
+
+# Embedding storage types. int8 keeps one float32 scale per vector (symmetric quantization),
+# cutting memory to about a quarter of float32 at a small recall cost.
+STORAGE_DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+
+def quantize(vectors: np.ndarray, dtype: str) -> tuple:
+    """
+    Converts normalized float32 vectors to the storage type.
+
+    Returns:
+        A (codes, scales) tuple. `scales` holds the per-vector int8 scale, or None for float types.
+
+    Raises:
+        ValueError: If the storage type is unknown.
+    """
+    if dtype not in STORAGE_DTYPES:
+        raise ValueError(f"Unknown embedding dtype '{dtype}'. Expected one of {sorted(STORAGE_DTYPES)}.")
+    if dtype != "int8":
+        return vectors.astype(STORAGE_DTYPES[dtype]), None
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def dequantize(codes: np.ndarray, scales: np.ndarray = None) -> np.ndarray:
+    vectors = codes.astype(np.float32)
+    return vectors * scales[:, None] if scales is not None else vectors
+
+
+# Rows converted to float32 at a time when scoring float16 or int8 codes, so the converted block
+# stays in cache instead of materializing a float32 copy of the whole matrix per query.
+SCORE_BLOCK_ROWS = 4096
+
+
+def similarities(codes: np.ndarray, scales: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """
+    Returns the dot products of stored vectors with a normalized float32 query.
+    """
+    if codes.dtype == np.float32:
+        scores = codes @ query
+    else:
+        scores = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_BLOCK_ROWS):
+            block = codes[start:start + SCORE_BLOCK_ROWS]
+            scores[start:start + len(block)] = block.astype(np.float32) @ query
+    return scores * scales if scales is not None else scores
+
+
+class IVFIndex:
+    """
+    An inverted file index for approximate nearest-neighbour search.
+
+    Spherical k-means splits the vectors into `n_lists` clusters. A query only scores the vectors of
+    the `n_probe` clusters whose centroids are closest to it, so raising `n_probe` trades latency
+    for recall (n_probe == n_lists is exact search).
+    """
+
+    def __init__(self, n_lists: int, n_probe: int = 8, seed: int = 0):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.seed = seed
+        self.centroids = None
+        self._lists = []
+        self._arrays = []
+
+    def train(self, vectors: np.ndarray, iterations: int = 10, sample_size: int = 20_000):
+        """
+        Fits the centroids on (a sample of) normalized float32 vectors.
+        """
+        rng = np.random.default_rng(self.seed)
+        if len(vectors) > sample_size:
+            vectors = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        n_lists = min(self.n_lists, len(vectors))
+        centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = np.argmax(vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, vectors)
+            norms = np.linalg.norm(sums, axis=1)
+            empty = norms == 0
+            # Empty clusters are reseeded with random vectors.
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+            centroids = sums / np.linalg.norm(sums, axis=1, keepdims=True)
+        self.centroids = centroids.astype(np.float32)
+        self.n_lists = n_lists
+        self._lists = [[] for _ in range(n_lists)]
+        self._arrays = [None] * n_lists
+
+    def add(self, vectors: np.ndarray, start: int):
+        """
+        Assigns normalized float32 vectors, stored at positions start, start + 1, ..., to their lists.
+        """
+        for offset, list_id in enumerate(np.argmax(vectors @ self.centroids.T, axis=1)):
+            self._lists[list_id].append(start + offset)
+            self._arrays[list_id] = None
+
+    def candidates(self, query: np.ndarray) -> np.ndarray:
+        """
+        Returns the positions in the `n_probe` lists closest to the query.
+        """
+        n_probe = min(self.n_probe, self.n_lists)
+        probe = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+        arrays = []
+        for list_id in probe:
+            if self._arrays[list_id] is None:
+                self._arrays[list_id] = np.asarray(self._lists[list_id], dtype=np.int64)
+            arrays.append(self._arrays[list_id])
+        return np.concatenate(arrays) if arrays else np.empty(0, dtype=np.int64)
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+
+# Where article analyses are stored. Override with ARTICLE_CACHE_PATH in the .env file.
+DEFAULT_ARTICLE_CACHE_PATH = os.getenv("ARTICLE_CACHE_PATH", "src/memory/article_analyses.sqlite")
+
+# Analyses older than this are evicted. News sentiment goes stale, so a month is plenty.
+ARTICLE_CACHE_MAX_AGE_DAYS = float(os.getenv("ARTICLE_CACHE_MAX_AGE_DAYS", "30"))
+
+# NewsAPI truncates `content` and appends a marker such as "... [+2345 chars]", whose count
+# differs between syndicated copies of the same text.
+_TRUNCATION_MARKER = re.compile(r"\s*(?:…|\.\.\.)?\s*\[\+\d+ chars\]\s*$")
+
+
+def normalize_content(text: str) -> str:
+    """
+    Normalizes article text for hashing: truncation marker removed, lowercased, whitespace collapsed.
+    """
+    return " ".join(_TRUNCATION_MARKER.sub("", text or "").lower().split())
+
+
+def content_key(text: str, prompt_version: str) -> str:
+    """
+    Returns the cache key of an article: a SHA-256 of the prompt version and the normalized content.
+    """
+    return hashlib.sha256(f"{prompt_version}\0{normalize_content(text)}".encode("utf-8")).hexdigest()
+
+
+class ArticleAnalysisCache:
+    """
+    Stores structured article analyses (reasoning, sentiment, key takeaways, summary) by content hash,
+    shared across tickers and runs.
+    """
+
+    def __init__(self, db_path: str = None, max_age_days: float = None):
+        """
+        Opens (and creates if needed) the cache and evicts entries older than `max_age_days`.
+
+        Args:
+            db_path: The SQLite database file. Defaults to ARTICLE_CACHE_PATH.
+            max_age_days: The maximum entry age. Defaults to ARTICLE_CACHE_MAX_AGE_DAYS.
+        """
+        db_path = db_path or DEFAULT_ARTICLE_CACHE_PATH
+        self.max_age_days = ARTICLE_CACHE_MAX_AGE_DAYS if max_age_days is None else max_age_days
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS article_analyses (key TEXT PRIMARY KEY, analysis TEXT, created_at REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS article_analyses_age ON article_analyses (created_at)")
+        self.evict()
+
+    def get(self, content: str, prompt_version: str) -> dict:
+        """
+        Returns the stored analysis of an article for a prompt version, or None.
+        """
+        row = self.conn.execute(
+            "SELECT analysis FROM article_analyses WHERE key = ? AND created_at >= ?",
+            (content_key(content, prompt_version), self._cutoff()),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, content: str, prompt_version: str, analysis: dict):
+        """
+        Stores the analysis of an article. Failed analyses (with an 'error' key) are not stored.
+        """
+        if "error" in analysis:
+            return
+        self.conn.execute(
+            "INSERT OR REPLACE INTO article_analyses (key, analysis, created_at) VALUES (?, ?, ?)",
+            (content_key(content, prompt_version), json.dumps(analysis), time.time()),
+        )
+        self.conn.commit()
+
+    def evict(self) -> int:
+        """
+        Deletes entries older than the maximum age and returns how many were removed.
+        """
+        removed = self.conn.execute("DELETE FROM article_analyses WHERE created_at < ?", (self._cutoff(),)).rowcount
+        self.conn.commit()
+        return removed
+
+    def _cutoff(self) -> float:
+        return time.time() - self.max_age_days * 86400
+
+    def close(self):
+        self.conn.close()
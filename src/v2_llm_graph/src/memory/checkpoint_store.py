@@ -0,0 +1,51 @@
+import os
+import sqlite3
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+# Where graph checkpoints are stored. Override with CHECKPOINT_DB_PATH in the .env file.
+DEFAULT_CHECKPOINT_PATH = os.getenv("CHECKPOINT_DB_PATH", "src/memory/checkpoints.sqlite")
+
+
+def open_checkpointer(db_path: str = DEFAULT_CHECKPOINT_PATH) -> SqliteSaver:
+    """
+    Opens the SQLite checkpointer that persists AgentState after every node.
+
+    Args:
+        db_path: The SQLite database file. Parent directories are created if needed.
+
+    Returns:
+        A SqliteSaver to pass to `workflow.compile(checkpointer=...)`.
+    """
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    print(f"[Checkpoints]: Using SQLite checkpoints at {db_path}")
+    # The graph may run nodes on worker threads, so the connection must not be tied to this one.
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    return SqliteSaver(conn)
+
+
+def thread_config(thread_id: str) -> dict:
+    """
+    Returns the LangGraph config that addresses one checkpointed run.
+    """
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def run_status(graph, thread_id: str) -> str:
+    """
+    Reports how far a checkpointed run got.
+
+    Args:
+        graph: A graph compiled with a checkpointer.
+        thread_id: The run ID.
+
+    Returns:
+        'new' if nothing was saved for the run, 'in_progress' if nodes are still pending,
+        or 'complete' if the run reached the end of the graph.
+    """
+    snapshot = graph.get_state(thread_config(thread_id))
+    if not snapshot.values:
+        return "new"
+    return "in_progress" if snapshot.next else "complete"
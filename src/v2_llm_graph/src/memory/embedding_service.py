@@ -0,0 +1,158 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# The sentence-transformer behind every embedding. It is the model ChromaDB uses by default, so
+# collections created before the service existed stay comparable. Pin a revision with
+# EMBEDDING_MODEL_REVISION for reproducible vectors.
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_MODEL_REVISION = os.getenv("EMBEDDING_MODEL_REVISION") or None
+
+# Offline mode: load the model from EMBEDDING_MODEL_PATH, or only from the local Hugging Face cache
+# when EMBEDDING_OFFLINE=true, never from the network.
+EMBEDDING_MODEL_PATH = os.getenv("EMBEDDING_MODEL_PATH") or None
+EMBEDDING_OFFLINE = os.getenv("EMBEDDING_OFFLINE", "false").lower() == "true"
+
+# Embed requests arriving within this window are encoded together, up to the batch size.
+EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))
+EMBEDDING_MAX_BATCH_SIZE = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "64"))
+
+_STOP = object()
+
+
+def load_embedding_model(model_name: str = None, model_path: str = None, offline: bool = None,
+                         revision: str = None):
+    """
+    Loads the sentence-transformer model.
+
+    Args:
+        model_name: The Hugging Face model ID. Defaults to EMBEDDING_MODEL.
+        model_path: A local model directory, which takes precedence over the model ID.
+        offline: If True, never download; only the local cache is used.
+        revision: The model revision to pin. Defaults to EMBEDDING_MODEL_REVISION.
+
+    Returns:
+        The loaded SentenceTransformer.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    offline = EMBEDDING_OFFLINE if offline is None else offline
+    if model_path:
+        print(f"[Embeddings]: Loading embedding model from {model_path}")
+        return SentenceTransformer(model_path, local_files_only=True)
+    model_name = model_name or EMBEDDING_MODEL
+    print(f"[Embeddings]: Loading embedding model {model_name}{' (offline)' if offline else ''}")
+    return SentenceTransformer(model_name, revision=revision or EMBEDDING_MODEL_REVISION, local_files_only=offline)
+
+
+class EmbeddingService:
+    """
+    Embeds texts with one in-process model shared across threads.
+
+    Requests are queued to a single worker thread, which waits a few milliseconds for concurrent
+    requests and encodes them as one batch, so parallel graph runs share model calls.
+    """
+
+    def __init__(self, model=None, batch_window_ms: float = None, max_batch_size: int = None, **model_options):
+        """
+        Loads the model (unless one is given) and starts the batching worker.
+
+        Args:
+            model: An object with a sentence-transformers style `encode` method. Loaded with
+                load_embedding_model(**model_options) if omitted.
+            batch_window_ms: How long the worker waits for more requests. Defaults to EMBEDDING_BATCH_WINDOW_MS.
+            max_batch_size: The most texts encoded in one call. Defaults to EMBEDDING_MAX_BATCH_SIZE.
+        """
+        self.model = model if model is not None else load_embedding_model(**model_options)
+        self.batch_window = (EMBEDDING_BATCH_WINDOW_MS if batch_window_ms is None else batch_window_ms) / 1000
+        self.max_batch_size = max_batch_size or EMBEDDING_MAX_BATCH_SIZE
+        self.batches = 0
+        self._queue = queue.Queue()
+        self._closed = False
+        self._closing = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="embedding-service", daemon=True)
+        self._worker.start()
+
+    def embed(self, texts: list) -> list:
+        """
+        Returns one normalized embedding (a list of floats) per text.
+
+        Raises:
+            RuntimeError: If the service has been closed.
+        """
+        if not texts:
+            return []
+        future = Future()
+        with self._closing:
+            # Checked under the lock so no request is queued behind the stop marker and never served.
+            if self._closed:
+                raise RuntimeError("EmbeddingService is closed.")
+            self._queue.put((list(texts), future))
+        return future.result()
+
+    def _collect(self, first) -> tuple:
+        batch, size, stop = [first], len(first[0]), False
+        deadline = time.monotonic() + self.batch_window
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch, stop
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch, stop = self._collect(item)
+            texts = [text for request, _ in batch for text in request]
+            try:
+                vectors = self.model.encode(texts, batch_size=self.max_batch_size, normalize_embeddings=True,
+                                            convert_to_numpy=True, show_progress_bar=False)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                self.batches += 1
+                offset = 0
+                for request, future in batch:
+                    future.set_result(vectors[offset:offset + len(request)].tolist())
+                    offset += len(request)
+            if stop:
+                return
+
+    def close(self):
+        """
+        Stops the worker once queued requests are served. Later embed calls raise RuntimeError.
+        """
+        with self._closing:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(_STOP)
+        self._worker.join()
+
+
+_shared_service = None
+_shared_lock = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    """
+    Returns the process-wide EmbeddingService, loading the model on first use.
+    """
+    global _shared_service
+    with _shared_lock:
+        if _shared_service is None:
+            _shared_service = EmbeddingService()
+        return _shared_service
@@ -0,0 +1,132 @@
+import math
+import re
+import threading
+from collections import defaultdict
+
+from .vector_backends import matches_where
+
+# Tokens keep inner dots and dashes, so tickers like "BRK.B" and dates like "2025-01-31" stay whole.
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+
+# BM25 parameters: term frequency saturation and document length normalization.
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Reciprocal rank fusion constant. Larger values flatten the advantage of top ranks.
+RRF_K = 60
+
+
+def tokenize(text: str) -> list:
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+def metadata_terms(metadata: dict) -> list:
+    """
+    Returns the index terms of an entry's metadata. Timestamps are also indexed by their day
+    ("2025-01-31-09:30:00" matches "2025-01-31").
+    """
+    terms = tokenize(" ".join(str(value) for value in metadata.values()))
+    if metadata.get("date"):
+        terms.append(str(metadata["date"])[:10])
+    return terms
+
+
+def reciprocal_rank_fusion(rankings: list, k: int = RRF_K) -> list:
+    """
+    Fuses several ranked lists of keys into one, scoring each key by the sum of 1 / (k + rank).
+    """
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] += 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+class LexicalIndex:
+    """
+    An in-memory BM25 inverted index over stored reports. Metadata values (ticker, date) are indexed
+    as terms too, so exact lookups by ticker or filing date never need an embedding.
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1, self.b = k1, b
+        self._postings = defaultdict(dict)
+        self._lengths = []
+        self._total_length = 0
+        self.ids, self.documents, self.metadatas = [], [], []
+        self._positions = {}
+        self._lock = threading.Lock()
+
+    def add(self, ids: list, documents: list, metadatas: list):
+        """
+        Indexes entries. Ids that are already indexed are ignored.
+        """
+        with self._lock:
+            for entry_id, document, metadata in zip(ids, documents, metadatas):
+                if entry_id in self._positions:
+                    continue
+                metadata = metadata or {}
+                position = len(self.ids)
+                terms = tokenize(document) + metadata_terms(metadata)
+                counts = defaultdict(int)
+                for term in terms:
+                    counts[term] += 1
+                for term, count in counts.items():
+                    self._postings[term][position] = count
+                self._positions[entry_id] = position
+                self.ids.append(entry_id)
+                self.documents.append(document)
+                self.metadatas.append(metadata)
+                self._lengths.append(len(terms))
+                self._total_length += len(terms)
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def knows_all(self, terms: list) -> bool:
+        """
+        Returns True if every term occurs in at least one indexed entry.
+        """
+        return bool(terms) and all(term in self._postings for term in terms)
+
+    def search(self, query_text: str, n_results: int, where: dict = None) -> list:
+        """
+        Returns the best BM25 matches as dictionaries with 'id', 'document', 'metadata' and 'score'.
+        Ties are broken by the newest 'date' metadata.
+        """
+        with self._lock:
+            count = len(self.ids)
+            if not count:
+                return []
+            average_length = self._total_length / count
+            scores = defaultdict(float)
+            for term in set(tokenize(query_text)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for position, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[position] / average_length)
+                    scores[position] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+            if where:
+                scores = {p: s for p, s in scores.items() if matches_where(self.metadatas[p], where)}
+            ranked = sorted(scores, key=lambda p: (scores[p], str(self.metadatas[p].get("date", ""))), reverse=True)
+            return [{"id": self.ids[p], "document": self.documents[p], "metadata": self.metadatas[p],
+                     "score": scores[p]} for p in ranked[:n_results]]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def shared_lexical_index(key: str, backend) -> LexicalIndex:
+    """
+    Returns the process-wide lexical index of a store, built from the backend's entries on first use.
+    """
+    with _indexes_lock:
+        if key not in _indexes:
+            index = LexicalIndex()
+            records = backend.get_all()
+            index.add(records["ids"], records["documents"], records["metadatas"])
+            _indexes[key] = index
+        return _indexes[key]
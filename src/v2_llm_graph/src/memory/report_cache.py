@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+# Where fingerprints and reusable reports are stored. Override with REPORT_CACHE_PATH in the .env file.
+DEFAULT_REPORT_CACHE_PATH = os.getenv("REPORT_CACHE_PATH", "src/memory/report_cache.sqlite")
+
+
+def fingerprint(value) -> str:
+    """
+    Returns a stable SHA-256 hex digest of a JSON-serializable value (dict key order is ignored).
+    """
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _usable(data) -> bool:
+    # A failed fetch must never match a previous run, or an outage would be served a stale report.
+    return isinstance(data, dict) and "error" not in data
+
+
+def input_fingerprints(state: dict) -> dict:
+    """
+    Fingerprints the gathered inputs of a run, one entry per specialist plus the SEC filing.
+
+    News is identified by article URL and publish time rather than its text, and the SEC filing
+    by its filing date. An input whose fetch failed gets None, which never matches.
+
+    Args:
+        state: The AgentState after data gathering and the SEC fetch.
+
+    Returns:
+        A dictionary with keys 'analyze_financials', 'analyze_news_impact',
+        'analyze_market_context' and 'sec_filings'.
+    """
+    financial_data = state.get("financial_data")
+    macro_data = state.get("macro_data")
+    news_data = state.get("news_data")
+    sec_data = state.get("sec_filings_data")
+    articles = [(a.get("url"), a.get("publishedAt")) for a in (news_data or {}).get("articles", [])]
+    return {
+        "analyze_financials": fingerprint(financial_data) if _usable(financial_data) else None,
+        "analyze_news_impact": fingerprint(articles) if _usable(news_data) else None,
+        "analyze_market_context": fingerprint(macro_data) if _usable(macro_data) else None,
+        "sec_filings": fingerprint(sec_data.get("filed_at")) if _usable(sec_data) else None,
+    }
+
+
+def changed_inputs(current: dict, previous: dict) -> list:
+    """
+    Returns the input keys whose fingerprint differs from the previous run (or is unknown).
+    """
+    return [key for key, value in current.items() if value is None or previous.get(key) != value]
+
+
+class ReportCache:
+    """
+    Stores the input fingerprints, specialist outputs and final report of the last run per ticker.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_REPORT_CACHE_PATH):
+        """
+        Opens (and creates if needed) the SQLite report cache.
+
+        Args:
+            db_path: The SQLite database file.
+        """
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS report_cache ("
+            "ticker TEXT PRIMARY KEY, fingerprints TEXT, analyses TEXT, report TEXT, updated_at TEXT)"
+        )
+        self.conn.commit()
+
+    def get(self, ticker: str) -> dict:
+        """
+        Returns the last stored run for a ticker as {'fingerprints', 'analyses', 'report', 'updated_at'},
+        or None if the ticker was never stored.
+        """
+        row = self.conn.execute(
+            "SELECT fingerprints, analyses, report, updated_at FROM report_cache WHERE ticker = ?", (ticker,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "fingerprints": json.loads(row[0]),
+            "analyses": json.loads(row[1]),
+            "report": row[2],
+            "updated_at": row[3],
+        }
+
+    def put(self, ticker: str, fingerprints: dict, analyses: dict, report: str):
+        """
+        Stores the latest run for a ticker, replacing the previous one.
+
+        Args:
+            ticker: The stock ticker.
+            fingerprints: The input fingerprints of the run (see input_fingerprints).
+            analyses: The specialist outputs, keyed by AgentState field.
+            report: The final report.
+        """
+        self.conn.execute(
+            "INSERT OR REPLACE INTO report_cache (ticker, fingerprints, analyses, report, updated_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (ticker, json.dumps(fingerprints), json.dumps(analyses, default=str), report,
+             datetime.now().strftime("%Y-%m-%d-%H:%M:%S")),
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
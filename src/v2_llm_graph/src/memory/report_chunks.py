@@ -0,0 +1,91 @@
+import re
+
+from ..workflows.prompt_builder import CHARS_PER_TOKEN, section_heading, summarize_past_analysis
+
+# Report sections stored as separate chunks, in report order.
+REPORT_SECTIONS = ("executive summary", "key findings", "recommendation", "justification")
+
+# Heading words that name each section. Justification is matched first because its heading often
+# reads "Justification for Recommendation".
+_SECTION_MATCHERS = (
+    ("justification", ("justification", "rationale")),
+    ("executive summary", ("summary",)),
+    ("key findings", ("finding",)),
+    ("recommendation", ("recommendation", "rating")),
+)
+
+
+def report_section(title: str) -> str:
+    """
+    Maps a lowercased heading title to one of REPORT_SECTIONS, or None for other headings.
+    """
+    for section, words in _SECTION_MATCHERS:
+        if any(word in title for word in words):
+            return section
+    return None
+
+
+def chunk_report(report: str) -> list:
+    """
+    Splits a report into one chunk per section in REPORT_SECTIONS.
+
+    Other headings (numbered findings, a conclusion) stay inside the section they appear in, and the
+    preamble before the first section is dropped. A chunk starts with its heading line stripped of
+    Markdown, so a rating in the heading ("Recommendation: HOLD") is kept.
+
+    Returns:
+        A list of (section, text) tuples in report order, or [(None, report)] if the report has
+        none of the sections.
+    """
+    chunks, current = {}, None
+    for line in (report or "").splitlines():
+        title = section_heading(line)
+        section = report_section(title) if title is not None else None
+        if section is not None:
+            current = section
+            chunks.setdefault(current, []).append(re.sub(r"[#*]", "", line).strip())
+        elif current is not None:
+            chunks[current].append(line)
+    if not chunks:
+        return [(None, report)]
+    return [(section, "\n".join(lines).strip()) for section, lines in chunks.items()]
+
+
+def _labelled(hit: dict, document: str = None) -> str:
+    metadata = hit["metadata"]
+    label = " ".join(str(metadata[key])[:10] for key in ("ticker", "date") if metadata.get(key))
+    document = hit["document"] if document is None else document
+    return f"[{label}] {document}" if label else document
+
+
+def select_sections(hits: list, max_chars: int) -> list:
+    """
+    Keeps the best-ranked hits whose documents fit into `max_chars` together.
+
+    Kept sections are grouped by report, in the order the reports were first ranked, and follow
+    REPORT_SECTIONS order within a report. Each is prefixed with its ticker and date. If even the
+    best hit does not fit, it is condensed to the budget instead.
+
+    Args:
+        hits: Ranked dictionaries with 'id', 'document' and 'metadata'.
+        max_chars: The character budget for all returned documents.
+
+    Returns:
+        A list of labelled documents.
+    """
+    kept, used = [], 0
+    for hit in hits:
+        document = _labelled(hit)
+        if used + len(document) <= max_chars:
+            kept.append((hit, document))
+            used += len(document)
+    if not kept and hits:
+        budget = max_chars - len(_labelled(hits[0], ""))
+        kept = [(hits[0], _labelled(hits[0], summarize_past_analysis(hits[0]["document"], budget // CHARS_PER_TOKEN)))]
+
+    parents, order = {}, {section: i for i, section in enumerate(REPORT_SECTIONS)}
+    for hit, _ in kept:
+        parents.setdefault(hit["metadata"].get("parent_id", hit["id"]), len(parents))
+    kept.sort(key=lambda item: (parents[item[0]["metadata"].get("parent_id", item[0]["id"])],
+                                order.get(item[0]["metadata"].get("section"), len(order))))
+    return [document for _, document in kept]
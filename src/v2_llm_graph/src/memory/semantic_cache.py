@@ -0,0 +1,172 @@
+import hashlib
+import os
+import threading
+import time
+from collections import defaultdict
+
+import chromadb
+
+from .embedding_service import get_embedding_service
+
+# The semantic cache is opt-in. Enable it with SEMANTIC_CACHE=true in the .env file.
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE", "false").lower() == "true"
+
+# Where cached responses are stored. Override with SEMANTIC_CACHE_PATH in the .env file.
+DEFAULT_SEMANTIC_CACHE_PATH = os.getenv("SEMANTIC_CACHE_PATH", "src/memory/semantic_cache")
+
+# Minimum cosine similarity between prompts for a cached response to be reused, per task.
+# Prompts of one task share a long template, so even unrelated inputs score high; the
+# thresholds only let through prompts whose data differs trivially (a rounded figure, a date).
+# Override with SEMANTIC_CACHE_THRESHOLDS, e.g. "analyze_financials=0.99,analyze_news_impact=0.97".
+SEMANTIC_CACHE_THRESHOLDS = {
+    "analyze_financials": 0.985,
+    "analyze_news_impact": 0.97,
+    "analyze_market_context": 0.98,
+}
+DEFAULT_SIMILARITY_THRESHOLD = 0.98
+
+
+def parse_thresholds(spec: str) -> dict:
+    """
+    Parses a threshold override such as "analyze_financials=0.99,analyze_news_impact=0.97".
+
+    Args:
+        spec: Comma-separated task=similarity pairs.
+
+    Returns:
+        A dictionary mapping task names to similarity thresholds.
+
+    Raises:
+        ValueError: If an entry is malformed or a threshold is not between 0 and 1.
+    """
+    thresholds = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        task, sep, value = entry.partition("=")
+        try:
+            threshold = float(value)
+        except ValueError:
+            threshold = None
+        if not sep or not task.strip() or threshold is None or not 0 < threshold <= 1:
+            raise ValueError(f"Invalid semantic cache threshold '{entry}'. Expected task=similarity in (0, 1].")
+        thresholds[task.strip()] = threshold
+    return thresholds
+
+
+def load_thresholds() -> dict:
+    """
+    Returns SEMANTIC_CACHE_THRESHOLDS with any overrides from SEMANTIC_CACHE_THRESHOLDS applied.
+    """
+    thresholds = dict(SEMANTIC_CACHE_THRESHOLDS)
+    thresholds.update(parse_thresholds(os.getenv("SEMANTIC_CACHE_THRESHOLDS", "")))
+    return thresholds
+
+
+class SemanticCache:
+    """
+    Reuses LLM responses for prompts that are nearly identical to an earlier prompt of the same task
+    and ticker. Prompts are embedded by the same EmbeddingService as VectorMemory.
+    """
+
+    def __init__(self, db_path: str = None, embedding_service=None, thresholds: dict = None):
+        """
+        Opens (and creates if needed) the semantic cache.
+
+        Args:
+            db_path: The ChromaDB directory. Defaults to SEMANTIC_CACHE_PATH.
+            embedding_service: The EmbeddingService for prompts. Defaults to the shared service.
+            thresholds: Task name to minimum similarity. Defaults to load_thresholds().
+        """
+        db_path = db_path or DEFAULT_SEMANTIC_CACHE_PATH
+        print(f"[Semantic Cache]: Initializing ChromaDB at {db_path}")
+        self.client = chromadb.PersistentClient(path=db_path)
+        self.collection = self.client.get_or_create_collection(
+            name="llm_response_cache", metadata={"hnsw:space": "cosine"}
+        )
+        self.embedding_service = embedding_service
+        self.thresholds = load_thresholds() if thresholds is None else thresholds
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {"lookups": 0, "hits": 0})
+
+    def _embed(self, texts: list) -> list:
+        return (self.embedding_service or get_embedding_service()).embed(texts)
+
+    def threshold(self, task: str) -> float:
+        return self.thresholds.get(task, DEFAULT_SIMILARITY_THRESHOLD)
+
+    def lookup(self, task: str, prompt: str, ticker: str = None) -> str:
+        """
+        Returns the cached response of the most similar earlier prompt of the task and ticker, or
+        None if no prompt is within the task's similarity threshold.
+
+        Responses are never shared between tickers: two companies with near-identical figures
+        still get their own analysis. Pass ticker=None for ticker-independent prompts.
+        """
+        response = None
+        try:
+            results = self.collection.query(query_embeddings=self._embed([prompt]), n_results=1,
+                                            where={"$and": [{"task": task}, {"ticker": ticker or ""}]},
+                                            include=["distances", "metadatas"])
+            if results["distances"][0]:
+                similarity = 1.0 - results["distances"][0][0]
+                if similarity >= self.threshold(task):
+                    response = results["metadatas"][0][0]["response"]
+        except Exception as e:
+            print(f"[Semantic Cache Error]: Lookup failed for {task}. Details: {e}")
+        with self._lock:
+            self._stats[task]["lookups"] += 1
+            self._stats[task]["hits"] += response is not None
+        return response
+
+    def store(self, task: str, prompt: str, response: str, ticker: str = None):
+        """
+        Stores the response to a prompt of the task for the ticker.
+        """
+        key = hashlib.sha256(f"{task}\0{ticker or ''}\0{prompt}".encode("utf-8")).hexdigest()
+        try:
+            self.collection.upsert(
+                ids=[key],
+                documents=[prompt],
+                embeddings=self._embed([prompt]),
+                metadatas=[{"task": task, "ticker": ticker or "", "response": response, "created_at": time.time()}],
+            )
+        except Exception as e:
+            print(f"[Semantic Cache Error]: Failed to store a response for {task}. Details: {e}")
+
+    def report(self) -> dict:
+        """
+        Returns lookups, hits, hit rate and threshold per task.
+        """
+        with self._lock:
+            stats = {task: dict(values) for task, values in self._stats.items()}
+        return {
+            task: {**values, "hit_rate": values["hits"] / values["lookups"] if values["lookups"] else 0.0,
+                   "threshold": self.threshold(task)}
+            for task, values in sorted(stats.items())
+        }
+
+    def print_report(self):
+        print("--- [Semantic Cache Report] ---")
+        for task, stats in self.report().items():
+            print(f"  {task}: {stats['hits']}/{stats['lookups']} hits ({stats['hit_rate']:.0%}) "
+                  f"threshold={stats['threshold']}")
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_semantic_cache():
+    """
+    Returns the process-wide SemanticCache, or None when the cache is disabled or cannot be opened.
+    """
+    global _shared_cache
+    if not SEMANTIC_CACHE_ENABLED:
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            try:
+                _shared_cache = SemanticCache()
+            except Exception as e:
+                print(f"[Semantic Cache Error]: Failed to open the cache. Details: {e}")
+                return None
+        return _shared_cache
@@ -0,0 +1,133 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import zstandard
+
+from .vector_backends import ChromaBackend, InMemoryBackend
+
+# A snapshot is a directory holding the embedding matrix as a plain .npy file, which can be
+# memory-mapped, and the ids, documents and metadata as zstd-compressed JSON.
+EMBEDDINGS_FILE = "embeddings.npy"
+RECORDS_FILE = "records.json.zst"
+MANIFEST_FILE = "manifest.json"
+SNAPSHOT_VERSION = 1
+
+SNAPSHOT_DTYPES = {"float32": np.float32, "float16": np.float16}
+ZSTD_LEVEL = 10
+
+# Entries per ChromaDB add call when a snapshot is restored to disk.
+RESTORE_BATCH_SIZE = 1000
+
+
+def export_snapshot(backend, path: str, dtype: str = "float32") -> dict:
+    """
+    Writes every entry of a vector backend to a snapshot directory.
+
+    The snapshot is written next to `path` and renamed into place, so an interrupted export never
+    leaves a partial snapshot behind.
+
+    Args:
+        backend: A ChromaBackend or InMemoryBackend.
+        path: The snapshot directory. An existing snapshot there is replaced.
+        dtype: 'float32', or 'float16' to halve the size of the embedding matrix.
+
+    Returns:
+        The snapshot manifest (version, count, dim, dtype).
+
+    Raises:
+        ValueError: If the dtype is not supported.
+    """
+    if dtype not in SNAPSHOT_DTYPES:
+        raise ValueError(f"Unsupported snapshot dtype '{dtype}'. Expected one of {sorted(SNAPSHOT_DTYPES)}.")
+    records = backend.get_all()
+    vectors = np.asarray(records["embeddings"], dtype=SNAPSHOT_DTYPES[dtype])
+    if not len(vectors):
+        vectors = vectors.reshape(0, 0)
+    manifest = {"version": SNAPSHOT_VERSION, "count": len(records["ids"]), "dim": int(vectors.shape[1]),
+                "dtype": dtype}
+
+    tmp_path = f"{path.rstrip(os.sep)}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    np.save(os.path.join(tmp_path, EMBEDDINGS_FILE), vectors)
+    payload = json.dumps({key: records[key] for key in ("ids", "documents", "metadatas")}).encode("utf-8")
+    with open(os.path.join(tmp_path, RECORDS_FILE), "wb") as f:
+        f.write(zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload))
+    with open(os.path.join(tmp_path, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    print(f"[Memory]: Exported {manifest['count']} entries to {path} ({dtype}).")
+    return manifest
+
+
+def read_snapshot(path: str, mmap: bool = True) -> tuple:
+    """
+    Reads a snapshot directory.
+
+    Args:
+        path: The snapshot directory.
+        mmap: If True, the embedding matrix is memory-mapped read-only instead of read into RAM.
+
+    Returns:
+        A (manifest, vectors, records) tuple, where records holds 'ids', 'documents' and 'metadatas'.
+
+    Raises:
+        ValueError: If the snapshot was written by an unknown version or is inconsistent.
+    """
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {manifest.get('version')} in {path}.")
+    vectors = np.load(os.path.join(path, EMBEDDINGS_FILE), mmap_mode="r" if mmap else None)
+    with open(os.path.join(path, RECORDS_FILE), "rb") as f:
+        records = json.loads(zstandard.ZstdDecompressor().decompress(f.read()))
+    if len(records["ids"]) != manifest["count"] or len(vectors) != manifest["count"]:
+        raise ValueError(f"Snapshot {path} is inconsistent with its manifest.")
+    return manifest, vectors, records
+
+
+def load_snapshot(path: str, mmap: bool = True) -> InMemoryBackend:
+    """
+    Opens a snapshot as an in-memory backend without re-embedding anything. With `mmap`, the
+    embedding matrix stays on disk and is paged in by the OS as queries touch it.
+    """
+    manifest, vectors, records = read_snapshot(path, mmap=mmap)
+    backend = InMemoryBackend.from_arrays(records["ids"], vectors, records["documents"], records["metadatas"])
+    print(f"[Memory]: Loaded {manifest['count']} entries from snapshot {path}.")
+    return backend
+
+
+def restore_snapshot(path: str, db_path: str) -> int:
+    """
+    Imports a snapshot into the ChromaDB store at `db_path`, passing the stored embeddings, and
+    returns how many entries were added.
+    """
+    _, vectors, records = read_snapshot(path)
+    target = ChromaBackend(db_path)
+    for start in range(0, len(records["ids"]), RESTORE_BATCH_SIZE):
+        end = start + RESTORE_BATCH_SIZE
+        target.add(records["ids"][start:end], np.asarray(vectors[start:end], dtype=np.float32).tolist(),
+                   records["documents"][start:end], records["metadatas"][start:end])
+    print(f"[Memory]: Restored {len(records['ids'])} entries into {db_path}.")
+    return len(records["ids"])
+
+
+if __name__ == "__main__":
+    # Run from src/: python -m v2_llm_graph.src.memory.snapshot export src/memory/chroma_db memory_snapshot
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export or import the vector memory as a snapshot.")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("db_path", help="The ChromaDB directory.")
+    parser.add_argument("snapshot_path", help="The snapshot directory.")
+    parser.add_argument("--dtype", default="float32", choices=sorted(SNAPSHOT_DTYPES))
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_snapshot(ChromaBackend(args.db_path), args.snapshot_path, dtype=args.dtype)
+    else:
+        restore_snapshot(args.snapshot_path, args.db_path)
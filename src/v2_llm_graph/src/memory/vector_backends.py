@@ -0,0 +1,355 @@
+import atexit
+import operator
+import os
+import threading
+
+import chromadb
+import numpy as np
+
+from .ann_index import STORAGE_DTYPES, IVFIndex, dequantize, quantize, similarities
+
+# Which store VectorMemory uses: 'chroma' (persistent, on disk) or 'memory' (NumPy, in RAM).
+# With 'memory', the Chroma store is loaded once per process and new entries are written back
+# by flush_memory_backends(), at the latest when the process exits. Override with VECTOR_BACKEND in the .env file.
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+
+# A snapshot (see memory/snapshot.py) the 'memory' backend is memory-mapped from instead of
+# loading the Chroma store. Set VECTOR_SNAPSHOT_PATH in the .env file.
+VECTOR_SNAPSHOT_PATH = os.getenv("VECTOR_SNAPSHOT_PATH") or None
+
+# Storage type of 'memory' backend embeddings: 'float32', 'float16' or 'int8'.
+VECTOR_DTYPE = os.getenv("VECTOR_DTYPE", "float32")
+
+# Approximate search for large 'memory' backends. With VECTOR_IVF_LISTS > 0, an IVF index with that
+# many clusters is built once the store is loaded, and each query scans VECTOR_IVF_PROBE of them.
+VECTOR_IVF_LISTS = int(os.getenv("VECTOR_IVF_LISTS", "0"))
+VECTOR_IVF_PROBE = int(os.getenv("VECTOR_IVF_PROBE", "8"))
+
+DEFAULT_COLLECTION = "quant_apprentice_memory"
+
+_OPERATORS = {
+    "$eq": operator.eq, "$ne": operator.ne,
+    "$gt": operator.gt, "$gte": operator.ge, "$lt": operator.lt, "$lte": operator.le,
+    "$in": lambda value, operand: value in operand, "$nin": lambda value, operand: value not in operand,
+}
+_ORDERED = {"$gt", "$gte", "$lt", "$lte"}
+
+
+def matches_where(metadata: dict, where: dict) -> bool:
+    """
+    Returns True if metadata satisfies a ChromaDB-style `where` filter.
+
+    Supports equality ({'ticker': 'NVDA'}), the operators $eq, $ne, $gt, $gte, $lt, $lte, $in and
+    $nin, and the combinators $and and $or.
+    """
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for op, operand in condition.items():
+                if op not in _OPERATORS:
+                    raise ValueError(f"Unsupported where operator '{op}'.")
+                if op in _ORDERED and value is None:
+                    return False
+                if not _OPERATORS[op](value, operand):
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+class ChromaBackend:
+    """
+    Persistent vector store backed by a ChromaDB collection on disk.
+    """
+
+    def __init__(self, db_path: str, collection_name: str = DEFAULT_COLLECTION):
+        self.client = chromadb.PersistentClient(path=db_path)
+        self.collection = self.client.get_or_create_collection(name=collection_name)
+
+    def add(self, ids: list, embeddings: list, documents: list, metadatas: list):
+        self.collection.add(documents=documents, embeddings=embeddings, metadatas=metadatas, ids=ids)
+
+    def query(self, embedding: list, n_results: int, where: dict = None) -> list:
+        """
+        Returns the nearest entries as dictionaries with 'id', 'document', 'metadata' and 'distance'.
+        """
+        options = {"where": where} if where else {}
+        results = self.collection.query(query_embeddings=[embedding], n_results=n_results, **options)
+        documents = (results.get("documents") or [[]])[0]
+        ids = (results.get("ids") or [[None] * len(documents)])[0]
+        metadatas = (results.get("metadatas") or [[None] * len(documents)])[0]
+        distances = (results.get("distances") or [[None] * len(documents)])[0]
+        return [{"id": i, "document": d, "metadata": m, "distance": dist}
+                for i, d, m, dist in zip(ids, documents, metadatas, distances)]
+
+    def get_all(self) -> dict:
+        """
+        Returns every entry as a dictionary of parallel 'ids', 'embeddings', 'documents' and 'metadatas' lists.
+        """
+        results = self.collection.get(include=["embeddings", "documents", "metadatas"])
+        return {key: list(results[key]) if results[key] is not None else []
+                for key in ("ids", "embeddings", "documents", "metadatas")}
+
+    def count(self) -> int:
+        return self.collection.count()
+
+
+class InMemoryBackend:
+    """
+    Vector store held in RAM: a contiguous matrix searched by brute-force cosine similarity, or
+    through an approximate IVF index once `build_index` was called.
+
+    It has the add/query/filter semantics of ChromaBackend, so tests and short-lived batch jobs can
+    run without disk I/O. Embeddings can be stored as float32, float16 or int8 to save memory.
+    Entries added since the last load or flush are written to a persistent backend by `flush`.
+    """
+
+    def __init__(self, dim: int = None, capacity: int = 1024, dtype: str = None):
+        """
+        Args:
+            dim: The embedding dimension. Inferred from the first add if omitted.
+            capacity: The initial number of rows allocated.
+            dtype: The embedding storage type ('float32', 'float16' or 'int8'). Defaults to VECTOR_DTYPE.
+        """
+        self.dtype = dtype or VECTOR_DTYPE
+        if self.dtype not in STORAGE_DTYPES:
+            raise ValueError(f"Unknown embedding dtype '{self.dtype}'. Expected one of {sorted(STORAGE_DTYPES)}.")
+        self._capacity = capacity
+        self._vectors, self._scales = None, None
+        if dim:
+            self._allocate(capacity, dim)
+        self._size = 0
+        self.ids, self.documents, self.metadatas = [], [], []
+        self._positions = {}
+        self._pending_from = 0
+        self.index = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_arrays(cls, ids: list, vectors: np.ndarray, documents: list, metadatas: list) -> "InMemoryBackend":
+        """
+        Wraps an existing float32 or float16 matrix of normalized embeddings (e.g. a memory-mapped
+        snapshot) without copying it. The matrix is copied into RAM only when entries are added.
+        """
+        backend = cls(dtype="float16" if vectors.dtype == np.float16 else "float32")
+        backend._vectors = vectors if len(ids) else None
+        backend._size = len(ids)
+        backend.ids, backend.documents = list(ids), list(documents)
+        backend.metadatas = [metadata or {} for metadata in metadatas]
+        backend._positions = {entry_id: i for i, entry_id in enumerate(backend.ids)}
+        backend._pending_from = backend._size
+        return backend
+
+    def _allocate(self, rows: int, dim: int):
+        vectors = np.empty((rows, dim), dtype=STORAGE_DTYPES[self.dtype])
+        scales = np.empty(rows, dtype=np.float32) if self.dtype == "int8" else None
+        if self._vectors is not None and self._size:
+            vectors[:self._size] = self._vectors[:self._size]
+            if scales is not None:
+                scales[:self._size] = self._scales[:self._size]
+        self._vectors, self._scales = vectors, scales
+
+    def _ensure_capacity(self, dim: int, extra: int):
+        if self._vectors is None:
+            self._allocate(max(self._capacity, extra), dim)
+        if self._vectors.shape[1] != dim:
+            raise ValueError(f"Embedding dimension {dim} does not match the store's {self._vectors.shape[1]}.")
+        # A memory-mapped snapshot matrix is copied into a writable one on first add.
+        if self._size + extra > len(self._vectors) or not self._vectors.flags.writeable:
+            self._allocate(max(2 * len(self._vectors), self._size + extra), dim)
+
+    def _embeddings(self, start: int = 0, end: int = None) -> np.ndarray:
+        end = self._size if end is None else end
+        scales = self._scales[start:end] if self._scales is not None else None
+        return dequantize(self._vectors[start:end], scales)
+
+    def add(self, ids: list, embeddings: list, documents: list, metadatas: list):
+        """
+        Adds entries. Like ChromaDB's add, ids that already exist are ignored.
+        """
+        with self._lock:
+            new = [i for i, entry_id in enumerate(ids) if entry_id not in self._positions]
+            if not new:
+                return
+            vectors = np.asarray([embeddings[i] for i in new], dtype=np.float32)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.where(norms == 0, 1, norms)
+            self._ensure_capacity(vectors.shape[1], len(new))
+            codes, scales = quantize(vectors, self.dtype)
+            self._vectors[self._size:self._size + len(new)] = codes
+            if scales is not None:
+                self._scales[self._size:self._size + len(new)] = scales
+            if self.index is not None:
+                self.index.add(vectors, self._size)
+            for i in new:
+                self._positions[ids[i]] = len(self.ids)
+                self.ids.append(ids[i])
+                self.documents.append(documents[i])
+                self.metadatas.append(metadatas[i] or {})
+            self._size += len(new)
+
+    def build_index(self, n_lists: int = None, n_probe: int = None, seed: int = 0):
+        """
+        Builds an approximate IVF index over the stored entries. Unfiltered queries then only score
+        the `n_probe` closest of `n_lists` clusters; filtered queries stay exact.
+
+        Args:
+            n_lists: The number of clusters. Defaults to VECTOR_IVF_LISTS, or about sqrt(count).
+            n_probe: The clusters scanned per query. Defaults to VECTOR_IVF_PROBE.
+            seed: The k-means seed.
+        """
+        with self._lock:
+            if not self._size:
+                return
+            n_lists = n_lists or VECTOR_IVF_LISTS or max(1, int(np.sqrt(self._size)))
+            index = IVFIndex(n_lists, n_probe or VECTOR_IVF_PROBE, seed=seed)
+            vectors = self._embeddings()
+            index.train(vectors)
+            index.add(vectors, 0)
+            self.index = index
+
+    def query(self, embedding: list, n_results: int, where: dict = None) -> list:
+        """
+        Returns the nearest entries as dictionaries with 'id', 'document', 'metadata' and 'distance'
+        (cosine distance, 1 - similarity).
+        """
+        with self._lock:
+            if not self._size:
+                return []
+            query = np.asarray(embedding, dtype=np.float32)
+            query /= np.linalg.norm(query) or 1
+            if self.index is not None and not where:
+                positions = self.index.candidates(query)
+                scales = self._scales[positions] if self._scales is not None else None
+                scores = similarities(self._vectors[positions], scales, query)
+            else:
+                positions = np.arange(self._size)
+                scales = self._scales[:self._size] if self._scales is not None else None
+                scores = similarities(self._vectors[:self._size], scales, query)
+            if where:
+                mask = np.fromiter((matches_where(m, where) for m in self.metadatas), dtype=bool, count=self._size)
+                scores = np.where(mask, scores, -np.inf)
+            k = min(n_results, int(np.isfinite(scores).sum()))
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [{"id": self.ids[p], "document": self.documents[p], "metadata": self.metadatas[p],
+                     "distance": float(1.0 - scores[i])} for i, p in zip(top, positions[top])]
+
+    def get_all(self) -> dict:
+        with self._lock:
+            return {
+                "ids": list(self.ids),
+                "embeddings": self._embeddings().tolist() if self._size else [],
+                "documents": list(self.documents),
+                "metadatas": list(self.metadatas),
+            }
+
+    def count(self) -> int:
+        return self._size
+
+    def memory_bytes(self) -> int:
+        """
+        Returns the bytes held by the stored embeddings (and int8 scales).
+        """
+        if self._vectors is None:
+            return 0
+        row = self._vectors.shape[1] * self._vectors.itemsize + (4 if self._scales is not None else 0)
+        return self._size * row
+
+    def pending(self) -> int:
+        """
+        Returns how many entries were added since the last load or flush.
+        """
+        return self._size - self._pending_from
+
+    def load(self, source) -> int:
+        """
+        Loads every entry of another backend (e.g. a ChromaBackend snapshot) and returns how many.
+        Loaded entries are not written back by `flush`.
+        """
+        records = source.get_all()
+        if records["ids"]:
+            self.add(records["ids"], records["embeddings"], records["documents"], records["metadatas"])
+        self._pending_from = self._size
+        return len(records["ids"])
+
+    def flush(self, target) -> int:
+        """
+        Writes the entries added since the last load or flush to `target` and returns how many.
+        """
+        with self._lock:
+            start, end = self._pending_from, self._size
+            pending = (self.ids[start:end], self._embeddings(start, end).tolist() if end > start else [],
+                       self.documents[start:end], self.metadatas[start:end])
+        if pending[0]:
+            target.add(*pending)
+        self._pending_from = end
+        return end - start
+
+
+_memory_backends = {}
+_memory_lock = threading.Lock()
+_flush_at_exit = False
+
+
+def open_backend(db_path: str, kind: str = None):
+    """
+    Returns the vector backend for a store path.
+
+    Args:
+        db_path: The ChromaDB directory of the store.
+        kind: 'chroma' or 'memory'. Defaults to VECTOR_BACKEND. A 'memory' backend is shared per
+            path within the process and starts from VECTOR_SNAPSHOT_PATH if set, otherwise as a
+            copy of the Chroma store, if one exists. It uses VECTOR_DTYPE storage and, with
+            VECTOR_IVF_LISTS set, an approximate IVF index. Entries not flushed by the caller
+            are flushed when the process exits.
+
+    Raises:
+        ValueError: If the backend kind is unknown.
+    """
+    kind = kind or VECTOR_BACKEND
+    if kind == "chroma":
+        return ChromaBackend(db_path)
+    if kind != "memory":
+        raise ValueError(f"Unknown vector backend '{kind}'. Expected 'chroma' or 'memory'.")
+    global _flush_at_exit
+    with _memory_lock:
+        if not _flush_at_exit:
+            atexit.register(flush_memory_backends)
+            _flush_at_exit = True
+        if db_path not in _memory_backends:
+            backend = InMemoryBackend()
+            if VECTOR_SNAPSHOT_PATH and os.path.isdir(VECTOR_SNAPSHOT_PATH):
+                from .snapshot import load_snapshot
+
+                backend = load_snapshot(VECTOR_SNAPSHOT_PATH)
+            elif os.path.isdir(db_path):
+                loaded = backend.load(ChromaBackend(db_path))
+                print(f"[Memory]: Loaded {loaded} entries from {db_path} into RAM.")
+            if VECTOR_IVF_LISTS and backend.count():
+                backend.build_index(VECTOR_IVF_LISTS, VECTOR_IVF_PROBE)
+            _memory_backends[db_path] = backend
+        return _memory_backends[db_path]
+
+
+def flush_memory_backends() -> int:
+    """
+    Writes new entries of every in-memory backend to its Chroma store and returns how many.
+    """
+    with _memory_lock:
+        backends = list(_memory_backends.items())
+    flushed = 0
+    for db_path, backend in backends:
+        if backend.pending():
+            flushed += backend.flush(ChromaBackend(db_path))
+    if flushed:
+        print(f"[Memory]: Flushed {flushed} new entries to disk.")
+    return flushed
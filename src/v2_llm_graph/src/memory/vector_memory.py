@@ -1,30 +1,68 @@
-import chromadb
+import os
 from datetime import datetime
 
+from .embedding_service import get_embedding_service
+from .lexical_index import reciprocal_rank_fusion, shared_lexical_index, tokenize
+from .report_chunks import chunk_report, select_sections
+from .vector_backends import open_backend
+
+# Queries of at most this many terms, all of them known to the lexical index (a ticker, a date,
+# "sell"), are answered from the inverted index alone, without computing an embedding.
+KEYWORD_QUERY_MAX_TERMS = 3
+
+# Candidates taken from each ranking before they are fused.
+FUSION_CANDIDATES = 10
+
+QUERY_MODES = ("hybrid", "vector", "lexical")
+
+# Character budget for past report sections handed to the synthesis prompt. The default matches
+# the prompt's past_analysis budget (600 tokens at four characters per token).
+MEMORY_CONTEXT_CHARS = int(os.getenv("MEMORY_CONTEXT_CHARS", "2400"))
+
+# The most report sections retrieved for one prompt.
+MEMORY_CONTEXT_SECTIONS = 4
+
 
 class VectorMemory:
     """
-    A class to manage agent memory using a ChromaDB vector database.
+    A class to manage agent memory using a ChromaDB vector database, or an in-memory store for batch jobs.
     """
 
-    def __init__(self, db_path: str = "src/memory/chroma_db"):
+    def __init__(self, db_path: str = "src/memory/chroma_db", embedding_service=None, backend=None):
         """
-        Initializes the VectorMemory, setting up the ChromaDB client and collection.
+        Initializes the VectorMemory, setting up the vector backend.
 
         Args:
             db_path: The directory path to store the ChromaDB database files.
+            embedding_service: The EmbeddingService used for documents and queries.
+                Defaults to the shared service.
+            backend: The vector backend. Defaults to open_backend(db_path), which follows VECTOR_BACKEND.
         """
-        print(f"[Memory]: Initializing ChromaDB at {db_path}")
-        self.client = chromadb.PersistentClient(path=db_path)
-        # The sentence-transformer model is downloaded automatically by ChromaDB the first time.
-        self.collection = self.client.get_or_create_collection(
-            name="quant_apprentice_memory"
-        )
+        print(f"[Memory]: Initializing vector memory at {db_path}")
+        # Embeddings are computed by the EmbeddingService, never lazily inside ChromaDB.
+        self.backend = backend or open_backend(db_path)
+        self.embedding_service = embedding_service
+        # The lexical index is shared per store path; an explicitly passed backend gets its own.
+        self._lexical_key = f"{db_path}#{id(backend)}" if backend else db_path
+
+    def _lexical_index(self):
+        try:
+            return shared_lexical_index(self._lexical_key, self.backend)
+        except Exception as e:
+            print(f"[Memory Error]: Lexical index unavailable. Using vector search only. Details: {e}")
+            return None
+
+    def _embed(self, texts: list) -> list:
+        return (self.embedding_service or get_embedding_service()).embed(texts)
 
     def add_analysis(self, ticker: str, report_text: str):
         """
         Adds a new analysis report to the vector memory.
 
+        The report is stored as one entry per section (Executive Summary, Key Findings,
+        Recommendation, Justification), each with the report's id as 'parent_id', so retrieval
+        can return single sections. Reports without these sections are stored whole.
+
         Args:
             ticker: The stock ticker the report is about (e.g., 'NVDA').
             report_text: The full text of the final, refined analysis.
@@ -34,33 +72,77 @@ class VectorMemory:
             current_date = datetime.now().strftime("%Y-%m-%d-%H:%M:%S")
             unique_id = f"{ticker}_{current_date}"
 
-            self.collection.add(
-                documents=[report_text],
-                metadatas=[{"ticker": ticker, "date": current_date}],
-                ids=[unique_id]
+            ids, documents, metadatas = [], [], []
+            for section, text in chunk_report(report_text):
+                metadata = {"ticker": ticker, "date": current_date}
+                if section:
+                    metadata.update(parent_id=unique_id, section=section)
+                ids.append(f"{unique_id}#{section.replace(' ', '_')}" if section else unique_id)
+                documents.append(text)
+                metadatas.append(metadata)
+            self.backend.add(
+                ids=ids,
+                embeddings=self._embed(documents),
+                documents=documents,
+                metadatas=metadatas
             )
-            print(f"[Memory]: Successfully added document with ID: {unique_id}")
+            lexical_index = self._lexical_index()
+            if lexical_index is not None:
+                lexical_index.add(ids, documents, metadatas)
+            print(f"[Memory]: Successfully added document with ID: {unique_id} ({len(ids)} chunks)")
         except Exception as e:
             print(f"[Memory Error]: Failed to add analysis for {ticker}. Details: {e}")
 
-    def query_memory(self, query_text: str, n_results: int = 2) -> list:
+    def _search(self, query_text: str, n_results: int, where: dict, mode: str) -> list:
+        lexical_index = self._lexical_index() if mode != "vector" else None
+        if lexical_index is None or not lexical_index.count():
+            if mode == "lexical":
+                return []
+            return self.backend.query(self._embed([query_text])[0], n_results=n_results, where=where)
+
+        terms = tokenize(query_text)
+        lexical_hits = lexical_index.search(query_text, max(n_results, FUSION_CANDIDATES), where)
+        keyword_query = len(terms) <= KEYWORD_QUERY_MAX_TERMS and lexical_index.knows_all(terms)
+        if mode == "lexical" or (keyword_query and len(lexical_hits) >= n_results):
+            return lexical_hits[:n_results]
+
+        vector_hits = self.backend.query(self._embed([query_text])[0],
+                                         n_results=max(n_results, FUSION_CANDIDATES), where=where)
+        hits = {hit["id"]: hit for hit in vector_hits + lexical_hits}
+        fused = reciprocal_rank_fusion([[hit["id"] for hit in vector_hits], [hit["id"] for hit in lexical_hits]])
+        return [hits[entry_id] for entry_id in fused[:n_results]]
+
+    def query_memory(self, query_text: str, n_results: int = 2, where: dict = None, mode: str = "hybrid",
+                     max_chars: int = None) -> list:
         """
-        Queries the memory for analyses semantically related to the query text.
+        Queries the memory for analyses related to the query text.
+
+        In 'hybrid' mode, short queries whose terms are all known to the lexical index (a ticker,
+        a date, "sell") are answered by BM25 alone. Other queries rank by both BM25 and embedding
+        similarity and fuse the two rankings with reciprocal rank fusion.
 
         Args:
-            query_text: The question or topic to search for.
+            query_text: The question, topic or keywords to search for.
             n_results: The maximum number of relevant results to return.
+            where: An optional metadata filter, e.g. {'ticker': 'NVDA'}.
+            mode: 'hybrid', 'vector' (embeddings only) or 'lexical' (BM25 only).
+            max_chars: If set, only the best results that fit into this many characters together
+                are returned, grouped by report and labelled with their ticker and date.
 
         Returns:
             A list of the most relevant documents found in memory.
+
+        Raises:
+            ValueError: If the mode is unknown.
         """
+        if mode not in QUERY_MODES:
+            raise ValueError(f"Unknown query mode '{mode}'. Expected one of {QUERY_MODES}.")
         print(f"[Memory]: Querying memory with: '{query_text}'")
         try:
-            results = self.collection.query(
-                query_texts=[query_text],
-                n_results=n_results
-            )
-            return results.get('documents', [[]])[0]
+            hits = self._search(query_text, n_results, where, mode)
+            if max_chars is not None:
+                return select_sections(hits, max_chars)
+            return [hit["document"] for hit in hits]
         except Exception as e:
             print(f"[Memory Error]: Failed to query memory. Details: {e}")
-            return []
\ No newline at end of file
+            return []
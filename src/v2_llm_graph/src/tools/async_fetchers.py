@@ -0,0 +1,180 @@
+import asyncio
+import weakref
+
+import httpx
+
+from .financial_data_fetcher import get_stock_fundamentals
+from .sec_filings_fetcher import summarize_filing
+
+FRED_OBSERVATIONS_URL = "https://api.stlouisfed.org/fred/series/observations"
+NEWSAPI_EVERYTHING_URL = "https://newsapi.org/v2/everything"
+SEC_API_QUERY_URL = "https://api.sec-api.io"
+
+# Same indicators as get_macro_economic_data.
+MACRO_SERIES_IDS = {
+    "GDP_Growth": "GDP",
+    "UnemploymentRate": "UNRATE",
+    "InflationRate_CPI": "CPIAUCSL",
+    "EffectiveFedFundsRate": "FEDFUNDS",
+}
+
+# One pooled keep-alive client is shared by every fetcher running on the same event loop.
+# httpx clients are bound to the loop they first ran on, so each loop gets its own.
+CLIENT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0)
+CLIENT_TIMEOUT = httpx.Timeout(20.0, connect=5.0)
+
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Returns the shared AsyncClient for the running event loop, creating it on first use.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(limits=CLIENT_LIMITS, timeout=CLIENT_TIMEOUT)
+        _clients[loop] = client
+    return client
+
+
+async def close_async_client():
+    """
+    Closes the shared AsyncClient of the running event loop. Call before the loop shuts down.
+    """
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def aget_stock_fundamentals(ticker_symbol: str) -> dict:
+    """
+    Async variant of get_stock_fundamentals. yfinance has no async API, so the blocking call runs
+    in the default thread pool and does not stall the event loop.
+    """
+    return await asyncio.to_thread(get_stock_fundamentals, ticker_symbol)
+
+
+async def _latest_observation(client: httpx.AsyncClient, series_id: str, api_key: str) -> float:
+    response = await client.get(FRED_OBSERVATIONS_URL, params={
+        "series_id": series_id,
+        "api_key": api_key,
+        "file_type": "json",
+        "sort_order": "desc",
+        "limit": 1,
+    })
+    response.raise_for_status()
+    observations = response.json()["observations"]
+    # FRED marks missing values with ".".
+    if not observations or observations[0]["value"] == ".":
+        return None
+    return float(observations[0]["value"])
+
+
+async def aget_macro_economic_data(api_key: str, client: httpx.AsyncClient = None) -> dict:
+    """
+    Async variant of get_macro_economic_data. All series are requested concurrently.
+
+    Args:
+        api_key: Your FRED API key.
+        client: The AsyncClient to use. Defaults to the shared client of the running loop.
+
+    Returns:
+        A dictionary of key macroeconomic indicators or an error message.
+    """
+    print("--- [Tool Action]: Fetching macroeconomic data from FRED (async)... ---")
+    client = client or get_async_client()
+    try:
+        values = await asyncio.gather(
+            *(_latest_observation(client, series_id, api_key) for series_id in MACRO_SERIES_IDS.values())
+        )
+        macro_data = dict(zip(MACRO_SERIES_IDS, values))
+        print("--- [Tool Success]: Successfully fetched macroeconomic data. ---")
+        return macro_data
+    except Exception as e:
+        error_message = f"Could not fetch FRED data. Check API key or connection. Details: {e}"
+        print(f"--- [Tool Error]: {error_message} ---")
+        return {"error": error_message}
+
+
+async def aget_company_news(company_name: str, api_key: str, num_articles: int = 5, since: str = None,
+                            client: httpx.AsyncClient = None) -> dict:
+    """
+    Async variant of get_company_news using the NewsAPI REST endpoint.
+
+    Args:
+        company_name: The name of the company to search for (e.g., "NVIDIA").
+        api_key: Your NewsAPI.org API key.
+        num_articles: The number of articles to return.
+        since: Optional ISO 8601 timestamp. Only articles published at or after it are requested.
+        client: The AsyncClient to use. Defaults to the shared client of the running loop.
+
+    Returns:
+        A dictionary containing a list of processed articles or an error message.
+    """
+    print(f"[Tool Action]: Fetching top {num_articles} news articles for {company_name} (async)...")
+    client = client or get_async_client()
+    try:
+        params = {"q": company_name, "language": "en", "sortBy": "relevancy", "pageSize": num_articles}
+        if since:
+            params["from"] = since
+        response = await client.get(
+            NEWSAPI_EVERYTHING_URL,
+            params=params,
+            headers={"X-Api-Key": api_key or ""},
+        )
+        payload = response.json()
+        if payload.get("status") != "ok":
+            return {"error": "Failed to fetch news from NewsAPI."}
+
+        processed_articles = [{
+            "source": article['source']['name'],
+            "title": article['title'],
+            "url": article['url'],
+            "publishedAt": article['publishedAt'],
+            "content": article.get('content') or 'No content available.'
+        } for article in payload['articles']]
+
+        print(f"[Tool Success]: Successfully fetched {len(processed_articles)} articles.")
+        return {"articles": processed_articles}
+    except Exception as e:
+        error_message = f"An error occurred while fetching news: {e}"
+        print(f"[Tool Error]: {error_message}")
+        return {"error": error_message}
+
+
+async def aget_latest_sec_filings(company_ticker: str, api_key: str, client: httpx.AsyncClient = None) -> dict:
+    """
+    Async variant of get_latest_sec_filings using the sec-api.io query endpoint.
+
+    Args:
+        company_ticker: The stock ticker to search for (e.g., 'AAPL').
+        api_key: Your sec-api.io API key.
+        client: The AsyncClient to use. Defaults to the shared client of the running loop.
+
+    Returns:
+        A dictionary containing summaries of key sections from the latest filings.
+    """
+    print(f"[Tool Action]: Fetching latest SEC filings for {company_ticker} (async)...")
+    client = client or get_async_client()
+    query = {
+        "query": {"query_string": {
+            "query": f"ticker:{company_ticker} AND formType:(\"10-K\" OR \"10-Q\")"
+        }},
+        "from": "0",
+        "size": "1",
+        "sort": [{"filedAt": {"order": "desc"}}]
+    }
+    try:
+        response = await client.post(SEC_API_QUERY_URL, params={"token": api_key or ""}, json=query)
+        response.raise_for_status()
+        filings = response.json().get('filings') or []
+        if not filings:
+            return {"error": f"No recent 10-K or 10-Q found for {company_ticker}."}
+
+        latest_filing = filings[0]
+        print(f"[Tool Success]: Found latest filing: {latest_filing['formType']} filed on {latest_filing['filedAt'][:10]}")
+        return summarize_filing(latest_filing, company_ticker)
+    except Exception as e:
+        print(f"[Tool Error]: Failed to fetch SEC filings. Details: {e}")
+        return {"error": str(e)}
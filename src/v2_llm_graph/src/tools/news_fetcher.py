@@ -1,7 +1,7 @@
 import os
 from newsapi import NewsApiClient
 
-def get_company_news(company_name: str, api_key: str, num_articles: int = 5) -> dict:
+def get_company_news(company_name: str, api_key: str, num_articles: int = 5, since: str = None) -> dict:
     """
     Fetches and processes top news headlines for a given company using the NewsAPI.
 
@@ -9,6 +9,7 @@ def get_company_news(company_name: str, api_key: str, num_articles: int = 5) ->
         company_name: The name of the company to search for (e.g., "NVIDIA").
         api_key: Your NewsAPI.org API key.
         num_articles: The number of articles to return.
+        since: Optional ISO 8601 timestamp. Only articles published at or after it are requested.
 
     Returns:
         A dictionary containing a list of processed articles or an error message.
@@ -19,12 +20,10 @@ def get_company_news(company_name: str, api_key: str, num_articles: int = 5) ->
 
         # Fetch top headlines. We use the company name as the query.
         # We search for English articles and sort by relevancy.
-        top_headlines = newsapi.get_everything(
-            q=company_name,
-            language='en',
-            sort_by='relevancy',
-            page_size=num_articles
-        )
+        query = dict(q=company_name, language='en', sort_by='relevancy', page_size=num_articles)
+        if since:
+            query['from_param'] = since
+        top_headlines = newsapi.get_everything(**query)
 
         if top_headlines['status'] != 'ok':
             return {"error": "Failed to fetch news from NewsAPI."}
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+
+# Where seen articles are recorded. Override with NEWS_INDEX_PATH in the .env file.
+DEFAULT_NEWS_INDEX_PATH = os.getenv("NEWS_INDEX_PATH", "src/memory/news_index.sqlite")
+
+# Two articles whose 64-bit simhashes differ in at most this many bits are the same story.
+# NewsAPI only returns a title and ~200 characters of content, so hashes are built from word
+# bigrams and the threshold is looser than for full documents. Unrelated stories sit near 32 bits.
+SIMHASH_DISTANCE = 10
+SHINGLE_SIZE = 2
+
+# How many recent distinct stories per company near-duplicates are checked against.
+KNOWN_STORIES_LIMIT = 200
+
+# NewsAPI truncates `content` and appends a marker such as "... [+2345 chars]".
+_TRUNCATION_MARKER = re.compile(r"\s*(?:…|\.\.\.)?\s*\[\+\d+ chars\]\s*$")
+
+
+def simhash(text: str) -> int:
+    """
+    Returns the 64-bit simhash of a text over word shingles. Similar texts get hashes that differ
+    in few bits, so syndicated copies of a story with small edits still match.
+    """
+    words = re.findall(r"[a-z0-9]+", _TRUNCATION_MARKER.sub("", text or "").lower())
+    shingles = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(max(1, len(words) - SHINGLE_SIZE + 1))]
+    weights = [0] * 64
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def article_simhash(article: dict) -> int:
+    return simhash(f"{article.get('title') or ''} {article.get('content') or ''}")
+
+
+class NewsIndex:
+    """
+    Records the articles already seen per company, by URL and content simhash, so repeated
+    fetches only bring in new, distinct stories.
+    """
+
+    def __init__(self, db_path: str = None):
+        """
+        Opens (and creates if needed) the news index.
+
+        Args:
+            db_path: The SQLite database file. Defaults to NEWS_INDEX_PATH.
+        """
+        db_path = db_path or DEFAULT_NEWS_INDEX_PATH
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen_articles ("
+            "company TEXT, url TEXT, simhash TEXT, published_at TEXT, duplicate_of TEXT, article TEXT, "
+            "PRIMARY KEY (company, url))"
+        )
+        self.conn.commit()
+
+    def watermark(self, company: str) -> str:
+        """
+        Returns the latest publishedAt seen for a company, or None if nothing was seen yet.
+        """
+        row = self.conn.execute("SELECT MAX(published_at) FROM seen_articles WHERE company = ?", (company,)).fetchone()
+        return row[0]
+
+    def recent(self, company: str, limit: int) -> list:
+        """
+        Returns the most recently published distinct articles of a company.
+        """
+        rows = self.conn.execute(
+            "SELECT article FROM seen_articles WHERE company = ? AND duplicate_of IS NULL "
+            "ORDER BY published_at DESC LIMIT ?",
+            (company, limit),
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def _is_seen(self, company: str, url: str) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM seen_articles WHERE company = ? AND url = ?", (company, url)
+        ).fetchone() is not None
+
+    def _known_stories(self, company: str) -> list:
+        rows = self.conn.execute(
+            "SELECT url, simhash FROM seen_articles WHERE company = ? AND duplicate_of IS NULL "
+            "ORDER BY published_at DESC LIMIT ?",
+            (company, KNOWN_STORIES_LIMIT),
+        ).fetchall()
+        return [(url, int(value, 16)) for url, value in rows]
+
+    def _record(self, company: str, article: dict, fingerprint: int, duplicate_of: str = None):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO seen_articles (company, url, simhash, published_at, duplicate_of, article) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (company, article.get("url"), f"{fingerprint:016x}", article.get("publishedAt"), duplicate_of,
+             None if duplicate_of else json.dumps(article)),
+        )
+
+    def merge(self, company: str, news_data: dict, num_articles: int) -> dict:
+        """
+        Folds a fresh fetch into the index and returns the company's latest distinct articles.
+
+        Articles whose URL was seen before are dropped. Near-duplicates, both within the fetch and
+        of stories already seen, are collapsed into the first copy, whose 'duplicate_sources' lists
+        the outlets that syndicated it. If the fetch failed, the stored articles are returned.
+
+        Args:
+            company: The company the news was fetched for.
+            news_data: The dictionary returned by get_company_news.
+            num_articles: How many distinct articles to return.
+
+        Returns:
+            A news dictionary with 'articles' plus 'new_articles' and 'duplicates_collapsed' counts.
+        """
+        if "error" in news_data:
+            stored = self.recent(company, num_articles)
+            if not stored:
+                return news_data
+            print(f"--- [News Index]: Fetch failed. Using {len(stored)} stored articles for {company}. ---")
+            return {"articles": stored, "new_articles": 0, "duplicates_collapsed": 0}
+
+        known = self._known_stories(company)
+        distinct, duplicates = [], 0
+        for article in news_data.get("articles", []):
+            if not article.get("url") or self._is_seen(company, article["url"]):
+                continue
+            fingerprint = article_simhash(article)
+            original = next((a for a, h in distinct if hamming_distance(h, fingerprint) <= SIMHASH_DISTANCE), None)
+            if original is not None:
+                original.setdefault("duplicate_sources", []).append(article.get("source"))
+                self._record(company, article, fingerprint, duplicate_of=original["url"])
+                duplicates += 1
+                continue
+            match = next((url for url, h in known if hamming_distance(h, fingerprint) <= SIMHASH_DISTANCE), None)
+            if match is not None:
+                self._record(company, article, fingerprint, duplicate_of=match)
+                duplicates += 1
+                continue
+            distinct.append((article, fingerprint))
+
+        for article, fingerprint in distinct:
+            self._record(company, article, fingerprint)
+        self.conn.commit()
+        print(f"--- [News Index]: {len(distinct)} new stories for {company}, "
+              f"{duplicates} near-duplicates collapsed. ---")
+        return {
+            "articles": self.recent(company, num_articles),
+            "new_articles": len(distinct),
+            "duplicates_collapsed": duplicates,
+        }
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,236 @@
+import os
+import sqlite3
+import time
+
+from sec_api import QueryApi
+
+from .sec_filings_fetcher import get_latest_sec_filings, summarize_filing
+from .async_fetchers import aget_latest_sec_filings
+
+# Where the filing index is stored. Override with SEC_INDEX_PATH in the .env file.
+DEFAULT_SEC_INDEX_PATH = os.getenv("SEC_INDEX_PATH", "src/memory/sec_filing_index.sqlite")
+
+# How long a ticker's latest filing is trusted before sec-api is asked again. A company files
+# a 10-K or 10-Q about four times a year, so a daily check is plenty.
+SEC_INDEX_MAX_AGE_HOURS = float(os.getenv("SEC_INDEX_MAX_AGE_HOURS", "24"))
+
+# sec-api returns at most 50 filings per query page.
+BULK_PAGE_SIZE = 50
+BULK_MAX_PAGES = 20
+
+# Tickers per bulk query. Keeps the query string short enough for sec-api however large the batch is.
+BULK_QUERY_TICKERS = 50
+
+
+class SecFilingIndex:
+    """
+    A local SQLite index of the latest 10-K/10-Q per ticker (accession number, filedAt, link).
+    """
+
+    def __init__(self, db_path: str = None):
+        """
+        Opens (and creates if needed) the filing index.
+
+        Args:
+            db_path: The SQLite database file. Defaults to SEC_INDEX_PATH.
+        """
+        db_path = db_path or DEFAULT_SEC_INDEX_PATH
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS filing_index ("
+            "ticker TEXT PRIMARY KEY, accession_no TEXT, form_type TEXT, filed_at TEXT, link TEXT, checked_at REAL)"
+        )
+        self.conn.commit()
+
+    def get(self, ticker: str) -> dict:
+        """
+        Returns the indexed filing for a ticker, or None if the ticker was never checked.
+        A ticker that was checked but has no filing has form_type None.
+        """
+        row = self.conn.execute(
+            "SELECT accession_no, form_type, filed_at, link, checked_at FROM filing_index WHERE ticker = ?",
+            (ticker,),
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("accession_no", "form_type", "filed_at", "link", "checked_at"), row))
+
+    def put(self, ticker: str, filing: dict = None):
+        """
+        Records the latest filing of a ticker (a sec-api filing record), or that it has none.
+        """
+        filing = filing or {}
+        self.conn.execute(
+            "INSERT OR REPLACE INTO filing_index (ticker, accession_no, form_type, filed_at, link, checked_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (ticker, filing.get("accessionNo"), filing.get("formType"), filing.get("filedAt"),
+             filing.get("linkToFilingDetails"), time.time()),
+        )
+        self.conn.commit()
+
+    def is_fresh(self, ticker: str, max_age_hours: float = None) -> bool:
+        """
+        Returns True if the ticker was checked within the last `max_age_hours`.
+        """
+        max_age_hours = SEC_INDEX_MAX_AGE_HOURS if max_age_hours is None else max_age_hours
+        entry = self.get(ticker)
+        return entry is not None and time.time() - entry["checked_at"] < max_age_hours * 3600
+
+    def close(self):
+        self.conn.close()
+
+
+def _summary_from_entry(ticker: str, entry: dict) -> dict:
+    if not entry["form_type"]:
+        return {"error": f"No recent 10-K or 10-Q found for {ticker}."}
+    return summarize_filing({
+        "formType": entry["form_type"],
+        "filedAt": entry["filed_at"],
+        "accessionNo": entry["accession_no"],
+        "linkToFilingDetails": entry["link"],
+    }, ticker)
+
+
+def _filing_from_summary(summary: dict) -> dict:
+    return {
+        "formType": summary["filing_type"],
+        "filedAt": summary["filed_at"],
+        "accessionNo": summary.get("accession_no"),
+        "linkToFilingDetails": summary["link_to_filing"],
+    }
+
+
+def _store_fetched(index: SecFilingIndex, ticker: str, result: dict):
+    if "error" not in result:
+        index.put(ticker, _filing_from_summary(result))
+    elif result["error"].startswith("No recent 10-K or 10-Q"):
+        index.put(ticker)
+
+
+def get_cached_sec_filings(company_ticker: str, api_key: str, max_age_hours: float = None,
+                           db_path: str = None) -> dict:
+    """
+    Returns the latest filing summary for a ticker from the local index, asking sec-api only when
+    the entry is missing or older than `max_age_hours`. If the refresh fails, a stale entry is
+    served rather than an error.
+
+    Args:
+        company_ticker: The stock ticker (e.g., 'AAPL').
+        api_key: Your sec-api.io API key.
+        max_age_hours: How long an entry is trusted. Defaults to SEC_INDEX_MAX_AGE_HOURS.
+        db_path: The index database. Defaults to SEC_INDEX_PATH.
+
+    Returns:
+        The same dictionary as get_latest_sec_filings.
+    """
+    index = SecFilingIndex(db_path)
+    try:
+        if index.is_fresh(company_ticker, max_age_hours):
+            print(f"[SEC Index]: Using indexed filing for {company_ticker}.")
+            return _summary_from_entry(company_ticker, index.get(company_ticker))
+        result = get_latest_sec_filings(company_ticker, api_key)
+        _store_fetched(index, company_ticker, result)
+        stale = index.get(company_ticker)
+        if "error" in result and stale is not None:
+            print(f"[SEC Index]: Refresh failed for {company_ticker}. Using the stale indexed filing.")
+            return _summary_from_entry(company_ticker, stale)
+        return result
+    finally:
+        index.close()
+
+
+async def aget_cached_sec_filings(company_ticker: str, api_key: str, max_age_hours: float = None,
+                                  db_path: str = None) -> dict:
+    """
+    Async variant of get_cached_sec_filings. The index lookup is local; only a refresh goes to sec-api.
+    """
+    index = SecFilingIndex(db_path)
+    try:
+        if index.is_fresh(company_ticker, max_age_hours):
+            print(f"[SEC Index]: Using indexed filing for {company_ticker}.")
+            return _summary_from_entry(company_ticker, index.get(company_ticker))
+        result = await aget_latest_sec_filings(company_ticker, api_key)
+        _store_fetched(index, company_ticker, result)
+        stale = index.get(company_ticker)
+        if "error" in result and stale is not None:
+            print(f"[SEC Index]: Refresh failed for {company_ticker}. Using the stale indexed filing.")
+            return _summary_from_entry(company_ticker, stale)
+        return result
+    finally:
+        index.close()
+
+
+def _latest_filings(query_api: QueryApi, tickers: list) -> tuple:
+    """
+    Reads the latest 10-K/10-Q of each ticker from one bulk query, page by page.
+
+    Returns:
+        A (latest, exhausted) tuple: the latest filing per ticker found, and whether the results
+        ran out before the page limit (so tickers without a filing have none).
+    """
+    pending = set(tickers)
+    latest = {}
+    for page in range(BULK_MAX_PAGES):
+        response = query_api.get_filings({
+            "query": {"query_string": {
+                "query": f"ticker:({' OR '.join(tickers)}) AND formType:(\"10-K\" OR \"10-Q\")"
+            }},
+            "from": str(page * BULK_PAGE_SIZE),
+            "size": str(BULK_PAGE_SIZE),
+            "sort": [{"filedAt": {"order": "desc"}}]
+        })
+        filings = response.get("filings") or []
+        for filing in filings:
+            ticker = filing.get("ticker")
+            if ticker in pending:
+                latest[ticker] = filing
+                pending.discard(ticker)
+        if not pending or len(filings) < BULK_PAGE_SIZE:
+            break
+    return latest, len(filings) < BULK_PAGE_SIZE
+
+
+def refresh_filing_index(tickers: list, api_key: str, max_age_hours: float = None, db_path: str = None) -> int:
+    """
+    Refreshes the index for every stale ticker with bulk sec-api queries instead of one per ticker.
+
+    Stale tickers are queried BULK_QUERY_TICKERS at a time. Each query matches 10-K/10-Q filings of
+    its tickers sorted by filedAt, so the first filing seen for a ticker is its latest one. Pages are
+    read until every ticker is resolved or the results run out. Tickers with no filing in the
+    results are recorded as having none.
+
+    Args:
+        tickers: The stock tickers of the batch.
+        api_key: Your sec-api.io API key.
+        max_age_hours: How long an entry is trusted. Defaults to SEC_INDEX_MAX_AGE_HOURS.
+        db_path: The index database. Defaults to SEC_INDEX_PATH.
+
+    Returns:
+        The number of tickers that were refreshed.
+    """
+    index = SecFilingIndex(db_path)
+    try:
+        stale = [ticker for ticker in dict.fromkeys(tickers) if not index.is_fresh(ticker, max_age_hours)]
+        if not stale:
+            print("[SEC Index]: All tickers are fresh. No query needed.")
+            return 0
+
+        batches = [stale[i:i + BULK_QUERY_TICKERS] for i in range(0, len(stale), BULK_QUERY_TICKERS)]
+        print(f"[SEC Index]: Refreshing {len(stale)} tickers with {len(batches)} bulk queries...")
+        query_api = QueryApi(api_key=api_key)
+        found = refreshed = 0
+        for batch in batches:
+            latest, exhausted = _latest_filings(query_api, batch)
+            found += len(latest)
+            for ticker in batch:
+                # Tickers still unresolved after the page limit are left stale and fetched on demand.
+                if ticker in latest or exhausted:
+                    index.put(ticker, latest.get(ticker))
+                    refreshed += 1
+        print(f"[SEC Index]: Found filings for {found} of {len(stale)} tickers.")
+        return refreshed
+    finally:
+        index.close()
@@ -1,6 +1,30 @@
 from sec_api import QueryApi
 
 
+def summarize_filing(filing: dict, company_ticker: str) -> dict:
+    """
+    Builds the filings summary handed to the graph from one sec-api filing record.
+
+    Args:
+        filing: A filing from a sec-api query response (formType, filedAt, accessionNo, linkToFilingDetails).
+        company_ticker: The stock ticker the filing belongs to.
+
+    Returns:
+        A dictionary with the filing type, date, accession number, link and section summaries.
+    """
+    # We need another API to extract the text from the filing URL,
+    # but for this project, we will simulate this by returning a summary.
+    # A full implementation would use an extraction API.
+    return {
+        "filing_type": filing['formType'],
+        "filed_at": filing['filedAt'],
+        "accession_no": filing.get('accessionNo'),
+        "link_to_filing": filing['linkToFilingDetails'],
+        "summary_of_risk_factors": f"Extracted key risk factors related to competition and market trends for {company_ticker}.",
+        "summary_of_mdna": f"Extracted management's discussion on financial performance and future outlook for {company_ticker}."
+    }
+
+
 def get_latest_sec_filings(company_ticker: str, api_key: str) -> dict:
     """
     Fetches the most recent 10-K and 10-Q filings for a company.
@@ -21,7 +45,7 @@ def get_latest_sec_filings(company_ticker: str, api_key: str) -> dict:
         # Construct a query to find the latest 10-K or 10-Q
         query = {
           "query": { "query_string": {
-              "query": f"ticker:{company_ticker} AND formType:\"10-K\" OR formType:\"10-Q\""
+              "query": f"ticker:{company_ticker} AND formType:(\"10-K\" OR \"10-Q\")"
           }},
           "from": "0",
           "size": "1", # Get only the most recent one
@@ -34,20 +58,8 @@ def get_latest_sec_filings(company_ticker: str, api_key: str) -> dict:
             return {"error": f"No recent 10-K or 10-Q found for {company_ticker}."}
 
         latest_filing = response['filings'][0]
-        filing_url = latest_filing['linkToFilingDetails']
-        
-        # We need another API to extract the text from the filing URL,
-        # but for this project, we will simulate this by returning a summary.
-        # A full implementation would use an extraction API.
-        
         print(f"[Tool Success]: Found latest filing: {latest_filing['formType']} filed on {latest_filing['filedAt'][:10]}")
-        return {
-            "filing_type": latest_filing['formType'],
-            "filed_at": latest_filing['filedAt'],
-            "link_to_filing": filing_url,
-            "summary_of_risk_factors": f"Extracted key risk factors related to competition and market trends for {company_ticker}.",
-            "summary_of_mdna": f"Extracted management's discussion on financial performance and future outlook for {company_ticker}."
-        }
+        return summarize_filing(latest_filing, company_ticker)
         
     except Exception as e:
         print(f"[Tool Error]: Failed to fetch SEC filings. Details: {e}")
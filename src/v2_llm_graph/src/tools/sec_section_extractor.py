@@ -0,0 +1,256 @@
+import gzip
+import json
+import os
+import re
+from html.parser import HTMLParser
+
+import httpx
+
+# Where extracted sections are stored, one gzip file per accession number.
+# Override with SEC_SECTION_DIR in the .env file.
+DEFAULT_SECTION_DIR = os.getenv("SEC_SECTION_DIR", "src/memory/sec_sections")
+
+# sec.gov rejects requests without a descriptive User-Agent that includes a contact address.
+SEC_USER_AGENT = os.getenv("SEC_USER_AGENT", "QuantApprentice research contact@example.com")
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+# Upper bound on the text kept per section, so a malformed filing cannot grow memory without limit.
+MAX_SECTION_CHARS = 400_000
+
+# Start and end headings of each section per form type. Start headings must also name the
+# section, which keeps "Item 2. Unregistered Sales" in a 10-Q from being read as the MD&A.
+SECTION_MARKERS = {
+    "10-K": {
+        "risk_factors": (r"item\s*1a\b.*risk\s*factors", r"item\s*(1b|1c|2)\b"),
+        "mdna": (r"item\s*7\b(?!a).*management", r"item\s*(7a|8)\b"),
+    },
+    "10-Q": {
+        "risk_factors": (r"item\s*1a\b.*risk\s*factors", r"item\s*[2-6]\b"),
+        "mdna": (r"item\s*2\b.*management", r"item\s*[34]\b"),
+    },
+}
+
+# Tags that end a block of text. Headings are detected per block.
+_BLOCK_TAGS = {"p", "div", "br", "tr", "li", "table", "h1", "h2", "h3", "h4", "h5", "h6", "title"}
+_SKIP_TAGS = {"script", "style", "head"}
+
+# A heading is a short block that starts with "Item" (optionally after "Part II,").
+_MAX_HEADING_CHARS = 200
+_PART_PREFIX = re.compile(r"^part\s+[iv]+\W*")
+_BARE_ITEM = re.compile(r"^item\s*\d+[a-c]?\W*$")
+
+
+def _markers_for(form_type: str) -> dict:
+    base = (form_type or "10-K").upper().split("/")[0]
+    markers = SECTION_MARKERS.get(base, SECTION_MARKERS["10-K"])
+    return {name: (re.compile(start, re.I), re.compile(end, re.I)) for name, (start, end) in markers.items()}
+
+
+class SectionExtractor(HTMLParser):
+    """
+    Incrementally extracts filing sections from HTML fed in chunks.
+
+    Only the text of the section currently being read and the longest capture per section are
+    held in memory, so the full document never is. A table of contents produces short captures
+    for every section; the body text replaces them because the longest capture wins.
+    """
+
+    def __init__(self, form_type: str = "10-K"):
+        super().__init__(convert_charrefs=True)
+        self.markers = _markers_for(form_type)
+        self.sections = {name: "" for name in self.markers}
+        self._active = None
+        self._capture = []
+        self._capture_len = 0
+        self._block = []
+        self._skip_depth = 0
+        self._pending_item = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self._end_block()
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in _BLOCK_TAGS:
+            self._end_block()
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._block.append(data)
+
+    def _end_block(self):
+        text = " ".join("".join(self._block).split())
+        self._block = []
+        if not text:
+            return
+        if self._pending_item:
+            # "Item 1A." and "Risk Factors" are often separate blocks; read them as one heading.
+            text = f"{self._pending_item} {text}"
+            self._pending_item = None
+        heading = _PART_PREFIX.sub("", text.lower()) if len(text) <= _MAX_HEADING_CHARS else ""
+        if _BARE_ITEM.match(heading):
+            self._pending_item = text
+            return
+        if heading.startswith("item"):
+            if self._active and self.markers[self._active][1].match(heading):
+                self._close_section()
+            for name, (start, _) in self.markers.items():
+                if start.match(heading):
+                    self._close_section()
+                    self._active = name
+                    return
+        if self._active and self._capture_len < MAX_SECTION_CHARS:
+            self._capture.append(text)
+            self._capture_len += len(text) + 1
+
+    def _close_section(self):
+        if self._active:
+            text = "\n".join(self._capture)[:MAX_SECTION_CHARS]
+            if len(text) > len(self.sections[self._active]):
+                self.sections[self._active] = text
+        self._active, self._capture, self._capture_len = None, [], 0
+
+    def close(self):
+        super().close()
+        self._end_block()
+        self._close_section()
+
+
+def download_sections(url: str, form_type: str = "10-K") -> dict:
+    """
+    Streams a filing document and extracts its Risk Factors and MD&A sections chunk by chunk.
+
+    Args:
+        url: The filing document URL (sec-api's linkToFilingDetails).
+        form_type: The form type, which decides the section headings ('10-K' or '10-Q').
+
+    Returns:
+        A dictionary with 'risk_factors' and 'mdna' text ('' when a section was not found).
+    """
+    extractor = SectionExtractor(form_type)
+    with httpx.stream("GET", url, headers={"User-Agent": SEC_USER_AGENT}, timeout=DOWNLOAD_TIMEOUT,
+                      follow_redirects=True) as response:
+        response.raise_for_status()
+        for chunk in response.iter_text(DOWNLOAD_CHUNK_SIZE):
+            extractor.feed(chunk)
+    extractor.close()
+    return extractor.sections
+
+
+class SectionStore:
+    """
+    Stores extracted filing sections on disk as gzip-compressed JSON, one file per accession number.
+    """
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or DEFAULT_SECTION_DIR
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, accession_no: str) -> str:
+        return os.path.join(self.directory, f"{re.sub(r'[^A-Za-z0-9_-]', '_', accession_no)}.json.gz")
+
+    def get(self, accession_no: str) -> dict:
+        """
+        Returns the stored sections of a filing, or None if it was never extracted.
+        """
+        path = self._path(accession_no)
+        if not os.path.exists(path):
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    def put(self, accession_no: str, sections: dict):
+        """
+        Stores the sections of a filing. The file is written under a temporary name and renamed,
+        so a crash never leaves a truncated entry behind.
+        """
+        path = self._path(accession_no)
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(sections, f)
+        os.replace(tmp_path, path)
+
+
+def get_filing_sections(filing_url: str, accession_no: str, form_type: str = "10-K",
+                        store_dir: str = None) -> dict:
+    """
+    Returns the Risk Factors and MD&A text of a filing, downloading and parsing it only the first
+    time its accession number is seen.
+
+    Args:
+        filing_url: The filing document URL.
+        accession_no: The filing's accession number, used as the store key.
+        form_type: The form type ('10-K' or '10-Q').
+        store_dir: The section store directory. Defaults to SEC_SECTION_DIR.
+
+    Returns:
+        A dictionary with 'risk_factors' and 'mdna' text, or an error message.
+    """
+    store = SectionStore(store_dir)
+    sections = store.get(accession_no)
+    if sections is not None:
+        print(f"[Tool Action]: Using stored sections for filing {accession_no}.")
+        return sections
+
+    print(f"[Tool Action]: Downloading and extracting sections of filing {accession_no}...")
+    try:
+        sections = download_sections(filing_url, form_type)
+    except Exception as e:
+        print(f"[Tool Error]: Failed to extract filing sections. Details: {e}")
+        return {"error": str(e)}
+    store.put(accession_no, sections)
+    print(f"[Tool Success]: Extracted {', '.join(k for k, v in sections.items() if v) or 'no sections'}.")
+    return sections
+
+
+# Characters of each extracted section placed in the filing summary handed to the graph.
+SECTION_EXCERPT_CHARS = 1500
+
+
+def _section_key(sec_data: dict) -> str:
+    return sec_data.get("accession_no") or re.sub(r"\W", "_", sec_data["link_to_filing"])
+
+
+def load_filing_sections(sec_data: dict, store_dir: str = None) -> dict:
+    """
+    Returns the full stored sections of a filing summary, or None if they were never extracted.
+    """
+    if "error" in sec_data or not sec_data.get("link_to_filing"):
+        return None
+    return SectionStore(store_dir).get(_section_key(sec_data))
+
+
+def with_filing_sections(sec_data: dict, store_dir: str = None) -> dict:
+    """
+    Replaces the placeholder section summaries of a filing summary with the real text.
+
+    The full sections stay in the section store. The summary only carries an excerpt of each, under
+    'summary_of_risk_factors' and 'summary_of_mdna', plus 'sections_extracted' listing the sections found.
+    Filings that cannot be downloaded or parsed keep their placeholder summaries.
+
+    Args:
+        sec_data: The dictionary returned by get_latest_sec_filings.
+        store_dir: The section store directory. Defaults to SEC_SECTION_DIR.
+
+    Returns:
+        A new filing summary dictionary.
+    """
+    if "error" in sec_data or not sec_data.get("link_to_filing"):
+        return sec_data
+    sections = get_filing_sections(sec_data["link_to_filing"], _section_key(sec_data), sec_data.get("filing_type"),
+                                   store_dir)
+    if "error" in sections:
+        return sec_data
+
+    updated = dict(sec_data)
+    for name, field in (("risk_factors", "summary_of_risk_factors"), ("mdna", "summary_of_mdna")):
+        if sections.get(name):
+            updated[field] = sections[name][:SECTION_EXCERPT_CHARS]
+    updated["sections_extracted"] = [name for name, text in sections.items() if text]
+    return updated
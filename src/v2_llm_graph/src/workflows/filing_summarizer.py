@@ -0,0 +1,181 @@
+import hashlib
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import google.generativeai as genai
+
+from ..llm.resilient_client import CallPolicy, call_llm
+from .prompt_builder import estimate_tokens, truncate_to_tokens
+
+# Bump when the prompts change so cached chunk summaries written by an older prompt are not reused.
+SUMMARY_PROMPT_VERSION = "1"
+
+# Where chunk summaries are cached. Override with FILING_SUMMARY_CACHE_PATH in the .env file.
+DEFAULT_SUMMARY_CACHE_PATH = os.getenv("FILING_SUMMARY_CACHE_PATH", "src/memory/filing_summaries.sqlite")
+
+# Chunks close at a paragraph boundary once they pass CHUNK_MIN_TOKENS and the boundary is a
+# content-defined cut point, or unconditionally at CHUNK_MAX_TOKENS. Cut points depend only on the
+# paragraph text, so an edit in an amended filing only changes the chunks around it.
+CHUNK_MIN_TOKENS = 600
+CHUNK_MAX_TOKENS = 1500
+CUT_POINT_MODULUS = 4
+
+# Token budget of the final digest per section, and how many summaries one reduce call merges.
+DIGEST_TOKENS = 350
+REDUCE_BATCH_SIZE = 8
+
+# Concurrent chunk summarization calls.
+SUMMARY_WORKERS = int(os.getenv("FILING_SUMMARY_WORKERS", "8"))
+
+SECTION_TITLES = {
+    "risk_factors": "Risk Factors (Item 1A)",
+    "mdna": "Management's Discussion and Analysis (MD&A)",
+}
+
+CHUNK_SUMMARY_PROMPT = """
+You are summarizing part of the {section_title} section of a company's SEC filing for an equity analyst.
+Summarize the excerpt below in 3-5 concise bullet points. Keep concrete figures, named risks and
+forward-looking statements. Do not add information that is not in the excerpt.
+
+**Excerpt:**
+{chunk}
+"""
+
+REDUCE_PROMPT = """
+You are combining partial summaries of the {section_title} section of a company's SEC filing.
+Merge them into one digest of at most {max_words} words. Remove repetition, keep the most
+material risks, figures and outlook statements, and use short bullet points.
+
+**Partial Summaries:**
+{summaries}
+"""
+
+
+def _is_cut_point(paragraph: str) -> bool:
+    return hashlib.md5(paragraph.encode("utf-8")).digest()[0] % CUT_POINT_MODULUS == 0
+
+
+def chunk_section(text: str, min_tokens: int = CHUNK_MIN_TOKENS, max_tokens: int = CHUNK_MAX_TOKENS) -> list:
+    """
+    Splits section text into chunks at content-defined paragraph boundaries.
+
+    Args:
+        text: The section text, one paragraph per line.
+        min_tokens: A chunk may only close at a cut point once it has this many tokens.
+        max_tokens: A chunk always closes before exceeding this many tokens.
+
+    Returns:
+        A list of chunk strings.
+    """
+    chunks, current, size = [], [], 0
+    for paragraph in filter(None, (line.strip() for line in (text or "").splitlines())):
+        paragraph = truncate_to_tokens(paragraph, max_tokens)
+        tokens = estimate_tokens(paragraph)
+        if current and size + tokens > max_tokens:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(paragraph)
+        size += tokens
+        if size >= min_tokens and _is_cut_point(paragraph):
+            chunks.append("\n".join(current))
+            current, size = [], 0
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+class ChunkSummaryCache:
+    """
+    Caches chunk summaries in SQLite by a hash of the prompt version, section and chunk text.
+    """
+
+    def __init__(self, db_path: str = None):
+        db_path = db_path or DEFAULT_SUMMARY_CACHE_PATH
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Summaries are written from the worker threads of the map step.
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS chunk_summaries (key TEXT PRIMARY KEY, summary TEXT)")
+        self.conn.commit()
+
+    @staticmethod
+    def key(section: str, chunk: str) -> str:
+        return hashlib.sha256(f"{SUMMARY_PROMPT_VERSION}\0{section}\0{chunk}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str:
+        row = self.conn.execute("SELECT summary FROM chunk_summaries WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, summary: str):
+        self.conn.execute("INSERT OR REPLACE INTO chunk_summaries (key, summary) VALUES (?, ?)", (key, summary))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def _reduce(section: str, summaries: list, llm, policy) -> str:
+    """
+    Merges summaries in batches until they fit the digest budget.
+    """
+    section_title = SECTION_TITLES.get(section, section)
+    max_words = int(DIGEST_TOKENS * 0.75)
+    while len(summaries) > 1 and estimate_tokens("\n".join(summaries)) > DIGEST_TOKENS:
+        summaries = [
+            call_llm(
+                llm,
+                REDUCE_PROMPT.format(section_title=section_title, max_words=max_words,
+                                     summaries="\n---\n".join(summaries[i:i + REDUCE_BATCH_SIZE])),
+                call_site="reduce_filing_summary",
+                policy=policy,
+            ).text
+            for i in range(0, len(summaries), REDUCE_BATCH_SIZE)
+        ]
+    return truncate_to_tokens("\n".join(summaries), DIGEST_TOKENS)
+
+
+def summarize_filing_sections(sections: dict, llm: genai.GenerativeModel, policy: CallPolicy = None,
+                              cache_path: str = None) -> dict:
+    """
+    Map-reduce summarization of long filing sections into bounded digests.
+
+    Every section is chunked, chunks without a cached summary are summarized concurrently, and the
+    chunk summaries are reduced to at most DIGEST_TOKENS per section. Chunk summaries are cached by
+    content hash, so an amended filing only pays for the chunks that changed.
+
+    Args:
+        sections: Section name to text, e.g. {'risk_factors': ..., 'mdna': ...}.
+        llm: The model used for chunk summaries and reduce calls.
+        policy: The CallPolicy for the LLM calls. Defaults to the environment-configured policy.
+        cache_path: The chunk summary cache database. Defaults to FILING_SUMMARY_CACHE_PATH.
+
+    Returns:
+        Section name to digest text. Empty sections are left out.
+    """
+    cache = ChunkSummaryCache(cache_path)
+    try:
+        chunks = {name: chunk_section(text) for name, text in sections.items() if text}
+        keyed = {name: [(ChunkSummaryCache.key(name, chunk), chunk) for chunk in section_chunks]
+                 for name, section_chunks in chunks.items()}
+        summaries = {key: cache.get(key) for pairs in keyed.values() for key, _ in pairs}
+        missing = {key: (name, chunk) for name, pairs in keyed.items() for key, chunk in pairs if summaries[key] is None}
+        print(f"--- [Filing Summary]: {len(summaries)} chunks, {len(summaries) - len(missing)} cached, "
+              f"{len(missing)} to summarize. ---")
+
+        def summarize(item):
+            key, (name, chunk) = item
+            prompt = CHUNK_SUMMARY_PROMPT.format(section_title=SECTION_TITLES.get(name, name), chunk=chunk)
+            return key, call_llm(llm, prompt, call_site="summarize_filing_chunk", policy=policy).text
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=SUMMARY_WORKERS) as executor:
+                for key, summary in executor.map(summarize, missing.items()):
+                    summaries[key] = summary
+                    cache.put(key, summary)
+
+        return {name: _reduce(name, [summaries[key] for key, _ in pairs], llm, policy)
+                for name, pairs in keyed.items()}
+    finally:
+        cache.close()
@@ -1,10 +1,28 @@
-import os
-import json
-import re
 import google.generativeai as genai
 
+from ..llm.resilient_client import CallPolicy
+from ..llm.structured_output import RAW_PREVIEW_CHARS, generate_json
 
-def analyze_article_chain(article_content: str, llm: genai.GenerativeModel) -> dict:
+# Version of the analysis prompt below. Bump it whenever the prompt changes so that cached
+# analyses produced by the old prompt are no longer reused.
+NEWS_ANALYSIS_PROMPT_VERSION = "1"
+
+NEWS_ANALYSIS_KEYS = ["reasoning", "sentiment", "key_takeaways", "summary"]
+
+# Response schema for Gemini's JSON mode.
+NEWS_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "reasoning": {"type": "string"},
+        "sentiment": {"type": "string", "enum": ["Positive", "Negative", "Neutral"]},
+        "key_takeaways": {"type": "array", "items": {"type": "string"}},
+        "summary": {"type": "string"},
+    },
+    "required": NEWS_ANALYSIS_KEYS,
+}
+
+
+def analyze_article_chain(article_content: str, llm: genai.GenerativeModel, policy: CallPolicy = None) -> dict:
     """
     Analyzes a news article using a single, structured prompt to Gemini.
     This version includes a Chain-of-Thought reasoning step and a rubric for more accurate financial sentiment.
@@ -12,6 +30,7 @@ def analyze_article_chain(article_content: str, llm: genai.GenerativeModel) -> d
     Args:
         article_content: The full text content of the news article.
         llm: The initialized Gemini GenerativeModel instance.
+        policy: The CallPolicy for the LLM call. Defaults to the environment-configured policy.
 
     Returns:
         A dictionary containing the structured analysis or an error message.
@@ -42,19 +61,18 @@ def analyze_article_chain(article_content: str, llm: genai.GenerativeModel) -> d
     """
 
     try:
-        response = llm.generate_content(prompt)
-        cleaned_response = re.sub(r"```json\n?|```", "", response.text)
-        analysis_result = json.loads(cleaned_response)
-        
-        print("--- [Workflow Success]: Refined News Analysis completed. ---")
-        return analysis_result
-
-    except json.JSONDecodeError:
-        error_message = "Failed to decode JSON from the model's response."
-        print(f"--- [Workflow Error]: {error_message} ---")
-        print(f"--- [Raw Response]: {response.text} ---")
-        return {"error": error_message, "raw_response": response.text}
+        analysis_result, raw_response = generate_json(llm, prompt, NEWS_ANALYSIS_KEYS, call_site="news_analysis",
+                                                      policy=policy, schema=NEWS_ANALYSIS_SCHEMA)
     except Exception as e:
         error_message = f"An unexpected error occurred: {e}"
         print(f"--- [Workflow Error]: {error_message} ---")
-        return {"error": error_message}
\ No newline at end of file
+        return {"error": error_message}
+
+    if analysis_result is None:
+        error_message = "Failed to decode JSON from the model's response."
+        print(f"--- [Workflow Error]: {error_message} ---")
+        print(f"--- [Raw Response]: {raw_response[:RAW_PREVIEW_CHARS]} ---")
+        return {"error": error_message, "raw_response": raw_response}
+
+    print("--- [Workflow Success]: Refined News Analysis completed. ---")
+    return analysis_result
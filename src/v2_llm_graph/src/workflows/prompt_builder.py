@@ -0,0 +1,179 @@
+import json
+import math
+import re
+
+# Gemini tokenizes English prose at roughly four characters per token. The estimate only has
+# to be good enough to keep sections inside their budgets, so no tokenizer round trip is needed.
+CHARS_PER_TOKEN = 4
+
+TRUNCATION_MARKER = " ...[truncated]"
+
+# Per-section token budgets for the synthesis prompt.
+SYNTHESIS_BUDGETS = {
+    "past_analysis": 600,
+    "sec_filings_summary": 800,
+    "financial_analysis": 700,
+    "news_impact_analysis": 500,
+    "market_context_analysis": 400,
+}
+
+# Per-section token budgets for the refinement prompt.
+REFINEMENT_BUDGETS = {
+    "financial_analysis": 700,
+    "news_impact_analysis": 500,
+    "market_context_analysis": 400,
+    "feedback": 500,
+}
+
+# Token budget for the serialized data payload handed to a specialist analyst.
+SPECIALIST_INPUT_BUDGET = 1500
+
+# Report sections kept when a past analysis has to be shortened, in order of priority.
+PAST_ANALYSIS_KEY_SECTIONS = ("executive summary", "recommendation")
+
+# A Markdown heading ("## Key Findings") or a bold line ("**1. Executive Summary:**").
+_HEADING = re.compile(r"^\s*(?:#{1,6}\s+(?P<md>.+?)|(?:\d+\.\s*)?\*\*(?P<bold>[^*]+?)\*\*(?P<colon>:?))\s*$")
+
+# Bold lines only count as headings when they name a report section or end with a colon,
+# so a bolded rating such as "**Buy**" stays in the body of its section.
+_SECTION_WORDS = ("summary", "finding", "recommendation", "justification", "rationale", "risk", "conclusion")
+
+
+def _heading_title(match) -> str:
+    title = (match.group("md") or match.group("bold")).strip().strip("*: ")
+    title = re.sub(r"^\d+\.\s*", "", title)
+    return re.sub(r"\s*\(.*\)$", "", title).lower()
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of tokens in a piece of text.
+    """
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+
+def _compact(value):
+    if isinstance(value, dict):
+        return {k: _compact(v) for k, v in value.items() if v is not None and v != {} and v != []}
+    if isinstance(value, (list, tuple)):
+        return [_compact(v) for v in value if v is not None]
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        # Six significant digits is plenty for ratios and keeps market caps readable.
+        return float(f"{value:.6g}")
+    return value
+
+
+def compact_serialize(data) -> str:
+    """
+    Serializes a data payload for a prompt: minified JSON, None/empty fields dropped,
+    floats rounded to six significant digits. Strings are returned unchanged.
+    """
+    if isinstance(data, str):
+        return data
+    return json.dumps(_compact(data), separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Shortens text to at most `max_tokens`, cutting at the last line or sentence break that fits.
+    """
+    text = text or ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    limit = max(0, max_tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARKER))
+    cut = text[:limit]
+    boundary = max(cut.rfind("\n"), cut.rfind(". "))
+    if boundary > limit // 2:
+        cut = cut[:boundary + 1]
+    return cut.rstrip() + TRUNCATION_MARKER
+
+
+def section_heading(line: str) -> str:
+    """
+    Returns the lowercased title if the line is a report section heading, otherwise None.
+    """
+    match = _HEADING.match(line)
+    if match and match.group("bold") and not (
+        match.group("colon") or match.group("bold").rstrip().endswith(":")
+        or any(word in match.group("bold").lower() for word in _SECTION_WORDS)
+    ):
+        return None
+    return _heading_title(match) if match else None
+
+
+def extract_sections(report: str) -> dict:
+    """
+    Splits a Markdown-style report into {lowercased heading: body} using its section headings.
+    """
+    sections, current, lines = {}, None, []
+    for line in (report or "").splitlines():
+        title = section_heading(line)
+        if title is not None:
+            if current is not None:
+                sections[current] = "\n".join(lines).strip()
+            current, lines = title, []
+        elif current is not None:
+            lines.append(line)
+    if current is not None:
+        sections[current] = "\n".join(lines).strip()
+    return sections
+
+
+def summarize_past_analysis(text: str, max_tokens: int) -> str:
+    """
+    Fits prior reports into a token budget. Reports that are too long are reduced to their
+    Executive Summary and Recommendation sections before any hard truncation.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    sections = extract_sections(text)
+    kept = []
+    for key in PAST_ANALYSIS_KEY_SECTIONS:
+        for title, body in sections.items():
+            if key in title and body:
+                kept.append(f"{title.title()}: {body}")
+                break
+    condensed = "\n".join(kept) if kept else text
+    return truncate_to_tokens(condensed, max_tokens)
+
+
+def fit_section(name: str, value, max_tokens: int) -> str:
+    """
+    Serializes one prompt section and trims it to its token budget.
+    """
+    text = compact_serialize(value) if value not in (None, "", {}) else "Not available"
+    if name == "past_analysis":
+        return summarize_past_analysis(text, max_tokens)
+    return truncate_to_tokens(text, max_tokens)
+
+
+def build_prompt(template: str, sections: dict, budgets: dict, **fixed) -> tuple:
+    """
+    Formats a prompt template with every budgeted section fitted to its token budget.
+
+    Args:
+        template: The prompt template (e.g. SYNTHESIS_PROMPT_TEMPLATE).
+        sections: The raw values for the budgeted placeholders.
+        budgets: The token budget per placeholder. Sections without a budget are left as is.
+        **fixed: Placeholders that are inserted verbatim (e.g. company_name).
+
+    Returns:
+        A tuple of (prompt, token_report) where token_report maps each section to its
+        estimated token count, plus 'template' for the fixed text and 'total'.
+    """
+    fitted = {
+        name: fit_section(name, value, budgets[name]) if name in budgets else compact_serialize(value)
+        for name, value in sections.items()
+    }
+    prompt = template.format(**fitted, **fixed)
+    token_report = {name: estimate_tokens(text) for name, text in fitted.items()}
+    token_report["total"] = estimate_tokens(prompt)
+    token_report["template"] = max(0, token_report["total"] - sum(token_report[name] for name in fitted))
+    return prompt, token_report
+
+
+def format_token_report(prompt_name: str, token_report: dict) -> str:
+    parts = " ".join(f"{name}={tokens}" for name, tokens in token_report.items() if name != "total")
+    return f"--- [Prompt]: {prompt_name} ~{token_report['total']} tokens ({parts}) ---"
@@ -2,6 +2,8 @@
 
 import google.generativeai as genai
 
+from ..llm.resilient_client import call_llm
+
 # Agent Prompts for Synthesis and Evaluation 
 
 # --- Agent Prompts for Synthesis and Evaluation ---
@@ -51,6 +53,8 @@ Focus on questions like:
 - Is the analysis balanced?
 
 Provide your feedback in a concise, 2-4 bullet point list. Be critical but constructive.
+End your response with a single line that reads exactly "VERDICT: REVISE" if the report should be revised
+based on your feedback, or "VERDICT: ACCEPT" if it is sound enough to publish as is.
 
 **DRAFT REPORT TO EVALUATE:**
 ---
@@ -112,7 +116,7 @@ def generate_and_evaluate_report(
         market_context_analysis=market_context_analysis
     )
     try:
-        draft_report = llm.generate_content(synthesis_prompt).text
+        draft_report = call_llm(llm, synthesis_prompt, call_site="synthesize_report").text
     except Exception as e:
         return {"error": f"Failed during initial draft generation: {e}"}
 
@@ -120,7 +124,7 @@ def generate_and_evaluate_report(
     print("--- [Step 2]: Evaluating draft with Risk Manager agent... ---")
     evaluator_prompt = EVALUATOR_PROMPT_TEMPLATE.format(draft_report=draft_report)
     try:
-        feedback = llm.generate_content(evaluator_prompt).text
+        feedback = call_llm(llm, evaluator_prompt, call_site="evaluate_report").text
     except Exception as e:
         return {"error": f"Failed during evaluation step: {e}"}
 
@@ -134,7 +138,7 @@ def generate_and_evaluate_report(
         feedback=feedback
     )
     try:
-        final_report = llm.generate_content(refinement_prompt).text
+        final_report = call_llm(llm, refinement_prompt, call_site="refine_report").text
     except Exception as e:
         return {"error": f"Failed during refinement step: {e}"}
 
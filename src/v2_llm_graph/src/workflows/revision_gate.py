@@ -0,0 +1,177 @@
+import re
+import threading
+from collections import Counter
+from typing import Optional
+
+import google.generativeai as genai
+
+from ..llm.resilient_client import CallPolicy, call_llm
+
+# The evaluator prompt asks for this line at the end of its feedback.
+VERDICT_PATTERN = re.compile(r"VERDICT\W{0,5}(REVISE|ACCEPT)\b", re.IGNORECASE)
+
+# Phrases that signal the Risk Manager found something to fix. Generic modals ("should", "must")
+# and short words ("gap", "weak") are left out because they appear in positive feedback too.
+REVISION_CUES = (
+    "needs improvement", "need improvement", "needs more", "lacks", "lacking", "missing",
+    "overlooks", "overlooked", "omits", "omitted", "fails to", "does not address", "doesn't address",
+    "does not consider", "doesn't consider", "too optimistic", "too pessimistic", "overly optimistic",
+    "overly pessimistic", "unbalanced", "one-sided", "biased", "weakness", "weaknesses",
+    "unclear", "vague", "insufficient", "unsupported", "not supported", "not justified",
+    "consider adding", "should be revised", "should address", "should include", "should discuss",
+    "recommend revising",
+)
+
+# Phrases that signal the report is good enough to ship as is.
+ACCEPTANCE_CUES = (
+    "no revision needed", "no revisions needed", "no revision is needed", "no changes needed",
+    "no major issues", "no significant issues", "well-balanced", "well balanced",
+    "well supported", "well-supported", "ready for publication", "ready to publish",
+    "approve", "approved", "published as is", "publish as is", "acceptable as is", "sufficient as is",
+)
+
+
+def _cue_pattern(cues) -> re.Pattern:
+    # Longest cues first so "weaknesses" wins over "weakness"; word boundaries keep "biased" out of "unbiased".
+    alternatives = "|".join(re.escape(cue) for cue in sorted(cues, key=len, reverse=True))
+    return re.compile(rf"(?<![\w-])(?:{alternatives})(?![\w-])")
+
+
+REVISION_PATTERN = _cue_pattern(REVISION_CUES)
+ACCEPTANCE_PATTERN = _cue_pattern(ACCEPTANCE_CUES)
+
+LLM_GATE_PROMPT = """
+    You are a gatekeeper. Your task is to decide if a report needs revision based on the following feedback.
+    If the feedback points out any flaws, weaknesses, or areas for improvement, a revision is required.
+
+    Feedback:
+    ---
+    {feedback}
+    ---
+
+    Based on the feedback, is a revision required? Answer ONLY with the word "Yes" or "No".
+    """
+
+
+class GateStats:
+    """
+    Thread-safe counter of which decision path settled each revision decision.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    def record(self, path: str):
+        with self._lock:
+            self._counts[path] += 1
+
+    def report(self) -> dict:
+        """
+        Returns counts and shares per decision path, e.g. {'verdict': {'count': 8, 'share': 0.8}, ...}.
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        total = sum(counts.values())
+        return {
+            path: {"count": count, "share": count / total if total else 0.0}
+            for path, count in sorted(counts.items())
+        }
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+GATE_STATS = GateStats()
+
+
+def parse_verdict(feedback: str) -> Optional[str]:
+    """
+    Reads the structured 'VERDICT: REVISE|ACCEPT' line from the evaluator's feedback.
+
+    Returns:
+        'refine', 'end', or None if no verdict line is present. The last verdict wins.
+    """
+    matches = VERDICT_PATTERN.findall(feedback or "")
+    if not matches:
+        return None
+    return "refine" if matches[-1].upper() == "REVISE" else "end"
+
+
+def heuristic_decision(feedback: str) -> Optional[str]:
+    """
+    Classifies free-text feedback by counting whole-word revision and acceptance cues.
+
+    Returns:
+        'refine' or 'end' when one side clearly dominates, otherwise None.
+    """
+    text = (feedback or "").lower()
+    if not text.strip():
+        return "end"
+    # Strip matched acceptance phrases so "no revision needed" is not also counted as a revision cue.
+    text, acceptance = ACCEPTANCE_PATTERN.subn(" ", text)
+    revision = len(REVISION_PATTERN.findall(text))
+    if revision and not acceptance:
+        return "refine"
+    if acceptance and not revision:
+        return "end"
+    return None
+
+
+def llm_gate_decision(feedback: str, llm: genai.GenerativeModel, policy: Optional[CallPolicy] = None) -> str:
+    """
+    Asks the LLM whether the feedback requires a revision. This costs a full round trip.
+    """
+    response = call_llm(llm, LLM_GATE_PROMPT.format(feedback=feedback), call_site="revision_gate", policy=policy)
+    return "refine" if "yes" in response.text.strip().lower() else "end"
+
+
+def decide_revision(
+    feedback: str,
+    llm: Optional[genai.GenerativeModel] = None,
+    use_llm_fallback: bool = False,
+    policy: Optional[CallPolicy] = None,
+    stats: Optional[GateStats] = None,
+) -> str:
+    """
+    Decides whether a report should be refined, trying the cheapest path first:
+    the evaluator's structured verdict, then a local keyword heuristic, then (opt-in) an LLM call.
+
+    Args:
+        feedback: The Risk Manager's feedback text.
+        llm: The model used for the opt-in LLM fallback.
+        use_llm_fallback: If True, ambiguous feedback is sent to the LLM gate.
+        policy: The CallPolicy used for the LLM fallback.
+        stats: The GateStats to record the deciding path into. Defaults to GATE_STATS.
+
+    Returns:
+        'refine' or 'end'.
+    """
+    stats = stats or GATE_STATS
+
+    decision = parse_verdict(feedback)
+    if decision is not None:
+        stats.record("verdict")
+        print(f"--- [Gate]: Structured verdict -> {decision}. ---")
+        return decision
+
+    decision = heuristic_decision(feedback)
+    if decision is not None:
+        stats.record("heuristic")
+        print(f"--- [Gate]: Heuristic -> {decision}. ---")
+        return decision
+
+    if use_llm_fallback and llm is not None:
+        try:
+            decision = llm_gate_decision(feedback, llm, policy)
+            stats.record("llm")
+            print(f"--- [Gate]: LLM gate -> {decision}. ---")
+            return decision
+        except Exception as e:
+            print(f"--- [Gate Error]: LLM gate failed. Falling back to default. Details: {e} ---")
+
+    # The evaluator is asked to be critical, so ambiguous feedback is treated as a revision request.
+    stats.record("default")
+    print("--- [Gate]: Ambiguous feedback -> refine. ---")
+    return "refine"
@@ -1,5 +1,9 @@
 import google.generativeai as genai
 
+from ..llm.resilient_client import CallPolicy, call_llm
+from ..memory.semantic_cache import get_semantic_cache
+from .prompt_builder import SPECIALIST_INPUT_BUDGET, compact_serialize, truncate_to_tokens
+
 # Specialist Analyst Prompts
 
 FINANCIAL_ANALYST_PROMPT = """
@@ -31,35 +35,48 @@ Provide a 2-3 sentence summary of the overall market sentiment based on this dat
 """
 
 
-def route_and_execute_task(task_type: str, data: dict, llm: genai.GenerativeModel) -> str:
+def route_and_execute_task(task_type: str, data: dict, llm: genai.GenerativeModel, policy: CallPolicy = None,
+                           ticker: str = None) -> str:
     """
     Routes data to the correct specialist analyst based on the task type.
 
     Args:
         task_type: The type of analysis to perform ('analyze_financials', 'analyze_news_impact', 'analyze_market_context').
-        data: The data payload for the analysis.
+        data: The data payload for the analysis. It is serialized compactly and trimmed to SPECIALIST_INPUT_BUDGET tokens.
         llm: The initialized Gemini GenerativeModel instance.
+        policy: The CallPolicy for the LLM call. Defaults to the environment-configured policy.
+        ticker: The company the data belongs to. Semantic cache hits are limited to this ticker.
 
     Returns:
         The text response from the selected specialist analyst.
     """
     
+    payload = truncate_to_tokens(compact_serialize(data), SPECIALIST_INPUT_BUDGET)
     prompt = ""
     if task_type == 'analyze_financials':
         print(f"--- [Router]: Routing to Financial Analyst... ---")
-        prompt = FINANCIAL_ANALYST_PROMPT.format(financial_data=data)
+        prompt = FINANCIAL_ANALYST_PROMPT.format(financial_data=payload)
     elif task_type == 'analyze_news_impact':
         print(f"--- [Router]: Routing to News Analyst... ---")
-        prompt = NEWS_ANALYST_PROMPT.format(news_analysis=data)
+        prompt = NEWS_ANALYST_PROMPT.format(news_analysis=payload)
     elif task_type == 'analyze_market_context':
         print(f"--- [Router]: Routing to Market Analyst... ---")
-        prompt = MARKET_ANALYST_PROMPT.format(macro_data=data)
+        prompt = MARKET_ANALYST_PROMPT.format(macro_data=payload)
     else:
         return "--- [Router Error]: Invalid task type provided. ---"
 
+    cache = get_semantic_cache()
+    if cache is not None:
+        cached = cache.lookup(task_type, prompt, ticker)
+        if cached is not None:
+            print(f"--- [Router]: Reusing a cached analysis of a near-identical prompt. ---")
+            return cached
+
     try:
-        response = llm.generate_content(prompt)
+        response = call_llm(llm, prompt, call_site=task_type, policy=policy)
         print(f"--- [Router]: Specialist analysis complete. ---")
+        if cache is not None:
+            cache.store(task_type, prompt, response.text, ticker)
         return response.text
     except Exception as e:
         error_message = f"An error occurred during specialist execution: {e}"